@@ -0,0 +1,260 @@
+"""
+News ingestion for the company news agent.
+
+Syndicated stories arrive many times: the same headline from several outlets, with a
+wire prefix ("UPDATE 1-"), the outlet's name appended or a word changed. Sending all of
+them makes the prompt long and the analysis no better. The pipeline:
+
+- normalizes each record (title, source, URL, timezone-aware date);
+- collapses near-duplicates as they stream in, with a MinHash signature of the title's
+  character shingles and locality-sensitive hashing, so each record is compared only
+  with the few stories that share a band with it;
+- ranks the collapsed stories by recency, source and how widely they were carried.
+
+Only the top-k stories go into the prompt. Everything here is pure CPU work on small
+records and module-level, so it runs in the CPU executor.
+"""
+
+import hashlib
+import math
+import random
+import re
+import unicodedata
+from datetime import datetime, timezone
+from typing import Iterable
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel, Field
+
+from backend.src.agents.company_news_agent.model import CompanyNewsReponse, CompanyNewsResponse
+
+## PIPELINE CONFIGURATION ##
+NEWS_TOP_K = 10
+SHINGLE_SIZE = 5
+# 16 bands of 4 rows: titles with a shingle similarity around 0.5 and up become candidates
+NUM_PERM = 64
+BANDS = 16
+DUPLICATE_THRESHOLD = 0.6
+# The same headline further apart than this is a new story ("shares fall" again next month)
+DUPLICATE_WINDOW_HOURS = 72.0
+RECENCY_HALF_LIFE_HOURS = 48.0
+
+# Relative trust in an outlet; unknown outlets get DEFAULT_SOURCE_WEIGHT
+SOURCE_WEIGHTS = {
+    "reuters": 1.0,
+    "bloomberg": 1.0,
+    "the wall street journal": 1.0,
+    "wall street journal": 1.0,
+    "financial times": 1.0,
+    "associated press": 0.9,
+    "cnbc": 0.9,
+    "barron's": 0.9,
+    "marketwatch": 0.8,
+    "yahoo finance": 0.7,
+    "investopedia": 0.6,
+    "seeking alpha": 0.6,
+    "benzinga": 0.6,
+    "zacks": 0.5,
+    "motley fool": 0.5,
+}
+DEFAULT_SOURCE_WEIGHT = 0.6
+
+_WIRE_PREFIX = re.compile(r"^(?:update\s*\d*|exclusive|breaking|corrected|refile|wrapup\s*\d*)\s*[-:|]\s*", re.IGNORECASE)
+_TRAILER = re.compile(r"\s+[-|–—]\s+([^-|–—]{2,40})$")
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+# One 64-bit hash per shingle, XORed with a fixed mask per permutation: a bijection of the hash
+# space, and several times faster in pure Python than the textbook (a * h + b) mod p
+_MASKS = [random.Random(20240101 + i).getrandbits(64) for i in range(NUM_PERM)]
+
+
+class NewsStory(BaseModel):
+    """One story after collapsing: the most trusted outlet's version, with every outlet that carried it."""
+    title: str
+    source: str
+    date: datetime = Field(..., description="Most recent appearance")
+    url: str
+    sentiment: str | None = None
+    sources: list[str] = Field(default_factory=list)
+    duplicates: int = Field(0, description="Records collapsed into this story")
+    score: float = 0.0
+
+
+class NewsDigest(BaseModel):
+    ticker: str
+    stories: list[NewsStory] = Field(default_factory=list, description="Top stories, best first")
+    received: int = Field(0, description="Records fed to the pipeline")
+    unique: int = Field(0, description="Stories left after collapsing near-duplicates")
+
+    def to_prompt(self) -> str:
+        """One compact line per story."""
+        lines = []
+        for story in self.stories:
+            others = [s for s in story.sources if s != story.source]
+            carried = f" (+{len(others)}: {', '.join(others[:3])})" if others else ""
+            lines.append(f"- {story.date:%Y-%m-%d} | {story.source}{carried} | {story.sentiment or 'n/a'} | {story.title}")
+        return "\n".join(lines)
+
+
+## NORMALIZATION ##
+
+def clean_title(title: str, source: str = "") -> str:
+    """Display title without wire prefixes or a trailing outlet name."""
+    title = _SPACES.sub(" ", unicodedata.normalize("NFKC", title)).strip()
+    title = _WIRE_PREFIX.sub("", title)
+    trailer = _TRAILER.search(title)
+    if trailer and (not source or canonical_source(trailer.group(1)) == canonical_source(source)
+                    or canonical_source(trailer.group(1)) in SOURCE_WEIGHTS):
+        title = title[:trailer.start()]
+    return title.strip()
+
+
+def title_key(title: str) -> str:
+    """Lowercase title without punctuation, the text that is shingled."""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", title.lower())).strip()
+
+
+def canonical_source(source: str) -> str:
+    source = source.strip().lower()
+    source = re.sub(r"^(?:https?://)?(?:www\.)?", "", source)
+    return re.sub(r"\.(?:com|net|org|co\.uk)$", "", source)
+
+
+def canonical_url(url: str) -> str:
+    """Host and path only: tracking parameters, fragments and `www.` do not make a different story."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+## MINHASH ##
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def minhash(features: set[str]) -> tuple[int, ...]:
+    hashes = [int.from_bytes(hashlib.blake2b(f.encode(), digest_size=8).digest(), "little") for f in features]
+    return tuple(min([h ^ mask for h in hashes]) for mask in _MASKS)
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+## INDEX ##
+
+class NewsIndex:
+    """
+    Streaming near-duplicate index. `add` each record as it arrives; it joins the story it
+    duplicates or starts a new one. `top` ranks the stories collected so far.
+    """
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD, bands: int = BANDS, window_hours: float = DUPLICATE_WINDOW_HOURS):
+        self.threshold = threshold
+        self.window = window_hours * 3600
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.received = 0
+        self.stories: list[NewsStory] = []
+        self._signatures: list[tuple[int, ...]] = []
+        self._buckets: dict[tuple[int, tuple[int, ...]], list[int]] = {}
+        self._keys: list[str] = []
+        self._by_url: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.stories)
+
+    def _band_keys(self, signature: tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def _match(self, key: str, url: str, date: datetime, signature: tuple[int, ...]) -> int | None:
+        if url in self._by_url:
+            return self._by_url[url]
+        candidates = {i for band in self._band_keys(signature) for i in self._buckets.get(band, ())}
+        best, best_similarity = None, self.threshold
+        for i in candidates:
+            if abs((self.stories[i].date - date).total_seconds()) > self.window:
+                continue
+            if self._keys[i] == key:
+                return i
+            s = similarity(signature, self._signatures[i])
+            if s >= best_similarity:
+                best, best_similarity = i, s
+        return best
+
+    def add(self, item: CompanyNewsReponse) -> NewsStory:
+        self.received += 1
+        title = clean_title(item.title, item.source)
+        key = title_key(title)
+        url = canonical_url(item.url)
+        date = as_utc(item.date)
+        signature = minhash(shingles(key))
+
+        match = self._match(key, url, date, signature)
+        if match is None:
+            story = NewsStory(
+                title=title, source=item.source, date=date, url=item.url,
+                sentiment=item.sentiment, sources=[item.source],
+            )
+            index = len(self.stories)
+            self.stories.append(story)
+            self._keys.append(key)
+            self._signatures.append(signature)
+            for band in self._band_keys(signature):
+                self._buckets.setdefault(band, []).append(index)
+        else:
+            index = match
+            story = self.stories[index]
+            story.duplicates += 1
+            if item.source not in story.sources:
+                story.sources.append(item.source)
+            if source_weight(item.source) > source_weight(story.source):
+                story.title, story.source, story.url = title, item.source, item.url
+                story.sentiment = item.sentiment or story.sentiment
+            story.date = max(story.date, date)
+        self._by_url.setdefault(url, index)
+        return story
+
+    def extend(self, items: Iterable[CompanyNewsReponse]) -> "NewsIndex":
+        for item in items:
+            self.add(item)
+        return self
+
+    def top(self, k: int | None = NEWS_TOP_K, as_of: datetime | None = None) -> list[NewsStory]:
+        """
+        The k best stories (all of them with k=None) by recency (half-life RECENCY_HALF_LIFE_HOURS before `as_of`,
+        default the newest story), source weight and coverage.
+        """
+        if not self.stories:
+            return []
+        as_of = as_utc(as_of) if as_of else max(s.date for s in self.stories)
+        for story in self.stories:
+            age_hours = max((as_of - story.date).total_seconds() / 3600, 0.0)
+            recency = 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+            coverage = 1 + math.log1p(story.duplicates)
+            story.score = round(recency * source_weight(story.source) * coverage, 6)
+        return sorted(self.stories, key=lambda s: (s.score, s.date), reverse=True)[:k]
+
+
+def source_weight(source: str) -> float:
+    return SOURCE_WEIGHTS.get(canonical_source(source), DEFAULT_SOURCE_WEIGHT)
+
+
+def build_news_digest(
+    ticker: str,
+    news: CompanyNewsResponse,
+    k: int | None = NEWS_TOP_K,
+    as_of: datetime | None = None) -> NewsDigest:
+    """Collapse and rank a news response. Module-level so it can run in the CPU executor."""
+    index = NewsIndex().extend(news.news)
+    return NewsDigest(ticker=ticker.upper(), stories=index.top(k, as_of), received=index.received, unique=len(index))
@@ -0,0 +1,259 @@
+"""
+Rolling news sentiment per ticker.
+
+Financial Datasets labels every news item positive, neutral or negative. The aggregator
+keeps, per ticker, a ring of daily counts covering the longest window, plus running
+totals for each window (CONFIG.sentiment_windows, in days). Adding an article touches
+its day's bucket and each window total; moving a ticker's clock forward retires the
+days that fell out of each window. Both are O(1) per article, however long the ticker
+has been tracked. Articles are keyed by URL within their day, so polling the same
+headlines again does not count them twice.
+
+`query` answers for the whole watchlist at once, and `to_prompt` renders one ticker's
+daily series and window scores in a few lines for the LLM.
+"""
+
+import threading
+from datetime import date, datetime, timezone
+from typing import Iterable
+
+from pydantic import BaseModel, Field
+
+from backend.src.agents.company_news_agent.model import CompanyNewsReponse
+from backend.src.config import CONFIG
+
+LABELS = ("positive", "neutral", "negative")
+# Provider labels -> index in LABELS
+LABEL_ALIASES = {
+    "positive": 0, "bullish": 0,
+    "neutral": 1, "mixed": 1,
+    "negative": 2, "bearish": 2,
+}
+
+
+class WindowSentiment(BaseModel):
+    days: int
+    positive: int = 0
+    neutral: int = 0
+    negative: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.positive + self.neutral + self.negative
+
+    @property
+    def score(self) -> float | None:
+        """(positive - negative) / total, in [-1, 1]; None without articles."""
+        return (self.positive - self.negative) / self.total if self.total else None
+
+
+class DailySentiment(BaseModel):
+    day: date
+    positive: int
+    neutral: int
+    negative: int
+
+
+class TickerSentiment(BaseModel):
+    ticker: str
+    as_of: date
+    windows: list[WindowSentiment] = Field(default_factory=list, description="Shortest window first")
+    series: list[DailySentiment] = Field(default_factory=list, description="Days with articles, oldest first")
+
+    def window(self, days: int) -> WindowSentiment | None:
+        return next((w for w in self.windows if w.days == days), None)
+
+
+class SeriesState(BaseModel):
+    """Serialized ring of one ticker, for keeping the aggregator across restarts."""
+    latest: int = Field(..., description="date.toordinal() of the newest day in the ring")
+    days: dict[int, list[int]] = Field(default_factory=dict, description="Day ordinal -> counts per label")
+    seen: dict[int, list[str]] = Field(default_factory=dict, description="Day ordinal -> article URLs")
+
+
+class SentimentState(BaseModel):
+    windows: list[int]
+    tickers: dict[str, SeriesState] = Field(default_factory=dict)
+
+
+def article_day(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date().toordinal()
+
+
+class _Series:
+    """Ring of daily label counts for one ticker, with a running total per window."""
+
+    def __init__(self, windows: tuple[int, ...], latest: int):
+        self.windows = windows
+        self.size = windows[-1]
+        self.latest = latest
+        self.buckets = [[0, 0, 0] for _ in range(self.size)]
+        self.seen: list[set[str]] = [set() for _ in range(self.size)]
+        self.sums = {w: [0, 0, 0] for w in windows}
+
+    def advance(self, day: int) -> None:
+        """Move the newest day forward to `day`, retiring days that leave each window."""
+        if day <= self.latest:
+            return
+        if day - self.latest >= self.size:
+            # Every tracked day is out of range
+            self.buckets = [[0, 0, 0] for _ in range(self.size)]
+            self.seen = [set() for _ in range(self.size)]
+            self.sums = {w: [0, 0, 0] for w in self.windows}
+            self.latest = day
+            return
+        for new_day in range(self.latest + 1, day + 1):
+            for w, total in self.sums.items():
+                old = self.buckets[(new_day - w) % self.size]
+                for i in range(3):
+                    total[i] -= old[i]
+            slot = new_day % self.size
+            self.buckets[slot] = [0, 0, 0]
+            self.seen[slot] = set()
+        self.latest = day
+
+    def add(self, day: int, label: int, key: str) -> bool:
+        if day > self.latest:
+            self.advance(day)
+        if day <= self.latest - self.size:
+            return False
+        slot = day % self.size
+        if key in self.seen[slot]:
+            return False
+        self.seen[slot].add(key)
+        self.buckets[slot][label] += 1
+        for w, total in self.sums.items():
+            if day > self.latest - w:
+                total[label] += 1
+        return True
+
+    def snapshot(self, ticker: str) -> TickerSentiment:
+        series = []
+        for day in range(self.latest - self.size + 1, self.latest + 1):
+            counts = self.buckets[day % self.size]
+            if any(counts):
+                series.append(DailySentiment(day=date.fromordinal(day), positive=counts[0], neutral=counts[1], negative=counts[2]))
+        return TickerSentiment(
+            ticker=ticker,
+            as_of=date.fromordinal(self.latest),
+            windows=[WindowSentiment(days=w, positive=s[0], neutral=s[1], negative=s[2]) for w, s in self.sums.items()],
+            series=series,
+        )
+
+    def to_state(self) -> SeriesState:
+        days = range(self.latest - self.size + 1, self.latest + 1)
+        return SeriesState(
+            latest=self.latest,
+            days={d: list(self.buckets[d % self.size]) for d in days if any(self.buckets[d % self.size])},
+            seen={d: sorted(self.seen[d % self.size]) for d in days if self.seen[d % self.size]},
+        )
+
+
+class SentimentAggregator:
+    """
+    Rolling sentiment for any number of tickers. Thread-safe: the watchlist feeds it from
+    the polling threads of many tickers at once.
+
+    windows: window lengths in days (defaults to CONFIG.sentiment_windows)
+    """
+
+    def __init__(self, windows: Iterable[int] | None = None):
+        self.windows = tuple(sorted(set(windows or CONFIG.sentiment_windows)))
+        self._series: dict[str, _Series] = {}
+        self._lock = threading.Lock()
+        self.unlabeled = 0
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker.upper() in self._series
+
+    def add(self, ticker: str, article: CompanyNewsReponse) -> bool:
+        """Count one article; False when it is unlabeled, too old for the ring or already counted."""
+        label = LABEL_ALIASES.get((article.sentiment or "").strip().lower())
+        if label is None:
+            self.unlabeled += 1
+            return False
+        ticker = ticker.upper()
+        day = article_day(article.date)
+        with self._lock:
+            series = self._series.get(ticker)
+            if series is None:
+                series = self._series[ticker] = _Series(self.windows, day)
+            return series.add(day, label, article.url)
+
+    def add_many(self, ticker: str, articles: Iterable[CompanyNewsReponse]) -> int:
+        return sum(self.add(ticker, article) for article in articles)
+
+    def snapshot(self, ticker: str, as_of: date | None = None) -> TickerSentiment | None:
+        """One ticker's windows and daily series, with its clock moved to `as_of` if that is later."""
+        with self._lock:
+            series = self._series.get(ticker.upper())
+            if series is None:
+                return None
+            if as_of is not None:
+                series.advance(as_of.toordinal())
+            return series.snapshot(ticker.upper())
+
+    def query(self, tickers: Iterable[str] | None = None, as_of: date | None = None) -> list[TickerSentiment]:
+        """Sentiment of every tracked ticker (or of `tickers`), on a common `as_of` day."""
+        names = [t.upper() for t in tickers] if tickers is not None else sorted(self._series)
+        return [s for s in (self.snapshot(t, as_of) for t in names) if s is not None]
+
+    def format_table(self, tickers: Iterable[str] | None = None, as_of: date | None = None) -> str:
+        """Plain-text table of window scores for the watchlist, best score in the middle window first."""
+        rows = self.query(tickers, as_of)
+        if not rows:
+            return "No sentiment recorded"
+        key_window = self.windows[len(self.windows) // 2]
+        rows.sort(key=lambda r: (r.window(key_window).score or 0.0), reverse=True)
+        width = max(len("TICKER"), *(len(r.ticker) for r in rows))
+        header = "  ".join(f"{f'{w}d':>12}" for w in self.windows)
+        lines = [f"{'TICKER':<{width}}  {header}"]
+        for r in rows:
+            cells = "  ".join(
+                f"{(f'{w.score:+.2f}' if w.score is not None else '-'):>6} ({w.total:>3})" for w in r.windows
+            )
+            lines.append(f"{r.ticker:<{width}}  {cells}")
+        return "\n".join(lines)
+
+    def to_prompt(self, ticker: str, as_of: date | None = None, days: int | None = None) -> str:
+        """Window scores and the daily series of the last `days` days (default: longest window) in compact lines."""
+        sentiment = self.snapshot(ticker, as_of)
+        if sentiment is None or not sentiment.series:
+            return "No labeled news sentiment"
+        lines = [
+            f"{w.days}d: {w.total} articles, +{w.positive}/={w.neutral}/-{w.negative}, "
+            f"score {w.score:+.2f}" if w.score is not None else f"{w.days}d: no articles"
+            for w in sentiment.windows
+        ]
+        days = days or self.windows[-1]
+        first = sentiment.as_of.toordinal() - days + 1
+        lines.extend(
+            f"{d.day.isoformat()} +{d.positive}/={d.neutral}/-{d.negative}"
+            for d in sentiment.series if d.day.toordinal() >= first
+        )
+        return "\n".join(lines)
+
+    def to_state(self) -> SentimentState:
+        with self._lock:
+            return SentimentState(windows=list(self.windows), tickers={t: s.to_state() for t, s in self._series.items()})
+
+    @classmethod
+    def from_state(cls, state: SentimentState, windows: Iterable[int] | None = None) -> "SentimentAggregator":
+        """Rebuild from a saved state; the window totals are recomputed, so `windows` may differ from the saved ones."""
+        aggregator = cls(windows or state.windows)
+        for ticker, saved in state.tickers.items():
+            series = aggregator._series[ticker] = _Series(aggregator.windows, saved.latest)
+            for day, counts in saved.days.items():
+                if day <= series.latest - series.size:
+                    continue
+                series.buckets[day % series.size] = list(counts)
+                for w, total in series.sums.items():
+                    if day > series.latest - w:
+                        for i in range(3):
+                            total[i] += counts[i]
+            for day, urls in saved.seen.items():
+                if day > series.latest - series.size:
+                    series.seen[day % series.size] = set(urls)
+        return aggregator
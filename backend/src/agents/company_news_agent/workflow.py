@@ -1,7 +1,8 @@
 """
-Financial Metrics Agent Workflow
-This module contains the FinancialMetricsAgent class, which is responsible for analyzing financial metrics 
-using a language model (LLM) and fetching data from a financial datasets API.
+Company News Agent Workflow
+This module contains the CompanyNewsAgent class, which fetches a company's recent news, collapses
+syndicated near-duplicates and asks a language model (LLM) to analyze the top stories.
+With a focus and a shared ContextIndex, earlier headlines on the focus topic are added as well.
 """
 
 from backend.src.client.anthropic_client import ChatCompletionRequest, ChatMessage, ChatCompletionResponse, AnthropicClient
@@ -10,9 +11,35 @@ from backend.src.config import CONFIG
 from pydantic import BaseModel, ConfigDict, Field
 from typing import Any, Dict, List, Optional
 import asyncio
-from anthropic import Anthropic
-from textwrap import dedent
 from backend.src.agents.company_news_agent.model import CompanyNewsRequest, CompanyNewsResponse
+from backend.src.agents.company_news_agent.pipeline import NEWS_TOP_K, build_news_digest
+from backend.src.agents.company_news_agent.sentiment import SentimentAggregator
+from backend.src.agents.context_index import ContextIndex
+from backend.src.executor import run_cpu
+from backend.src.logger import get_logger, LazyRepr
+
+logger = get_logger(__name__)
+
+EARLIER_HEADLINES_MAX_WORDS = 120
+
+# Filled in with a single `format`, so braces in headlines are never read as fields
+NEWS_PROMPT = """You are an expert financial analyst with a Chartered Financial Analyst (CFA) designation.
+        You are tasked with analyzing the recent news of a company and its impact on the financial metrics.
+        You are given the following financial metrics:
+        - Ticker: {ticker}
+        - Start Date: {start_date}
+        - End Date: {end_date}
+        - Limit: {limit}'
+
+
+        Here are the {shown} most relevant of {unique} distinct stories, best first
+        (date | outlet, with other outlets that carried it | sentiment | headline):
+        {news}
+
+        News sentiment by window, then per day (+positive/=neutral/-negative articles):
+        {sentiment}
+        {earlier}
+                    \n"""
 
 
 class CompanyNewsAgent(BaseModel):
@@ -21,26 +48,30 @@ class CompanyNewsAgent(BaseModel):
     financial_client: FinancialDatasetsClient
     anthropic_client: AnthropicClient
     company_news_request: CompanyNewsRequest
+    news_top_k: int = Field(NEWS_TOP_K, ge=1, description="Stories sent to the LLM after collapsing near-duplicates")
+    focus: str | None = Field(None, description="Topic or query the headlines are chosen for (see context_index.TOPICS); recency and source otherwise")
+    sentiment: SentimentAggregator | None = Field(None, description="Shared rolling sentiment, e.g. the watchlist's; a fresh one per run otherwise")
+    context_index: ContextIndex | None = Field(None, description="Shared index of earlier headlines, searched when there is a focus")
+    earlier_max_words: int = Field(EARLIER_HEADLINES_MAX_WORDS, ge=0, description="Words of earlier headlines sent with a focus")
 
     async def _get_company_news(self, news_request: CompanyNewsRequest) -> CompanyNewsResponse | None:
         # Implementation here
         try:
-            company_news = self.financial_client.fetch_company_news(
+            # The client is blocking; keep it off the event loop
+            company_news = await asyncio.to_thread(
+                self.financial_client.fetch_company_news,
                 ticker=news_request.ticker,
                 limit=news_request.limit,
                 start_date=news_request.start_date,
                 end_date=news_request.end_date
             )
 
-            print("\nCOMPANY NEWS: ", company_news)
-            
-
-            print(f"NEWS: {company_news}")
+            logger.debug("Company news: %s", LazyRepr(company_news))
         except Exception as e:
-            print(f"Error fetching company news: {e}")
+            logger.error("Error fetching company news: %s", e)
             return None
         if not company_news:
-            print("No company news found.")
+            logger.warning("No company news found.")
             return None
 
         return company_news
@@ -53,18 +84,50 @@ class CompanyNewsAgent(BaseModel):
         if not company_news_response:
             return "No company news available"
 
-        prompt = dedent(f"""You are an expert financial analyst with a Chartered Financial Analyst (CFA) designation.
-        You are tasked with analyzing the recent news of a company and its impact on the financial metrics.
-        You are given the following financial metrics:
-        - Ticker: {self.company_news_request.ticker}
-        - Start Date: {self.company_news_request.start_date}
-        - End Date: {self.company_news_request.end_date}
-        - Limit: {self.company_news_request.limit}'
-
-
-        Here is the recent news:
-        {company_news_response}
-                    \n""")
+        digest = await run_cpu(
+            build_news_digest,
+            self.company_news_request.ticker,
+            company_news_response,
+            None if self.focus else self.news_top_k,
+            self.company_news_request.end_date,
+        )
+        if self.focus:
+            # Rank the collapsed stories by relevance to the focus instead
+            index = ContextIndex()
+            index.add_news(digest.ticker, digest.stories)
+            by_title = {story.title: story for story in digest.stories}
+            hits = index.search(digest.ticker, self.focus, kinds=("news",), k=self.news_top_k)
+            digest.stories = [by_title[hit.passage.text] for hit in hits] or digest.stories[:self.news_top_k]
+        earlier = ""
+        if self.focus and self.context_index is not None:
+            end_date = self.company_news_request.end_date
+            passages = await asyncio.to_thread(
+                self.context_index.history, digest.ticker, self.focus, "news", "\n".join(by_title),
+                end_date.date() if end_date else None, self.earlier_max_words,
+            )
+            earlier = "\n".join(f"{p.date or '-'} | {p.source or '-'} | {p.text}" for p in passages)
+            self.context_index.add_news(digest.ticker, by_title.values())
+        logger.info(
+            "📰 %s: %d news items collapsed to %d stories, sending the top %d",
+            digest.ticker, digest.received, digest.unique, len(digest.stories),
+        )
+        sentiment = self.sentiment or SentimentAggregator()
+        sentiment.add_many(self.company_news_request.ticker, company_news_response.news)
+        end_date = self.company_news_request.end_date
+        sentiment_series = sentiment.to_prompt(self.company_news_request.ticker, as_of=end_date.date() if end_date else None)
+
+        request = self.company_news_request
+        prompt = NEWS_PROMPT.format(
+            ticker=request.ticker,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            limit=request.limit,
+            shown=len(digest.stories),
+            unique=digest.unique,
+            news=digest.to_prompt(),
+            sentiment=sentiment_series,
+            earlier=f"\nEarlier headlines on {self.focus} (date | outlet | headline):\n{earlier}\n" if earlier else "",
+        )
             # Add more metrics as needed
 
         return prompt
@@ -0,0 +1,390 @@
+"""
+Local relevance index over news and web-search context.
+
+A BM25 index of passages: news headlines (one passage per story) and web-search
+analyses (split into paragraphs), each tagged with its ticker, kind and date. Passages
+are added incrementally; term statistics are updated in place, so adding a run's output
+costs only its own tokens. Postings are kept per ticker, so a query for one ticker only
+touches that ticker's passages.
+
+Queries are free text or one of TOPICS, which expand to a fixed set of terms:
+
+    index.search("AAPL", "earnings", kinds=("web_search",), k=5)
+
+Agents use it to send only the passages that matter for the question at hand: the
+recommendation keeps the most relevant paragraphs of a long web-search analysis, and the
+news agent can focus its headlines on a topic.
+
+The clients share one index across runs. The first query for a ticker loads its history:
+the web-search outputs checkpointed in the run store and the headlines in the time-series
+store. Each run then adds its own web search, so the recommendation also gets the most
+relevant passages of earlier analyses, and a focused news agent the earlier headlines on
+its topic.
+
+    python -m backend.src.agents.context_index AAPL earnings --k 5
+"""
+
+import argparse
+import hashlib
+import math
+import re
+import threading
+from collections import Counter
+import datetime as dt
+from datetime import date
+from typing import Iterable
+
+from pydantic import BaseModel, Field
+
+from backend.src.agents.company_news_agent.pipeline import NewsStory
+from backend.src.agents.run_store import RunStore, decode_output
+from backend.src.logger import get_logger
+from backend.src.timeseries.store import TimeSeriesStore, iso_day
+
+logger = get_logger(__name__)
+
+## INDEX CONFIGURATION ##
+BM25_K1 = 1.5
+BM25_B = 0.75
+MAX_PASSAGE_WORDS = 120
+MIN_PASSAGE_WORDS = 20
+# Candidates scored when picking earlier passages that fit a word budget
+HISTORY_CANDIDATES = 50
+
+# Topic name -> query terms
+TOPICS = {
+    "earnings": "earnings revenue eps profit margin beat miss quarter results guidance",
+    "guidance": "guidance outlook forecast expects raised lowered reaffirmed",
+    "products": "product launch release demand sales iphone chip device service platform",
+    "legal": "lawsuit regulator regulatory antitrust fine probe investigation settlement court",
+    "management": "ceo cfo executive board resigns appoints management succession",
+    "capital": "buyback dividend acquisition merger debt offering stake deal",
+    "macro": "rates inflation tariff economy recession fed china supply chain",
+    "risks": "risk risks headwinds decline weak pressure concern downgrade competition",
+    "catalysts": "catalyst growth upgrade expansion opportunity momentum partnership",
+}
+RECOMMENDATION_QUERY = " ".join(TOPICS[t] for t in ("earnings", "guidance", "risks", "catalysts", "macro"))
+
+_STOPWORDS = frozenset("""
+a an and are as at be been but by for from has have he her his i if in into is it its
+of on or our she so than that the their them then there these they this to was we were
+what when which who will with would you your said says not no can could may might also
+""".split())
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class Passage(BaseModel):
+    id: int
+    ticker: str
+    kind: str = Field(..., description="'news' or 'web_search'")
+    text: str
+    date: dt.date | None = None
+    source: str | None = Field(None, description="Outlet or run key the passage came from")
+    position: int = Field(0, description="Order within its source document")
+
+
+class SearchHit(BaseModel):
+    passage: Passage
+    score: float
+
+
+## TEXT PROCESSING ##
+
+def _strip(token: str, suffix: str, replacement: str = "") -> str:
+    if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+        return token[: len(token) - len(suffix)] + replacement
+    return token
+
+
+def stem(token: str) -> str:
+    """
+    Light suffix stripping: the plural, then -ing/-ed, then a final e, so 'earnings'/'earning'/'earn',
+    'raised'/'raise', 'rates'/'rate' and 'prices'/'price' each share a stem.
+    """
+    token = _strip(token, "'s")
+    if token.endswith("ies"):
+        token = _strip(token, "ies", "y")
+    elif token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        token = _strip(token, "s")
+    for suffix in ("ing", "ed"):
+        stripped = _strip(token, suffix)
+        if stripped != token:
+            # stopped -> stop, but sell/miss/buzz keep their double letter
+            if len(stripped) > 3 and stripped[-1] == stripped[-2] and stripped[-1] not in "lsz":
+                stripped = stripped[:-1]
+            token = stripped
+            break
+    if token.endswith("e") and not token.endswith("ee"):
+        token = _strip(token, "e")
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    return [stem(t) for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+def split_passages(text: str, max_words: int = MAX_PASSAGE_WORDS, min_words: int = MIN_PASSAGE_WORDS) -> list[str]:
+    """
+    Paragraphs of a markdown document as passages: short paragraphs (headings, one-line
+    bullets) are joined to the next one, long ones are cut at sentence boundaries.
+    """
+    passages, pending = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        pending = f"{pending}\n{paragraph}" if pending else paragraph
+        if len(pending.split()) < min_words:
+            continue
+        chunk = []
+        for sentence in _SENTENCE_END.split(pending):
+            if chunk and len(" ".join(chunk).split()) + len(sentence.split()) > max_words:
+                passages.append(" ".join(chunk))
+                chunk = []
+            chunk.append(sentence)
+        passages.append(" ".join(chunk))
+        pending = ""
+    if pending:
+        passages.append(pending)
+    return passages
+
+
+## INDEX ##
+
+class ContextIndex:
+    """
+    Incremental BM25 index of passages, with postings per ticker. Thread-safe.
+    Identical passages of the same ticker and kind are stored once.
+    """
+
+    def __init__(self, run_store: RunStore | None = None, news_store: TimeSeriesStore | None = None):
+        """
+        run_store: where `load_history` finds a ticker's checkpointed web-search outputs
+        news_store: where `load_history` finds a ticker's stored headlines
+        """
+        self.run_store = run_store
+        self.news_store = news_store
+        self._history_loaded: set[str] = set()
+        self.passages: dict[int, Passage] = {}
+        self._lengths: dict[int, int] = {}
+        self._total_length = 0
+        self._df: Counter = Counter()
+        # ticker -> term -> passage id -> term frequency
+        self._postings: dict[str, dict[str, dict[int, int]]] = {}
+        self._digests: dict[tuple[str, str, str], int] = {}
+        self._digest_of: dict[int, tuple[str, str, str]] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def add(
+        self,
+        ticker: str,
+        kind: str,
+        text: str,
+        when: date | None = None,
+        source: str | None = None,
+        position: int = 0) -> Passage | None:
+        """Index one passage; returns None if it is empty or already indexed."""
+        ticker = ticker.upper()
+        terms = Counter(tokenize(text))
+        if not terms:
+            return None
+        digest = (ticker, kind, hashlib.sha1(text.encode()).hexdigest())
+        with self._lock:
+            if digest in self._digests:
+                return None
+            passage = Passage(id=self._next_id, ticker=ticker, kind=kind, text=text, date=when, source=source, position=position)
+            self._next_id += 1
+            self._digests[digest] = passage.id
+            self._digest_of[passage.id] = digest
+            self.passages[passage.id] = passage
+            length = sum(terms.values())
+            self._lengths[passage.id] = length
+            self._total_length += length
+            postings = self._postings.setdefault(ticker, {})
+            for term, tf in terms.items():
+                postings.setdefault(term, {})[passage.id] = tf
+                self._df[term] += 1
+            return passage
+
+    def add_document(self, ticker: str, kind: str, text: str, when: date | None = None, source: str | None = None) -> list[Passage]:
+        """Split a document into passages and index them in order."""
+        added = [self.add(ticker, kind, p, when, source, i) for i, p in enumerate(split_passages(text))]
+        return [p for p in added if p is not None]
+
+    def add_news(self, ticker: str, stories: Iterable[NewsStory]) -> list[Passage]:
+        added = [self.add(ticker, "news", s.title, s.date.date(), s.source) for s in stories]
+        return [p for p in added if p is not None]
+
+    def load_history(self, ticker: str) -> int:
+        """Index `ticker`'s earlier web-search outputs and headlines; only the first call per ticker reads them."""
+        ticker = ticker.upper()
+        with self._lock:
+            if ticker in self._history_loaded:
+                return 0
+            self._history_loaded.add(ticker)
+        added = 0
+        try:
+            if self.run_store is not None:
+                added += index_run_store(self, self.run_store, ticker)
+            if self.news_store is not None:
+                for row in self.news_store.query("news", [ticker]):
+                    when = date.fromisoformat(iso_day(row["date"])) if row.get("date") else None
+                    added += self.add(ticker, "news", row.get("title") or "", when, row.get("source")) is not None
+        except Exception as e:
+            logger.warning("Could not load the context history of %s: %s", ticker, e)
+        if added:
+            logger.info("🗂️ Indexed %d earlier passages of %s", added, ticker)
+        return added
+
+    def history(
+        self,
+        ticker: str,
+        query: str,
+        kind: str,
+        exclude: str = "",
+        before: date | None = None,
+        max_words: int = 300) -> list[Passage]:
+        """
+        The passages of `kind` that earlier runs left for `ticker` most relevant to `query`,
+        within about `max_words`: with `before`, only passages dated on or before it (undated ones
+        cannot be placed in time and are left out), and none contained in `exclude` (what the
+        current run already sends).
+        """
+        self.load_history(ticker)
+        exclude = " ".join(exclude.split())
+        chosen, words = [], 0
+        for hit in self.search(ticker, query, kinds=(kind,), k=HISTORY_CANDIDATES):
+            passage = hit.passage
+            if " ".join(passage.text.split()) in exclude or (before and (passage.date is None or passage.date > before)):
+                continue
+            length = len(passage.text.split())
+            if words + length > max_words:
+                continue
+            chosen.append(passage)
+            words += length
+        return chosen
+
+    def remove(self, passage_id: int) -> bool:
+        with self._lock:
+            passage = self.passages.pop(passage_id, None)
+            if passage is None:
+                return False
+            self._total_length -= self._lengths.pop(passage_id)
+            postings = self._postings[passage.ticker]
+            for term in set(tokenize(passage.text)):
+                docs = postings.get(term)
+                if docs is not None and docs.pop(passage_id, None) is not None:
+                    self._df[term] -= 1
+                    if not docs:
+                        del postings[term]
+                    if self._df[term] <= 0:
+                        del self._df[term]
+            del self._digests[self._digest_of.pop(passage_id)]
+            return True
+
+    def search(
+        self,
+        ticker: str | None,
+        query: str,
+        kinds: Iterable[str] | None = None,
+        k: int = 5,
+        ids: set[int] | None = None) -> list[SearchHit]:
+        """
+        Top `k` passages for `query` (free text, or a TOPICS name) by BM25.
+        ticker: restrict to one ticker's passages (None searches all)
+        kinds: restrict to these passage kinds
+        ids: restrict to these passages, e.g. the ones a run just added
+        """
+        terms = tokenize(TOPICS.get(query.strip().lower(), query))
+        kinds = set(kinds) if kinds is not None else None
+        with self._lock:
+            n = len(self.passages)
+            if not n or not terms:
+                return []
+            avg_length = self._total_length / n
+            tickers = [ticker.upper()] if ticker else list(self._postings)
+            scores: Counter = Counter()
+            for term in set(terms):
+                df = self._df.get(term)
+                if not df:
+                    continue
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                weight = idf * terms.count(term)
+                for t in tickers:
+                    for passage_id, tf in self._postings.get(t, {}).get(term, {}).items():
+                        if ids is not None and passage_id not in ids:
+                            continue
+                        if kinds is not None and self.passages[passage_id].kind not in kinds:
+                            continue
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[passage_id] / avg_length)
+                        scores[passage_id] += weight * tf * (BM25_K1 + 1) / (tf + norm)
+            return [SearchHit(passage=self.passages[i], score=round(s, 4)) for i, s in scores.most_common(k)]
+
+
+def select_passages(
+    text: str,
+    query: str = RECOMMENDATION_QUERY,
+    max_words: int = 600,
+    ticker: str = "_",
+    kind: str = "web_search") -> str:
+    """
+    The most relevant passages of `text` for `query`, in their original order, within
+    about `max_words`. Text that is already short enough is returned unchanged.
+    """
+    if len(text.split()) <= max_words:
+        return text
+    index = ContextIndex()
+    passages = index.add_document(ticker, kind, text)
+    ranked = index.search(ticker, query, k=len(passages))
+    chosen, words = [], 0
+    for hit in ranked:
+        length = len(hit.passage.text.split())
+        if chosen and words + length > max_words:
+            continue
+        chosen.append(hit.passage)
+        words += length
+    # Passages that matched no query term still count if there is room
+    for passage in passages:
+        if passage.id not in {p.id for p in chosen} and words + len(passage.text.split()) <= max_words:
+            chosen.append(passage)
+            words += len(passage.text.split())
+    return "\n\n".join(p.text for p in sorted(chosen, key=lambda p: p.position))
+
+
+def index_run_store(index: ContextIndex, store: RunStore | None = None, ticker: str | None = None) -> int:
+    """
+    Add the checkpointed web-search outputs of every run (or one ticker's) to `index`, dated
+    by when they were produced: a search run today for an old window still holds today's web.
+    """
+    store = store or RunStore()
+    added = 0
+    for record in store.list_runs():
+        stage = record.stages.get("web_search")
+        if stage is None or stage.status != "ok" or (ticker and record.ticker != ticker.upper()):
+            continue
+        output = decode_output(stage.output)
+        if isinstance(output, str):
+            saved_on = date.fromtimestamp(stage.saved_at)
+            added += len(index.add_document(record.ticker, "web_search", output, saved_on, record.key))
+    return added
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the web-search outputs stored in the run store.")
+    parser.add_argument("ticker")
+    parser.add_argument("query", help=f"Free text or a topic: {', '.join(TOPICS)}")
+    parser.add_argument("--k", type=int, default=5, help="Passages to return")
+    parser.add_argument("--root", default=None, help="Run store directory (defaults to RUN_STORE_DIR)")
+    args = parser.parse_args()
+
+    context_index = ContextIndex()
+    added = index_run_store(context_index, RunStore(args.root), args.ticker)
+    print(f"Indexed {added} passages of {args.ticker.upper()}")
+    for hit in context_index.search(args.ticker, args.query, k=args.k):
+        p = hit.passage
+        print(f"\n[{hit.score:.2f}] {p.kind} {p.date or ''} {p.source or ''}\n{p.text}")
@@ -0,0 +1,311 @@
+"""
+Small DAG execution engine for the agent workflow.
+
+Each `AgentNode` declares the outputs it consumes (`inputs`) and the output it produces.
+A node starts as soon as its own inputs are available, so independent branches never
+wait on a global barrier. Outputs are memoized per node on the `AgentDAG` instance, and
+every run reports the critical path that bounded its wall time.
+
+Runs can be given a deadline and nodes a time budget. A node that misses its budget (or
+raises, or returns None) is cancelled and its output is None; downstream nodes still run
+on whatever finished, and the result lists what is missing.
+
+Outputs can be seeded from a previous run (`seed`), and `on_node_done` is called as each
+node completes, which is how checkpoints are written.
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from backend.src.deadline import deadline_scope, remaining_time
+from backend.src.tracing import span
+from backend.src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AgentNode(BaseModel):
+    """
+    One unit of work in the DAG.
+
+    `run` is called with one keyword argument per entry in `inputs`, holding the
+    output of the node that produces it.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str = Field(..., description="Unique node name")
+    run: Callable[..., Awaitable[Any]] = Field(..., description="Coroutine function producing the output")
+    inputs: list[str] = Field(default_factory=list, description="Outputs this node depends on")
+    output: str | None = Field(None, description="Name of the produced output; defaults to the node name")
+    timeout: float | None = Field(None, gt=0, description="Time budget in seconds, capped by the run deadline")
+
+    @property
+    def output_name(self) -> str:
+        return self.output or self.name
+
+
+NodeStatus = Literal["ok", "cached", "skipped", "timeout", "failed"]
+
+
+class NodeTiming(BaseModel):
+    """Start/finish offsets of a node, in seconds from the start of the run."""
+    name: str
+    started: float
+    finished: float
+    status: NodeStatus = "ok"
+    error: str | None = None
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+    @property
+    def cached(self) -> bool:
+        return self.status == "cached"
+
+
+class DAGRunResult(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    results: dict[str, Any] = Field(default_factory=dict, description="Output name -> value")
+    timings: dict[str, NodeTiming] = Field(default_factory=dict, description="Node name -> timing")
+    critical_path: list[str] = Field(default_factory=list, description="Node names on the critical path")
+    wall_time: float = 0.0
+
+    @property
+    def missing(self) -> list[str]:
+        """Nodes that timed out, raised or returned None, and so produced no output."""
+        return [name for name, timing in self.timings.items() if timing.status in ("timeout", "failed")]
+
+    def critical_path_summary(self) -> str:
+        """Human readable critical path, e.g. `fin_statements (12.31s) -> investment_recommendation (20.02s)`."""
+        return " -> ".join(
+            f"{name} ({self.timings[name].duration:.2f}s"
+            f"{'' if self.timings[name].status == 'ok' else ', ' + self.timings[name].status})"
+            for name in self.critical_path
+        )
+
+
+class CycleError(ValueError):
+    """Raised when the node graph is not acyclic."""
+    pass
+
+
+class AgentDAG:
+    """
+    Registry and executor for `AgentNode`s.
+
+    Usage:
+        dag = AgentDAG()
+        dag.add(AgentNode(name="metrics", run=agent.analyze_metrics_with_llm))
+        dag.add(AgentNode(name="recommendation", run=recommend, inputs=["metrics"]))
+        result = await dag.run()
+    """
+
+    def __init__(self, nodes: list[AgentNode] | None = None):
+        self._nodes: dict[str, AgentNode] = {}
+        self._producers: dict[str, str] = {}
+        self._memo: dict[str, Any] = {}
+        self._timings: dict[str, NodeTiming] = {}
+        for node in nodes or []:
+            self.add(node)
+
+    @property
+    def nodes(self) -> dict[str, AgentNode]:
+        return dict(self._nodes)
+
+    def add(self, node: AgentNode) -> AgentNode:
+        """Register a node. Node names and output names must be unique."""
+        if node.name in self._nodes:
+            raise ValueError(f"Node '{node.name}' is already registered")
+        if node.output_name in self._producers:
+            raise ValueError(f"Output '{node.output_name}' is already produced by '{self._producers[node.output_name]}'")
+        self._nodes[node.name] = node
+        self._producers[node.output_name] = node.name
+        return node
+
+    def node(self, name: str | None = None, inputs: list[str] | None = None, output: str | None = None):
+        """Decorator form of `add` for coroutine functions."""
+        def decorator(fn: Callable[..., Awaitable[Any]]):
+            self.add(AgentNode(name=name or fn.__name__, run=fn, inputs=inputs or [], output=output))
+            return fn
+        return decorator
+
+    def dependencies(self, name: str) -> list[str]:
+        """Names of the nodes that `name` directly depends on."""
+        return [self._producers[i] for i in self._nodes[name].inputs]
+
+    def downstream(self, name: str) -> set[str]:
+        """All nodes that transitively depend on `name`."""
+        found: set[str] = set()
+        frontier = [name]
+        while frontier:
+            current = frontier.pop()
+            for other in self._nodes.values():
+                if other.name not in found and current in self.dependencies(other.name):
+                    found.add(other.name)
+                    frontier.append(other.name)
+        return found
+
+    def timing(self, name: str) -> NodeTiming | None:
+        """Timing of `name` in the current (or last) run, once it has finished."""
+        return self._timings.get(name)
+
+    def seed(self, name: str, value: Any) -> None:
+        """Provide a node's output up front (e.g. from a checkpoint) so it is not run."""
+        if name not in self._nodes:
+            raise ValueError(f"Unknown node '{name}'")
+        self._memo[name] = value
+
+    def invalidate(self, *names: str) -> None:
+        """Drop memoized outputs for `names` (all nodes if empty) and everything downstream of them."""
+        targets = set(names) if names else set(self._nodes)
+        for name in list(targets):
+            targets |= self.downstream(name)
+        for name in targets:
+            self._memo.pop(name, None)
+
+    def topological_order(self) -> list[str]:
+        """Node names in dependency order. Raises on unknown inputs or cycles."""
+        for node in self._nodes.values():
+            missing = [i for i in node.inputs if i not in self._producers]
+            if missing:
+                raise ValueError(f"Node '{node.name}' depends on unknown outputs: {missing}")
+
+        in_degree = {name: len(self._nodes[name].inputs) for name in self._nodes}
+        ready = [name for name, degree in in_degree.items() if degree == 0]
+        order = []
+        while ready:
+            current = ready.pop()
+            order.append(current)
+            for other in self._nodes.values():
+                for dep in self.dependencies(other.name):
+                    if dep == current:
+                        in_degree[other.name] -= 1
+                        if in_degree[other.name] == 0:
+                            ready.append(other.name)
+        if len(order) != len(self._nodes):
+            raise CycleError(f"Cycle detected among nodes: {sorted(set(self._nodes) - set(order))}")
+        return order
+
+    def _wanted(self, order: list[str]) -> set[str]:
+        """
+        Nodes whose output is needed: every sink, plus the dependencies of any wanted
+        node that still has to run. Dependencies of memoized nodes are not needed.
+        """
+        wanted: set[str] = set()
+        for name in reversed(order):
+            dependents = [other for other in self._nodes if name in self.dependencies(other)]
+            if not dependents or any(d in wanted and d not in self._memo for d in dependents):
+                wanted.add(name)
+        return wanted
+
+    def _critical_path(self, timings: dict[str, NodeTiming]) -> list[str]:
+        """Walk back from the last node to finish, always through the dependency that finished last."""
+        if not timings:
+            return []
+        current = max(timings, key=lambda name: timings[name].finished)
+        path = [current]
+        while deps := self.dependencies(current):
+            current = max(deps, key=lambda name: timings[name].finished)
+            path.append(current)
+        return list(reversed(path))
+
+    async def run(
+        self,
+        deadline: float | None = None,
+        on_node_done: Callable[[str, NodeTiming, Any], Awaitable[None] | None] | None = None,
+    ) -> DAGRunResult:
+        """
+        Execute every node, reusing memoized outputs, and return outputs, timings and the critical path.
+
+        deadline: seconds from now after which every unfinished node is cancelled.
+        on_node_done: called with (name, timing, output) as each node finishes; errors are logged, not raised.
+        """
+        order = self.topological_order()
+        wanted = self._wanted(order)
+        started = time.perf_counter()
+        timings: dict[str, NodeTiming] = {}
+        self._timings = timings
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def notify(name: str, value: Any) -> None:
+            if on_node_done is None:
+                return
+            try:
+                maybe_awaitable = on_node_done(name, timings[name], value)
+                if inspect.isawaitable(maybe_awaitable):
+                    await maybe_awaitable
+            except Exception as e:
+                logger.error("on_node_done failed for %s: %s", name, e)
+
+        async def execute(node: AgentNode) -> Any:
+            if node.name in self._memo or node.name not in wanted:
+                now = time.perf_counter() - started
+                status = "cached" if node.name in self._memo else "skipped"
+                timings[node.name] = NodeTiming(name=node.name, started=now, finished=now, status=status)
+                value = self._memo.get(node.name)
+                await notify(node.name, value)
+                return value
+
+            values = await asyncio.gather(*(tasks[dep] for dep in self.dependencies(node.name)))
+            node_started = time.perf_counter() - started
+
+            # The node's budget, capped by what is left of the run deadline
+            budgets = [b for b in (node.timeout, remaining_time()) if b is not None]
+            budget = min(budgets) if budgets else None
+
+            logger.debug("Node %s started with budget %s", node.name, budget)
+            status, error, value = "ok", None, None
+            try:
+                if budget is not None and budget <= 0:
+                    raise asyncio.TimeoutError
+                with deadline_scope(budget), span(node.name, "agent"):
+                    value = await asyncio.wait_for(node.run(**dict(zip(node.inputs, values))), budget)
+            except asyncio.TimeoutError:
+                status, error = "timeout", (f"Missed its {budget:.1f}s budget" if budget and budget > 0 else "Deadline passed")
+                logger.warning("⏰ Node %s cancelled: %s", node.name, error)
+            except Exception as e:
+                status, error = "failed", f"{type(e).__name__}: {e}"
+                logger.error("Node %s failed: %s", node.name, error)
+            else:
+                # Agents return None when they give up; that is a failure, not an output to memoize
+                if value is None:
+                    status, error = "failed", "Returned no output"
+                    logger.error("Node %s failed: %s", node.name, error)
+
+            timings[node.name] = NodeTiming(
+                name=node.name, started=node_started, finished=time.perf_counter() - started,
+                status=status, error=error,
+            )
+            logger.debug("Node %s finished in %.2fs (%s)", node.name, timings[node.name].duration, status)
+            if status == "ok":
+                self._memo[node.name] = value
+            await notify(node.name, value)
+            return value
+
+        # Tasks are created in dependency order so every dependency's task exists first.
+        # Each task copies the current context, so they all inherit the run deadline.
+        with deadline_scope(deadline):
+            for name in order:
+                tasks[name] = asyncio.create_task(execute(self._nodes[name]), name=f"dag:{name}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        result = DAGRunResult(
+            results={self._nodes[name].output_name: task.result() for name, task in tasks.items()},
+            timings=timings,
+            critical_path=self._critical_path(timings),
+            wall_time=time.perf_counter() - started,
+        )
+        logger.debug("DAG finished in %.2fs, critical path: %s", result.wall_time, result.critical_path_summary())
+        return result
@@ -2,17 +2,59 @@
 Financial Metrics Agent Workflow
 This module contains the FinancialMetricsAgent class, which is responsible for analyzing financial metrics 
 using a language model (LLM) and fetching data from a financial datasets API.
+With a PeerEngine, the prompt also says where the latest metrics rank among the ticker's peers.
 """
 
 from backend.src.client.anthropic_client import ChatCompletionRequest, ChatMessage, ChatCompletionResponse, AnthropicClient
-from backend.src.client.fin_datasetsai import FinancialDatasetsClient
+from backend.src.client.fin_datasetsai import FinancialDatasetsClient, parse_financial_metrics
 from backend.src.config import CONFIG
 from pydantic import BaseModel, ConfigDict, Field
 from typing import Any, Dict, List, Optional
 from backend.src.agents.financial_metrics_agent.model import FinancialMetrics, FinancialMetricsResponse, FinancialMetricsRequest
 import asyncio
-from anthropic import Anthropic
 from textwrap import dedent
+from backend.src.executor import run_cpu
+from backend.src.logger import get_logger, LazyRepr
+from backend.src.timeseries.peers import PeerEngine
+
+logger = get_logger(__name__)
+
+
+def build_financial_metrics_prompt(request: FinancialMetricsRequest, data: Dict[str, Any], peer_context: str | None = None) -> str:
+    """
+    Validate a raw metrics response and render the analysis prompt.
+    Module-level so it can run in the CPU executor; only the prompt string comes back.
+    peer_context: PeerContext.format() of the latest report, if there are peers to compare with
+    """
+    metrics = parse_financial_metrics(data)
+    peers = ""
+    if peer_context:
+        peers = f"""
+How the latest report compares with peers (pNN = percentile within the group, z = z-score, n = peers reporting the metric):
+{peer_context}
+"""
+
+    prompt = dedent(f"""You are an expert financial analyst with a Chartered Financial Analyst (CFA) designation.
+You are tasked with analyzing the financial metrics of a company.
+You are given the following financial metrics:
+- Ticker: {request.ticker}
+- Period: {request.period}
+- Limit: {request.limit}'
+
+You are to analyze the following financial metrics:
+{metrics}:
+{peers}
+
+
+**DO NOT**:
+- Give a recommendation on whether to buy, sell, or hold the stock. This will be done by another agent in the workflow.
+**DO**:
+- Provide an analysis of the financial metrics, including trends, patterns, and any significant changes over the specified period.
+- Focus more on trends and patterns seen in more current time periods, rather than historical data.
+- Where peer percentiles are given, judge each metric against its peers rather than in isolation.
+                    \n""")
+
+    return prompt
 
 
 class FinancialMetricsAgent(BaseModel):
@@ -21,52 +63,54 @@ class FinancialMetricsAgent(BaseModel):
     financial_client: FinancialDatasetsClient   
     anthropic_client: AnthropicClient
     fin_metrics_request: FinancialMetricsRequest
+    peers: PeerEngine | None = None
 
 
-    async def _get_financial_metrics(self) -> FinancialMetricsResponse | None:
-        # Implementation here
+    async def _get_financial_metrics(self) -> Dict[str, Any] | None:
         try:
-            metrics = self.financial_client.fetch_financial_metrics(
+            # The client is blocking; keep it off the event loop
+            data = await asyncio.to_thread(
+                self.financial_client.fetch_financial_metrics_raw,
                 self.fin_metrics_request
             )
         except Exception as e:
-            print(f"Error fetching financial metrics: {e}")
+            logger.error("Error fetching financial metrics: %s", e)
             return None
-        if not metrics:
-            print("No financial metrics found.")
+        if not data:
+            logger.warning("No financial metrics found.")
             return None
 
-        return metrics
+        return data
+
+    async def _peer_context(self) -> str | None:
+        """Peer percentiles of the latest report; the metrics just fetched are already in the store."""
+        if self.peers is None:
+            return None
+        request = self.fin_metrics_request
+        try:
+            context = await asyncio.to_thread(
+                self.peers.context, request.ticker, request.report_period_lte, request.period,
+            )
+        except Exception as e:
+            logger.warning("Could not compute peer percentiles for %s: %s", request.ticker, e)
+            return None
+        return context.format() if context is not None else None
 
     async def _prompt_for_financial_metrics(self) -> str:
         """
         Create a prompt for the LLM to analyze financial metrics.
+        Validation and serialization run in the CPU executor.
         """
-        metrics = await self._get_financial_metrics()
-        if not metrics:
+        data = await self._get_financial_metrics()
+        if not data:
             return "No financial metrics available."
 
-        prompt = dedent(f"""You are an expert financial analyst with a Chartered Financial Analyst (CFA) designation.
-You are tasked with analyzing the financial metrics of a company.
-You are given the following financial metrics:
-- Ticker: {self.fin_metrics_request.ticker}
-- Period: {self.fin_metrics_request.period}
-- Limit: {self.fin_metrics_request.limit}'
-
-You are to analyze the following financial metrics:
-{metrics}:
-
-
-
-**DO NOT**:
-- Give a recommendation on whether to buy, sell, or hold the stock. This will be done by another agent in the workflow.
-**DO**:
-- Provide an analysis of the financial metrics, including trends, patterns, and any significant changes over the specified period.
-- Focus more on trends and patterns seen in more current time periods, rather than historical data.
-                    \n""")
-        # Add more metrics as needed
-
-        return prompt
+        peer_context = await self._peer_context()
+        try:
+            return await run_cpu(build_financial_metrics_prompt, self.fin_metrics_request, data, peer_context)
+        except Exception as e:
+            logger.error("Error validating financial metrics: %s", e)
+            return "No financial metrics available."
 
     async def analyze_metrics_with_llm(self) -> ChatCompletionResponse:
         """
@@ -86,7 +130,7 @@ You are to analyze the following financial metrics:
 
         chat_response = await self.anthropic_client.chat_complete(analyze_metrics_request)
 
-        print(f"TYPE: {type(chat_response)}")
+        logger.debug("Financial metrics analysis: %s", LazyRepr(chat_response))
 
         return chat_response
 
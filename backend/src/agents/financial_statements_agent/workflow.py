@@ -11,7 +11,6 @@ from pydantic import BaseModel, ConfigDict, Field
 from typing import Any, Dict, List, Optional
 from backend.src.agents.financial_statements_agent.model import CompanyFinancialStatements, CompanyFinancialStatementsResponse, CompanyFinancialStatementsRequest
 import asyncio
-from anthropic import Anthropic
 from textwrap import dedent
 
 class FinancialStatementsAgent(BaseModel):
@@ -1,13 +1,37 @@
 from backend.src.client.anthropic_client import ChatCompletionRequest, ChatMessage, ChatCompletionResponse, AnthropicClient
-from backend.src.client.fin_datasetsai import FinancialDatasetsClient
+from backend.src.client.fin_datasetsai import FinancialDatasetsClient, parse_financial_statements
 from backend.src.config import CONFIG
 from pydantic import BaseModel, ConfigDict, Field
 from typing import Any, Dict, List, Optional
 import asyncio
-from anthropic import Anthropic
 from textwrap import dedent
 from backend.src.agents.financial_statements_agent.model import FinancialStatements, FinancialStatementsResponse, FinancialStatementsRequest
+from backend.src.executor import run_cpu
+from backend.src.logger import get_logger, LazyRepr
 
+logger = get_logger(__name__)
+
+
+
+def build_financial_statements_prompt(request: FinancialStatementsRequest, data: Dict[str, Any]) -> str:
+    """
+    Validate a raw statements response and render the analysis prompt.
+    Module-level so it can run in the CPU executor; only the prompt string comes back.
+    """
+    statements = parse_financial_statements(data)
+
+    prompt = dedent(f"""You are an expert financial analyst with a Chartered Financial Analyst (CFA) designation.
+        You are tasked with analyzing the financial statements of a company.
+        You are given the following financial statements:
+        - Ticker: {request.ticker}
+        - Period: {request.period}
+        - Limit: {request.limit}'
+
+        You are to analyze the following financial statements:
+        {statements}:
+                    \n""")
+
+    return prompt
 
 
 class FinancialStatementsAgent(BaseModel):
@@ -18,43 +42,37 @@ class FinancialStatementsAgent(BaseModel):
     fin_statements_request: FinancialStatementsRequest
 
 
-    async def _get_financial_statements(self) -> FinancialStatementsResponse | None:
-        print("\nFINANCIAL STATEMENTS REQUEST: ", self.fin_statements_request)
-        # Implementation here
+    async def _get_financial_statements(self) -> Dict[str, Any] | None:
+        logger.info("Fetching financial statements: %s", self.fin_statements_request)
         try:
-            statements = self.financial_client.fetch_financial_statements(
+            # The client is blocking; keep it off the event loop
+            data = await asyncio.to_thread(
+                self.financial_client.fetch_financial_statements_raw,
                 self.fin_statements_request
             )
         except Exception as e:
-            print(f"Error fetching financial statements: {e}")
+            logger.error("Error fetching financial statements: %s", e)
             return None
-        if not statements:
-            print("No financial statements found.")
+        if not data:
+            logger.warning("No financial statements found.")
             return None
 
-        return statements
+        return data
 
     async def _prompt_for_financial_statements(self) -> str:
         """
         Create a prompt for the LLM to analyze financial statements.
+        Validation and serialization run in the CPU executor.
         """
-        statements = await self._get_financial_statements()
-        if not statements:
+        data = await self._get_financial_statements()
+        if not data:
             return "No financial statements available."
 
-        prompt = dedent(f"""You are an expert financial analyst with a Chartered Financial Analyst (CFA) designation.
-        You are tasked with analyzing the financial statements of a company.
-        You are given the following financial statements:
-        - Ticker: {self.fin_statements_request.ticker}
-        - Period: {self.fin_statements_request.period}
-        - Limit: {self.fin_statements_request.limit}'
-
-        You are to analyze the following financial statements:
-        {statements}:
-                    \n""")
-        # Add more statements as needed
-
-        return prompt
+        try:
+            return await run_cpu(build_financial_statements_prompt, self.fin_statements_request, data)
+        except Exception as e:
+            logger.error("Error validating financial statements: %s", e)
+            return "No financial statements available."
 
     async def analyze_statements_with_llm(self) -> ChatCompletionResponse:
         """
@@ -74,7 +92,7 @@ class FinancialStatementsAgent(BaseModel):
 
         chat_response = await self.anthropic_client.chat_complete(analyze_statements_request)
 
-        print(f"TYPE: {type(chat_response)}")
+        logger.debug("Financial statements analysis: %s", LazyRepr(chat_response))
 
         return chat_response
 
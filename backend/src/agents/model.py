@@ -0,0 +1,107 @@
+"""
+Data models that hold the state of an orchestration run.
+"""
+
+import re
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from backend.src.tracing import Span
+
+Recommendation = Literal["BUY", "SELL", "HOLD"]
+
+_RECOMMENDATION_PATTERN = re.compile(r"\b(BUY|SELL|HOLD)\b")
+
+
+def parse_recommendation(text: str | None) -> Recommendation | None:
+    """Return the first BUY/SELL/HOLD call found in a recommendation text."""
+    if not text:
+        return None
+    match = _RECOMMENDATION_PATTERN.search(text)
+    return match.group(1) if match else None
+
+
+def analysis_text(analysis: Any) -> str | None:
+    """Text of an agent output (a string or an LLM response), or None when it is missing."""
+    if analysis is None:
+        return None
+    return analysis if isinstance(analysis, str) else getattr(analysis, "text", str(analysis))
+
+
+ANALYSIS_FIELDS = ("fin_statements", "fin_metrics", "web_search", "investment_recommendation")
+
+
+class AnalysisResult(BaseModel):
+    """
+    Outputs of every agent for one ticker and date window.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    ticker: str
+    start_date: str
+    end_date: str
+
+    fin_statements: Any = Field(None, description="Financial statements analysis")
+    fin_metrics: Any = Field(None, description="Financial metrics analysis")
+    web_search: Any = Field(None, description="Web search analysis")
+    investment_recommendation: Any = Field(None, description="Final investment recommendation")
+
+    missing: list[str] = Field(default_factory=list, description="Agents that missed their budget or failed")
+    critical_path: list[str] = Field(default_factory=list, description="Node names that bounded the run")
+    wall_time: float = Field(0.0, description="Wall time of the run in seconds")
+    error: str | None = Field(None, description="Set when the run failed")
+    trace: list[Span] = Field(default_factory=list, description="Spans of the run, by start time")
+
+    @property
+    def recommendation_text(self) -> str | None:
+        return analysis_text(self.investment_recommendation)
+
+    @property
+    def recommendation(self) -> Recommendation | None:
+        return parse_recommendation(self.recommendation_text)
+
+    def to_report(self) -> dict[str, Any]:
+        """JSON-safe view of the result, with every analysis as text."""
+        return {
+            **self.model_dump(exclude=set(ANALYSIS_FIELDS)),
+            **{field: analysis_text(getattr(self, field)) for field in ANALYSIS_FIELDS},
+            "recommendation": self.recommendation,
+        }
+
+
+class PortfolioSummary(BaseModel):
+    """
+    Aggregated view over a portfolio run.
+    """
+    tickers: list[str]
+    recommendations: dict[str, Recommendation | None] = Field(default_factory=dict)
+    failed: dict[str, str] = Field(default_factory=dict, description="Ticker -> error")
+    wall_time: float = Field(0.0, description="Wall time of the whole portfolio run in seconds")
+    total_ticker_time: float = Field(0.0, description="Sum of the per-ticker wall times in seconds")
+    slowest_ticker: str | None = None
+    slowest_ticker_time: float = 0.0
+    screened_out: list[str] = Field(default_factory=list, description="Tickers the pre-LLM screen dropped")
+
+    @property
+    def speedup(self) -> float:
+        """How much faster the concurrent run was than running tickers one after another."""
+        return self.total_ticker_time / self.wall_time if self.wall_time else 0.0
+
+    def counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {"BUY": 0, "SELL": 0, "HOLD": 0, "UNKNOWN": 0}
+        for recommendation in self.recommendations.values():
+            counts[recommendation or "UNKNOWN"] += 1
+        return counts
+
+
+class WatchlistRefresh(BaseModel):
+    """
+    What one watchlist refresh cycle did for a ticker.
+    """
+    ticker: str
+    rerun: list[str] = Field(default_factory=list, description="Agents whose inputs changed and were run")
+    reused: list[str] = Field(default_factory=list, description="Agents whose previous output was reused")
+    recommendation: Recommendation | None = None
+    error: str | None = None
+    wall_time: float = 0.0
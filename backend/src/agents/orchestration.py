@@ -1,483 +1,156 @@
-import os 
-import sys
-from dotenv import load_dotenv
-from backend.src.client.fin_datasetsai import FinancialDatasetsClient
-from backend.src.client.anthropic_client import AnthropicClient
-from backend.src.config import CONFIG
 import asyncio
+from datetime import date
+from typing import Any, Awaitable, Callable
+from backend.src.config import CONFIG
 from backend.src.agents.financial_metrics_agent.workflow import FinancialMetricsAgent
-from backend.src.agents.financial_metrics_agent.model import FinancialMetricsRequest, FinancialMetricsResponse
-
-# from backend.src.agents.company_news_agent.workflow import CompanyNewsAgent
-# from backend.src.agents.company_news_agent.model import CompanyNewsRequest, CompanyNewsResponse
-from backend.src.client.anthropic_client import ChatCompletionRequest, ChatMessage, ChatCompletionResponse, AnthropicClient
-from backend.src.client.oai.responses import OpenAIClient
-from backend.src.agents.websearch_agent.workflow import WebSearchAgent
+from backend.src.agents.financial_metrics_agent.model import FinancialMetricsRequest
+from backend.src.client.anthropic_client import ChatCompletionRequest, ChatMessage
+from backend.src.agents.websearch_agent.workflow import MACRO_MODEL, TICKER_MODEL, WebSearchAgent
 from backend.src.agents.financial_statements_agent.model import FinancialStatementsRequest
-
-# Web server imports
-import webbrowser
-from threading import Thread
-from flask import Flask, render_template_string
-import markdown
-import socket
-
-from backend.src.agents.financial_statements_agent.model import FinancialStatementsRequest, FinancialStatementsResponse
 from backend.src.agents.financial_statements_agent.workflow_new import FinancialStatementsAgent
+from backend.src.agents.context_index import RECOMMENDATION_QUERY, select_passages
+from backend.src.agents.dag import AgentDAG, AgentNode, NodeTiming
+from backend.src.agents.model import AnalysisResult
+from backend.src.agents.run_store import RunStore
+from backend.src.client.clients import Clients, build_clients
+from backend.src.logger import get_logger, LazyRepr
+from backend.src.loop_monitor import monitored
+from backend.src.memory_profile import active_profiler
+from backend.src.timeseries.peers import peer_groups_digest
+from backend.src.tracing import trace_run
+
+logger = get_logger(__name__)
+
+## PIPELINE CONFIGURATION ##
+# Bump PIPELINE_VERSION when prompts or agent models change, so checkpoints from older runs are not resumed
+PIPELINE_VERSION = 6
+FIN_METRICS_LIMIT = 4
+FIN_STATEMENTS_LIMIT = 8
+RECOMMENDATION_MODEL = "claude-sonnet-4-20250514"
+# Longer web-search analyses (ticker and market sections) are cut to their most relevant passages
+WEB_CONTEXT_MAX_WORDS = 800
+# Passages of earlier runs' web searches added after the current one
+EARLIER_CONTEXT_MAX_WORDS = 300
+EARLIER_CONTEXT_HEADING = "## Earlier Web-Search Context"
+
+def pipeline_config() -> dict:
+    """Settings that change stage outputs; part of the checkpoint key."""
+    return {
+        "pipeline_version": PIPELINE_VERSION,
+        "period": "quarterly",
+        "fin_metrics_limit": FIN_METRICS_LIMIT,
+        "fin_statements_limit": FIN_STATEMENTS_LIMIT,
+        "recommendation_model": RECOMMENDATION_MODEL,
+        "web_context_max_words": WEB_CONTEXT_MAX_WORDS,
+        "earlier_context_max_words": EARLIER_CONTEXT_MAX_WORDS,
+        "web_search_models": [TICKER_MODEL, MACRO_MODEL],
+        "peer_groups": CONFIG.peer_groups_path,
+        # Editing the groups changes the percentiles in the metrics prompt
+        "peer_groups_sha256": peer_groups_digest(),
+    }
+
+MISSING_SECTION = "NOT AVAILABLE - this analysis {reason}. Do not speculate about it."
+
+# Node status -> why its analysis is missing
+MISSING_REASONS = {
+    "timeout": "did not finish within its time budget",
+    "failed": "failed",
+}
+
+def missing_section(status: str | None) -> str:
+    return MISSING_SECTION.format(reason=MISSING_REASONS.get(status, "is not available"))
+
+def build_investment_recommendation_prompt(
+    ticker: str,
+    fin_statements_analysis,
+    fin_metrics_analysis,
+    web_search_analysis,
+    statuses: dict[str, str] | None = None) -> str:
+    """
+    Build the prompt that combines all analyses into a final recommendation.
+    Analyses that are None (missed their budget or failed) are flagged as missing,
+    worded by their node status in `statuses` (node name -> status).
+    """
+    statuses = statuses or {}
+    sections = {
+        "FINANCIAL STATEMENTS ANALYSIS": fin_statements_analysis,
+        "FINANCIAL METRICS ANALYSIS": fin_metrics_analysis,
+        "WEB SEARCH ANALYSIS": web_search_analysis,
+    }
+    missing = [name for name, analysis in sections.items() if analysis is None]
+    missing_note = (
+        f"""
+    NOTE: The following analyses are missing: {', '.join(missing)}.
+    Base the recommendation only on what is available and lower your confidence level accordingly.
+    """ if missing else ""
+    )
 
-load_dotenv()
-
-# HTML template for the dashboard
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Financial Analysis Dashboard - {{ ticker }}</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 15px;
-            box-shadow: 0 25px 50px rgba(0,0,0,0.15);
-            overflow: hidden;
-        }
-
-        .header {
-            background: linear-gradient(45deg, #2c3e50, #34495e);
-            color: white;
-            padding: 2.5rem 2rem;
-            text-align: center;
-        }
-
-        .header h1 {
-            font-size: 2.8rem;
-            margin-bottom: 0.5rem;
-            font-weight: 700;
-            text-shadow: 0 2px 4px rgba(0,0,0,0.3);
-        }
-
-        .header .subtitle {
-            font-size: 1.2rem;
-            opacity: 0.9;
-            font-weight: 300;
-        }
-
-        .content {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 0;
-            min-height: 70vh;
-        }
-
-        .analysis-section {
-            padding: 2.5rem;
-            border-right: 1px solid #e8ecef;
-            overflow-y: auto;
-            max-height: 80vh;
-        }
-
-        .analysis-section:last-child {
-            border-right: none;
-        }
-
-        .section-title {
-            color: #2c3e50;
-            font-size: 1.6rem;
-            margin-bottom: 1.5rem;
-            padding-bottom: 0.8rem;
-            border-bottom: 3px solid #3498db;
-            font-weight: 600;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }
-
-        .markdown-content {
-            font-size: 0.95rem;
-            line-height: 1.7;
-        }
-
-        .markdown-content h1 {
-            color: #2c3e50;
-            font-size: 1.8rem;
-            margin: 2rem 0 1rem;
-            font-weight: 600;
-            border-bottom: 2px solid #ecf0f1;
-            padding-bottom: 0.5rem;
-        }
-
-        .markdown-content h2 {
-            color: #34495e;
-            font-size: 1.4rem;
-            margin: 1.5rem 0 0.8rem;
-            font-weight: 600;
-        }
-
-        .markdown-content h3 {
-            color: #7f8c8d;
-            font-size: 1.2rem;
-            margin: 1.2rem 0 0.6rem;
-            font-weight: 600;
-        }
-
-        .markdown-content p {
-            margin-bottom: 1.2rem;
-            color: #555;
-            text-align: justify;
-        }
-
-        .markdown-content ul, .markdown-content ol {
-            margin-left: 1.8rem;
-            margin-bottom: 1.2rem;
-        }
-
-        .markdown-content li {
-            margin-bottom: 0.6rem;
-            color: #555;
-        }
-
-        .markdown-content strong {
-            color: #2c3e50;
-            font-weight: 600;
-        }
-
-        .markdown-content code {
-            background: #f8f9fa;
-            padding: 0.3rem 0.5rem;
-            border-radius: 4px;
-            font-family: 'Monaco', 'Menlo', 'Consolas', monospace;
-            font-size: 0.85rem;
-            color: #e74c3c;
-        }
-
-        .markdown-content pre {
-            background: #f8f9fa;
-            padding: 1.5rem;
-            border-radius: 8px;
-            overflow-x: auto;
-            margin: 1.5rem 0;
-            border-left: 4px solid #3498db;
-        }
-
-        .markdown-content blockquote {
-            border-left: 4px solid #3498db;
-            padding-left: 1.5rem;
-            margin: 1.5rem 0;
-            color: #7f8c8d;
-            font-style: italic;
-            background: #f8f9fa;
-            padding: 1rem 1.5rem;
-            border-radius: 0 8px 8px 0;
-        }
-
-        .markdown-content table {
-            width: 100%;
-            border-collapse: collapse;
-            margin: 1.5rem 0;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            border-radius: 8px;
-            overflow: hidden;
-        }
-
-        .markdown-content th, .markdown-content td {
-            border: 1px solid #e8ecef;
-            padding: 0.8rem;
-            text-align: left;
-        }
-
-        .markdown-content th {
-            background: #34495e;
-            color: white;
-            font-weight: 600;
-            text-transform: uppercase;
-            font-size: 0.85rem;
-            letter-spacing: 0.5px;
-        }
-
-        .markdown-content td {
-            background: white;
-        }
-
-        .markdown-content tr:nth-child(even) td {
-            background: #f8f9fa;
-        }
-
-        @media (max-width: 1024px) {
-            .content {
-                grid-template-columns: 1fr;
-            }
-            
-            .analysis-section {
-                border-right: none;
-                border-bottom: 1px solid #e8ecef;
-                max-height: none;
-            }
-            
-            .analysis-section:last-child {
-                border-bottom: none;
-            }
-            
-            .header h1 {
-                font-size: 2.2rem;
-            }
-            
-            .container {
-                margin: 10px;
-                border-radius: 10px;
-            }
-        }
-
-        .loading {
-            text-align: center;
-            padding: 3rem;
-            color: #7f8c8d;
-            font-size: 1.1rem;
-        }
-
-        .error {
-            background: #e74c3c;
-            color: white;
-            padding: 1.5rem;
-            border-radius: 8px;
-            margin: 1.5rem 0;
-            font-weight: 500;
-        }
-
-        /* Scrollbar styling */
-        .analysis-section::-webkit-scrollbar {
-            width: 6px;
-        }
-
-        .analysis-section::-webkit-scrollbar-track {
-            background: #f1f1f1;
-        }
-
-        .analysis-section::-webkit-scrollbar-thumb {
-            background: #c1c1c1;
-            border-radius: 3px;
-        }
-
-        .analysis-section::-webkit-scrollbar-thumb:hover {
-            background: #a8a8a8;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>Financial Analysis Dashboard</h1>
-            <div class="subtitle">{{ ticker }} | {{ start_date }} to {{ end_date }}</div>
-        </div>
-        
-        <div class="content">
-            <div class="analysis-section">
-                <div class="section-title">📊 Financial Statements Analysis</div>
-                <div class="markdown-content">
-                    {{ fin_statements_html | safe }}
-                </div>
-            </div>
-            
-            <div class="analysis-section">
-                <div class="section-title">📈 Financial Metrics Analysis</div>
-                <div class="markdown-content">
-                    {{ fin_metrics_html | safe }}
-                </div>
-            </div>
-
-            <div class="analysis-section">
-                <div class="section-title">📈 Web Search Analysis</div>
-                <div class="markdown-content">
-                    {{ web_search_html | safe }}
-                </div>
-            </div>
-
-            <div class="analysis-section">
-                <div class="section-title">🎯 Investment Recommendation</div>
-                <div class="markdown-content">
-                    {{ investment_recommendation_html | safe }}
-                </div>
-            </div>
-        </div>
-    </div>
-</body>
-</html>
-"""
-
-def find_free_port():
-    """Find a free port to run the Flask server."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(('', 0))
-        s.listen(1)
-        port = s.getsockname()[1]
-    return port
-
-def extract_markdown_content(analysis_text):
-    """Extract markdown content from the analysis text."""
-    if isinstance(analysis_text, str):
-        return analysis_text
-    
-    # Handle different response object structures
-    if hasattr(analysis_text, 'content') and analysis_text.content:
-        if isinstance(analysis_text.content, list) and len(analysis_text.content) > 0:
-            # Handle list of content items
-            content_item = analysis_text.content[0]
-            if isinstance(content_item, dict):
-                return content_item.get('text', str(analysis_text))
-            else:
-                return str(content_item)
-        elif isinstance(analysis_text.content, str):
-            return analysis_text.content
-    
-    # Handle message-like objects
-    if hasattr(analysis_text, 'text'):
-        return analysis_text.text
+    return f"""You are an expert financial analyst with a Chartered Financial Analyst (CFA) designation.
+    Based on the following comprehensive analyses, provide a clear investment recommendation (BUY, SELL, or HOLD) for {ticker.upper()}.
+    {missing_note}
+    FINANCIAL STATEMENTS ANALYSIS:
+    {fin_statements_analysis if fin_statements_analysis is not None else missing_section(statuses.get('fin_statements'))}
     
-    # Fallback to string conversion
-    return str(analysis_text)
+    FINANCIAL METRICS ANALYSIS:
+    {fin_metrics_analysis if fin_metrics_analysis is not None else missing_section(statuses.get('fin_metrics'))}
 
-def create_flask_app(ticker, start_date, end_date, fin_statements_analysis, fin_metrics_analysis, web_search_analysis, investment_recommendation):
-    """Create and configure Flask app with the analysis data."""
-    app = Flask(__name__)
+    WEB SEARCH ANALYSIS:
+    {web_search_analysis if web_search_analysis is not None else missing_section(statuses.get('web_search'))}
     
-    @app.route('/')
-    def dashboard():
-        try:
-            # Extract markdown content from analysis responses
-            statements_markdown = extract_markdown_content(fin_statements_analysis)
-            metrics_markdown = extract_markdown_content(fin_metrics_analysis)
-            # company_news_markdown = extract_markdown_content(company_news_analysis)
-            web_search_markdown = extract_markdown_content(web_search_analysis)
-            recommendation_markdown = extract_markdown_content(investment_recommendation)
-            
-            # Convert markdown to HTML
-            fin_statements_html = markdown.markdown(
-                statements_markdown, 
-                extensions=['tables', 'fenced_code', 'codehilite']
-            )
-            fin_metrics_html = markdown.markdown(
-                metrics_markdown, 
-                extensions=['tables', 'fenced_code', 'codehilite']
-            )
-            # company_news_html = markdown.markdown(
-            #     company_news_markdown, 
-            #     extensions=['tables', 'fenced_code', 'codehilite']
-            # )
-            web_search_html = markdown.markdown(
-                web_search_markdown, 
-                extensions=['tables', 'fenced_code', 'codehilite']
-            )
-            investment_recommendation_html = markdown.markdown(
-                recommendation_markdown,
-                extensions=['tables', 'fenced_code', 'codehilite']
-            )
-            
-            return render_template_string(
-                HTML_TEMPLATE,
-                ticker=ticker.upper(),
-                start_date=start_date,
-                end_date=end_date,
-                fin_statements_html=fin_statements_html,
-                fin_metrics_html=fin_metrics_html,
-                # company_news_html=company_news_html,
-                web_search_html=web_search_html,
-                investment_recommendation_html=investment_recommendation_html
-            )
-        except Exception as e:
-            error_html = f'<div class="error">Error rendering dashboard: {str(e)}</div>'
-            return render_template_string(
-                HTML_TEMPLATE.replace('{{ fin_statements_html | safe }}', error_html)
-                            .replace('{{ fin_metrics_html | safe }}', error_html)
-                            # .replace('{{ company_news_html | safe }}', error_html)
-                            .replace('{{ web_search_html | safe }}', error_html)
-                            .replace('{{ investment_recommendation_html | safe }}', error_html),
-                ticker=ticker.upper(),
-                start_date=start_date,
-                end_date=end_date
-            )
     
-    return app
-
-def run_server(app, port):
-    """Run the Flask server in a separate thread."""
-    app.run(host='127.0.0.1', port=port, debug=False, use_reloader=False)
-
-## TODO ## 
-# 1. Make data model that holds the state of the orchestration
-# 2. Make the orchestration agent
-# 3. Add error handling across all agents
-# 4. Add logging across all agents
-
-async def master_orchestrator(
-    ticker: str, 
-    start_date: str,
-    end_date: str,
-    serve_web: bool = True) -> str:
-    """Orchestrates the execution of financial analysis agents."""
-
-    print(f"🚀 Starting financial analysis for {ticker.upper()}")
-    print(f"📅 Period: {start_date} to {end_date}")
+    Please provide:
+    1. A clear BUY, SELL, or HOLD recommendation at the top
+    2. Target price range if applicable
+    3. Key reasons for the recommendation
+    4. Main risks to consider
+    5. Confidence level in the recommendation (High, Medium, Low)
     
-    ## INITIALIZE CLIENTS ##
-    financial_client = FinancialDatasetsClient(
-        api_key=CONFIG.financial_datasets_api_key,
-        base_url=CONFIG.financial_datasets_api_url,
-    )
-    anthropic_client = AnthropicClient(
-        anthropic_api_key=CONFIG.anthropic_api_key,
-        anthropic_api_url=CONFIG.anthropic_api_url,
-    )
-    openai_client = OpenAIClient(
-        api_key=CONFIG.openai_api_key,
-        base_url=CONFIG.openai_api_url,
-        timeout=CONFIG.timeout,
-        max_retries=CONFIG.max_retries
-    )
+    Format your response in markdown with clear sections."""
 
-    ## REQUEST OBJECTS ##
-    fin_metrics_request = FinancialMetricsRequest(
+def build_fin_metrics_request(ticker: str, start_date: str, end_date: str) -> FinancialMetricsRequest:
+    return FinancialMetricsRequest(
         ticker=ticker,
         period="quarterly",
-        limit=4,
+        limit=FIN_METRICS_LIMIT,
         report_period_gte=start_date,
         report_period_lte=end_date
     )
-    fin_statements_request = FinancialStatementsRequest(
+
+def build_fin_statements_request(ticker: str, start_date: str, end_date: str) -> FinancialStatementsRequest:
+    return FinancialStatementsRequest(
         ticker=ticker,
         period="quarterly",
-        limit=8,
+        limit=FIN_STATEMENTS_LIMIT,
         report_period_gte=start_date,
         report_period_lte=end_date
     )
-    # company_news_request = CompanyNewsRequest(
-    #     ticker=ticker,
-    #     limit=10,
-    #     # start_date=start_date,
-    #     # end_date=end_date
-    # )
+
+def build_analysis_dag(
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    clients: Clients,
+    agent_budgets: dict[str, float] | None = None) -> AgentDAG:
+    """
+    Build the agent DAG for one ticker. New agents are added here as nodes;
+    the recommendation node declares which outputs it consumes.
+
+    agent_budgets: node name -> time budget in seconds (defaults to CONFIG.agent_budget)
+    """
+    financial_client = clients.financial_client
+    anthropic_client = clients.anthropic_client
+    openai_client = clients.openai_client
+
+    ## REQUEST OBJECTS ##
+    fin_metrics_request = build_fin_metrics_request(ticker, start_date, end_date)
+    fin_statements_request = build_fin_statements_request(ticker, start_date, end_date)
 
     ## AGENT OBJECTS ##
     fin_metrics_agent = FinancialMetricsAgent(
         financial_client=financial_client,
         anthropic_client=anthropic_client,
         fin_metrics_request=fin_metrics_request,
+        peers=clients.peers,
     )
     
     fin_statements_agent = FinancialStatementsAgent(
@@ -486,107 +159,250 @@ async def master_orchestrator(
         fin_statements_request=fin_statements_request,
     )
 
-    # company_news_agent = CompanyNewsAgent(
-    #     financial_client=financial_client,
-    #     anthropic_client=anthropic_client,
-    #     company_news_request=company_news_request,
-    # )
-
     web_search_agent = WebSearchAgent(
         openai_client=openai_client,
-        ticker=ticker,  
+        ticker=ticker,
+        macro_cache=clients.macro_cache,
+        context_index=clients.context_index,
     )
 
+    logger.debug("📊 FINANCIAL STATEMENTS REQUEST: %s", fin_statements_request)
 
-    print(f"📊 FINANCIAL STATEMENTS REQUEST: {fin_statements_request}")
-
-    # Run analyses
-    fin_statements_analysis, fin_metrics_analysis, web_search_analysis = await asyncio.gather(
-        fin_statements_agent.analyze_statements_with_llm(),
-        fin_metrics_agent.analyze_metrics_with_llm(),
-        # company_news_agent.analyze_news_with_llm()
-        web_search_agent.analyze_web_with_llm()
-
-
-
-    )
-    # fin_news_analysis = await company_news_agent.analyze_metrics_with_llm()
-    
-    print(f"✅ FINANCIAL STATEMENTS ANALYSIS: {fin_statements_analysis}")
-    print(f"✅ FINANCIAL METRICS ANALYSIS: {fin_metrics_analysis}")
-    # print(f"✅ COMPANY NEWS ANALYSIS: {company_news_analysis}")
-    print(f"✅ WEB SEARCH ANALYSIS: {web_search_analysis}")
-    
-    # Create a final investment recommendation that combines all analyses
-    investment_recommendation_prompt = f"""You are an expert financial analyst with a Chartered Financial Analyst (CFA) designation.
-    Based on the following comprehensive analyses, provide a clear investment recommendation (BUY, SELL, or HOLD) for {ticker.upper()}.
-    
-    FINANCIAL STATEMENTS ANALYSIS:
-    {fin_statements_analysis}
-    
-    FINANCIAL METRICS ANALYSIS:
-    {fin_metrics_analysis}
-
-    WEB SEARCH ANALYSIS:
-    {web_search_analysis}
-    
-    
-    Please provide:
-    1. A clear BUY, SELL, or HOLD recommendation at the top
-    2. Target price range if applicable
-    3. Key reasons for the recommendation
-    4. Main risks to consider
-    5. Confidence level in the recommendation (High, Medium, Low)
-    
-    Format your response in markdown with clear sections."""
-
-
-    investment_recommendation_request = ChatCompletionRequest(
-        model="claude-sonnet-4-20250514",
-        messages=[ChatMessage(role="user", content=investment_recommendation_prompt)],
-        temperature=0.7,
-        max_tokens=32000
-    )
+    async def investment_recommendation(fin_statements, fin_metrics, web_search):
+        if isinstance(web_search, str):
+            current = web_search
+            web_search = select_passages(current, RECOMMENDATION_QUERY, WEB_CONTEXT_MAX_WORDS, ticker)
+            earlier = await asyncio.to_thread(
+                clients.context_index.history, ticker, RECOMMENDATION_QUERY, "web_search",
+                current, date.fromisoformat(end_date[:10]), EARLIER_CONTEXT_MAX_WORDS,
+            )
+            if earlier:
+                dated = "\n\n".join(f"({p.date or 'undated'}) {p.text}" for p in earlier)
+                web_search = f"{web_search}\n\n{EARLIER_CONTEXT_HEADING}\n\n{dated}"
+        # Say why an input is missing: it ran out of time or failed
+        statuses = {name: timing.status for name in dag.dependencies("investment_recommendation") if (timing := dag.timing(name))}
+        investment_recommendation_request = ChatCompletionRequest(
+            model=RECOMMENDATION_MODEL,
+            messages=[ChatMessage(
+                role="user",
+                content=build_investment_recommendation_prompt(ticker, fin_statements, fin_metrics, web_search, statuses),
+            )],
+            temperature=0.7,
+            max_tokens=32000
+        )
+        return await anthropic_client.chat_complete(investment_recommendation_request)
+
+    ## AGENT DAG ##
+    agent_budgets = agent_budgets or {}
+    dag = AgentDAG()
+    dag.add(AgentNode(
+        name="fin_statements",
+        run=fin_statements_agent.analyze_statements_with_llm,
+        timeout=agent_budgets.get("fin_statements", CONFIG.agent_budget),
+    ))
+    dag.add(AgentNode(
+        name="fin_metrics",
+        run=fin_metrics_agent.analyze_metrics_with_llm,
+        timeout=agent_budgets.get("fin_metrics", CONFIG.agent_budget),
+    ))
+    dag.add(AgentNode(
+        name="web_search",
+        run=web_search_agent.analyze_web_with_llm,
+        timeout=agent_budgets.get("web_search", CONFIG.agent_budget),
+    ))
+    dag.add(AgentNode(
+        name="investment_recommendation",
+        run=investment_recommendation,
+        inputs=["fin_statements", "fin_metrics", "web_search"],
+        timeout=agent_budgets.get("investment_recommendation"),
+    ))
+    return dag
+
+def reserve_recommendation_time(dag: AgentDAG, deadline: float) -> None:
+    """
+    Cap the budget of every source node so the recommendation still has
+    CONFIG.recommendation_reserve seconds (at least half the deadline) left to run.
+    """
+    agent_cap = max(deadline - CONFIG.recommendation_reserve, deadline / 2)
+    for node in dag.nodes.values():
+        if not node.inputs:
+            node.timeout = min(node.timeout or agent_cap, agent_cap)
+
+async def run_analysis(
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    clients: Clients | None = None,
+    deadline: float | None = None,
+    agent_budgets: dict[str, float] | None = None,
+    run_store: RunStore | None = None,
+    resume: bool | None = None,
+    seed: dict[str, Any] | None = None,
+    on_node_done: Callable[[str, NodeTiming, Any], Awaitable[None]] | None = None) -> AnalysisResult:
+    """
+    Run every agent for one ticker and return their outputs.
+    Pass `clients` to share connection pools, caches and limits across tickers.
+
+    deadline: hard upper bound in seconds (defaults to CONFIG.run_deadline). Agents that miss
+    their budget are cancelled and the recommendation runs on whatever finished.
+    run_store: checkpoint store (defaults to one under CONFIG.run_store_dir, if set). Each
+    completed stage is saved; with `resume` (defaults to CONFIG.resume_runs), stages saved by
+    an earlier run are reused.
+    seed: node name -> output to use instead of running that node.
+    on_node_done: awaited with (name, timing, output) as each agent finishes, e.g. to stream it to a dashboard.
+    """
+    async with trace_run(f"{ticker.upper()}_{start_date}_{end_date}") as trace:
+        deadline = deadline if deadline is not None else CONFIG.run_deadline
+        logger.info("🚀 Starting financial analysis for %s", ticker.upper())
+        logger.info("📅 Period: %s to %s", start_date, end_date)
+        profiler = active_profiler()
+        if profiler is not None:
+            profiler.checkpoint(f"{ticker.upper()} start", snapshot=True)
+
+        ## INITIALIZE CLIENTS ##
+        clients = clients or build_clients()
+
+        # Run analyses
+        dag = build_analysis_dag(ticker, start_date, end_date, clients, agent_budgets)
+        if deadline is not None:
+            reserve_recommendation_time(dag, deadline)
+        for name, output in (seed or {}).items():
+            dag.seed(name, output)
+
+        ## CHECKPOINTS ##
+        if run_store is None and CONFIG.run_store_dir:
+            run_store = RunStore()
+        resume = CONFIG.resume_runs if resume is None else resume
+        save_checkpoint = None
+        if run_store is not None:
+            record = run_store.open_run(ticker, start_date, end_date, pipeline_config())
+            if resume:
+                resumed = run_store.completed_stages(record)
+                for name, output in resumed.items():
+                    if name in dag.nodes:
+                        dag.seed(name, output)
+                        logger.info("♻️  Resuming %s for %s from checkpoint %s", name, ticker.upper(), record.key)
+                if "investment_recommendation" in resumed:
+                    logger.warning(
+                        "♻️  Returning the checkpointed recommendation for %s from %s; nothing is rerun (unset RESUME_RUNS to rerun)",
+                        ticker.upper(), record.key,
+                    )
+
+            degraded: set[str] = set()
+
+            async def save_checkpoint(name, timing, output):
+                # Agents return None when they fail. Only checkpoint real outputs, and never an
+                # output that was computed from a missing input, so a rerun can do better.
+                if output is None or timing.status in ("timeout", "failed"):
+                    degraded.add(name)
+                elif timing.status == "ok" and not degraded.intersection(dag.dependencies(name)):
+                    await run_store.asave_stage(record, name, output, timing.duration)
+
+        async def node_done(name, timing, output):
+            if profiler is not None:
+                profiler.checkpoint(f"{ticker.upper()} {name}")
+                if output is not None:
+                    profiler.track(output, ticker, name)
+            if save_checkpoint is not None:
+                await save_checkpoint(name, timing, output)
+            if on_node_done is not None:
+                await on_node_done(name, timing, output)
+
+        run = await dag.run(deadline=deadline, on_node_done=node_done)
+        logger.info("⏱️  Critical path for %s: %s", ticker.upper(), run.critical_path_summary())
+        if run.missing:
+            logger.warning("⚠️  %s finished without: %s", ticker.upper(), ", ".join(run.missing))
+
+        result = AnalysisResult(
+            ticker=ticker,
+            start_date=start_date,
+            end_date=end_date,
+            fin_statements=run.results["fin_statements"],
+            fin_metrics=run.results["fin_metrics"],
+            web_search=run.results["web_search"],
+            investment_recommendation=run.results["investment_recommendation"],
+            missing=run.missing,
+            critical_path=run.critical_path,
+            wall_time=run.wall_time,
+            trace=sorted(trace.spans, key=lambda s: s.start),
+        )
+
+        logger.debug("✅ FINANCIAL STATEMENTS ANALYSIS: %s", LazyRepr(result.fin_statements))
+        logger.debug("✅ FINANCIAL METRICS ANALYSIS: %s", LazyRepr(result.fin_metrics))
+        logger.debug("✅ WEB SEARCH ANALYSIS: %s", LazyRepr(result.web_search))
+        if result.investment_recommendation is not None:
+            logger.info("✅ Investment recommendation complete for %s", ticker.upper())
+        logger.debug("✅ INVESTMENT RECOMMENDATION: %s", LazyRepr(result.investment_recommendation))
+        if profiler is not None:
+            profiler.track(result, ticker)
+            profiler.checkpoint(f"{ticker.upper()} done", snapshot=True)
+            profiler.ticker_done(ticker)
+        return result
+
+@monitored
+async def master_orchestrator(
+    ticker: str, 
+    start_date: str,
+    end_date: str,
+    serve_web: bool = True,
+    clients: Clients | None = None,
+    deadline: float | None = None,
+    port: int = 0,
+    export_dir: str | None = None) -> str:
+    """
+    Orchestrates the execution of financial analysis agents.
+    With `serve_web`, the dashboard is served from this event loop while the agents run,
+    and each panel fills in as its agent finishes.
+    With `export_dir`, the dashboard and the JSON result are written there instead and
+    the call returns as soon as the analysis is done.
+    """
+    # One trace for the analysis and the dashboard rendering around it
+    async with trace_run(f"{ticker.upper()}_{start_date}_{end_date}"):
+        if export_dir is not None:
+            # Imported here: the export module reaches this one through the portfolio runner
+            from backend.src.dashboard.export import export_result
+
+            result = await run_analysis(ticker, start_date, end_date, clients, deadline)
+            html_path, json_path = await export_result(result, export_dir)
+            logger.info("💾 Exported %s to %s and %s", ticker.upper(), html_path, json_path)
+            return f"Analysis complete. Dashboard exported to {html_path}"
+
+        if not serve_web:
+            await run_analysis(ticker, start_date, end_date, clients, deadline)
+            return "Analysis complete - web serving disabled"
+
+        # The dashboard server and the browser launcher are only needed on this path
+        import webbrowser
+        from backend.src.dashboard.live import LiveDashboard, serve_dashboard
+
+        dashboard = LiveDashboard(ticker, start_date, end_date)
+        server, url = await serve_dashboard(dashboard, port=port)
+        logger.info("🌐 Financial Analysis Dashboard available at: %s", url)
+        logger.info("🔍 Analysis for %s from %s to %s", ticker.upper(), start_date, end_date)
 
-    investment_recommendation = await anthropic_client.chat_complete(investment_recommendation_request)
-    print(f"✅ INVESTMENT RECOMMENDATION: {investment_recommendation}")
-
-
-    if serve_web:
-        # Create Flask app with the analysis results
-        app = create_flask_app(ticker, start_date, end_date, fin_statements_analysis, fin_metrics_analysis, web_search_analysis, investment_recommendation)
-        
-        # Find a free port and start the server
-        port = find_free_port()
-        url = f"http://127.0.0.1:{port}"
-        
-        print(f"\n🌐 Starting web server...")
-        print(f"📊 Financial Analysis Dashboard available at: {url}")
-        print(f"🔍 Analysis for {ticker.upper()} from {start_date} to {end_date}")
-        print(f"💡 Press Ctrl+C to stop the server\n")
-        
-        # Start the server in a separate thread
-        server_thread = Thread(target=run_server, args=(app, port), daemon=True)
-        server_thread.start()
-        
         # Open browser automatically
         try:
-            webbrowser.open(url)
-            print(f"🌍 Opened dashboard in your default browser")
+            await asyncio.to_thread(webbrowser.open, url)
+            logger.info("🌍 Opened dashboard in your default browser")
         except Exception as e:
-            print(f"⚠️  Could not open browser automatically: {e}")
-            print(f"🔗 Please manually open: {url}")
-        
-        # Keep the main thread alive
+            logger.warning("⚠️  Could not open browser automatically: %s", e)
+            logger.warning("🔗 Please manually open: %s", url)
+
         try:
-            print("🎯 Dashboard is running. Press Ctrl+C to stop...")
-            while True:
-                await asyncio.sleep(1)
-        except KeyboardInterrupt:
-            print("\n👋 Shutting down server...")
-            return f"Analysis complete. Dashboard was available at {url}"
-    else:
-        return "Analysis complete - web serving disabled"
+            try:
+                result = await run_analysis(ticker, start_date, end_date, clients, deadline, on_node_done=dashboard.on_node_done)
+                await dashboard.complete(result)
+            except Exception as e:
+                logger.error("❌ Analysis failed for %s: %s", ticker.upper(), e)
+                await dashboard.fail(f"{type(e).__name__}: {e}")
+
+            logger.info("🎯 Dashboard is running. Press Ctrl+C to stop...")
+            await server.serve_forever()
+        except asyncio.CancelledError:
+            logger.info("👋 Shutting down server...")
+        finally:
+            await server.close()
+        return f"Analysis complete. Dashboard was available at {url}"
 
 if __name__ == "__main__":
     # Example usage
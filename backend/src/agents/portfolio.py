@@ -0,0 +1,131 @@
+"""
+Portfolio mode: analyze many tickers in one process.
+
+All tickers share one set of clients (connection pools, the financial data cache and
+the per-provider LLM limits) and run concurrently under `max_concurrent_tickers`.
+Results are streamed as each ticker completes, so the run takes roughly as long as the
+slowest ticker rather than the sum of all of them.
+
+With a `Screen`, the tickers are first screened on their stored metrics (see
+backend.src.timeseries.screen) and only the shortlist is analyzed, so LLM spend scales
+with the shortlist rather than the universe.
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator
+
+from backend.src.agents.model import AnalysisResult, PortfolioSummary
+from backend.src.agents.orchestration import build_fin_metrics_request, run_analysis
+from backend.src.client.clients import Clients, build_clients
+from backend.src.config import CONFIG
+from backend.src.logger import get_logger
+from backend.src.loop_monitor import monitored
+from backend.src.timeseries.screen import Screen, screen_universe
+
+logger = get_logger(__name__)
+
+
+async def stream_portfolio(
+    tickers: list[str],
+    start_date: str,
+    end_date: str,
+    clients: Clients | None = None,
+    max_concurrent_tickers: int | None = None,
+    max_concurrent_llm_calls: int | None = None,
+    deadline: float | None = None,
+) -> AsyncIterator[AnalysisResult]:
+    """
+    Yield one `AnalysisResult` per ticker, in completion order.
+    A failing ticker yields a result with `error` set instead of aborting the run.
+    `deadline` bounds each ticker's run, not the whole portfolio.
+    """
+    clients = clients or build_clients(max_concurrent_llm_calls=max_concurrent_llm_calls)
+    semaphore = asyncio.Semaphore(max_concurrent_tickers or CONFIG.max_concurrent_tickers)
+
+    async def analyze(ticker: str) -> AnalysisResult:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                return await run_analysis(ticker, start_date, end_date, clients, deadline)
+            except Exception as e:
+                logger.error("❌ Analysis failed for %s: %s", ticker.upper(), e)
+                return AnalysisResult(
+                    ticker=ticker, start_date=start_date, end_date=end_date,
+                    wall_time=time.perf_counter() - started, error=f"{type(e).__name__}: {e}",
+                )
+
+    # Deduplicate while keeping the caller's order
+    tasks = [asyncio.create_task(analyze(ticker)) for ticker in dict.fromkeys(tickers)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@monitored
+async def portfolio_orchestrator(
+    tickers: list[str],
+    start_date: str,
+    end_date: str,
+    clients: Clients | None = None,
+    max_concurrent_tickers: int | None = None,
+    max_concurrent_llm_calls: int | None = None,
+    deadline: float | None = None,
+    screen: Screen | None = None,
+) -> tuple[list[AnalysisResult], PortfolioSummary]:
+    """
+    Run the whole portfolio and return every result plus an aggregated summary.
+    `screen` narrows the tickers to its shortlist before any LLM call.
+    """
+    started = time.perf_counter()
+    screened_out: list[str] = []
+    if screen is not None:
+        clients = clients or build_clients(max_concurrent_llm_calls=max_concurrent_llm_calls)
+        # The same requests the metrics agent makes, so the shortlist's agents read them back from the store
+        requests = [build_fin_metrics_request(ticker, start_date, end_date) for ticker in dict.fromkeys(tickers)]
+        shortlist = await screen_universe(clients.financial_client, screen, requests, end_date)
+        screened_out = [t for t in dict.fromkeys(t.upper() for t in tickers) if t not in set(shortlist.tickers)]
+        tickers = shortlist.tickers
+
+    results: list[AnalysisResult] = []
+    async for result in stream_portfolio(
+        tickers, start_date, end_date, clients, max_concurrent_tickers, max_concurrent_llm_calls, deadline,
+    ):
+        results.append(result)
+        logger.info(
+            "📬 %s done in %.2fs (%d/%d): %s",
+            result.ticker.upper(), result.wall_time, len(results), len(set(tickers)),
+            result.error or result.recommendation or "no recommendation",
+        )
+
+    summary = summarize_portfolio(results, time.perf_counter() - started)
+    summary.screened_out = screened_out
+    logger.info(
+        "📊 Portfolio of %d tickers finished in %.2fs (%.1fx faster than sequential): %s",
+        len(summary.tickers), summary.wall_time, summary.speedup, summary.counts(),
+    )
+    return results, summary
+
+
+def summarize_portfolio(results: list[AnalysisResult], wall_time: float) -> PortfolioSummary:
+    """Aggregate per-ticker results into a `PortfolioSummary`."""
+    slowest = max(results, key=lambda r: r.wall_time, default=None)
+    return PortfolioSummary(
+        tickers=[r.ticker for r in results],
+        recommendations={r.ticker: r.recommendation for r in results if r.error is None},
+        failed={r.ticker: r.error for r in results if r.error is not None},
+        wall_time=wall_time,
+        total_ticker_time=sum(r.wall_time for r in results),
+        slowest_ticker=slowest.ticker if slowest else None,
+        slowest_ticker_time=slowest.wall_time if slowest else 0.0,
+    )
+
+
+if __name__ == "__main__":
+    # Example usage
+    watchlist = ["AAPL", "MSFT", "NVDA", "GOOGL"]
+    _, summary = asyncio.run(portfolio_orchestrator(watchlist, "2024-01-01", "2025-01-01"))
+    print(summary.model_dump_json(indent=2))
@@ -0,0 +1,188 @@
+"""
+Checkpoint store for orchestration runs.
+
+Every completed stage of a run is written to a JSON file keyed by ticker, date window
+and a hash of the pipeline configuration. A rerun with the same key resumes from the
+stages that already completed instead of paying for them again.
+
+Inspect the store from the command line:
+    python backend/src/agents/run_store.py list
+    python backend/src/agents/run_store.py show AAPL_2024-01-01_2025-01-01_1a2b3c4d5e6f
+    python backend/src/agents/run_store.py clear
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from backend.src.client.anthropic_client import ChatCompletionResponse
+from backend.src.config import CONFIG
+from backend.src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def config_hash(config: dict[str, Any]) -> str:
+    """Stable short hash of a pipeline configuration."""
+    raw = json.dumps(config, sort_keys=True, default=str).encode()
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+
+def run_key(ticker: str, start_date: str, end_date: str, pipeline_hash: str) -> str:
+    """File-system safe key of a run."""
+    raw = f"{ticker.upper()}_{start_date}_{end_date}_{pipeline_hash}"
+    return re.sub(r"[^A-Za-z0-9_.-]", "-", raw)
+
+
+def encode_output(value: Any) -> dict[str, Any]:
+    """Serialize a stage output to JSON-safe form."""
+    if isinstance(value, ChatCompletionResponse):
+        return {"type": "chat_completion", "value": value.model_dump(mode="json")}
+    if isinstance(value, BaseModel):
+        return {"type": "text", "value": value.model_dump_json()}
+    if value is None or isinstance(value, (str, int, float, bool, list, dict)):
+        return {"type": "json", "value": value}
+    return {"type": "text", "value": str(value)}
+
+
+def decode_output(stored: dict[str, Any]) -> Any:
+    if stored.get("type") == "chat_completion":
+        return ChatCompletionResponse.model_validate(stored["value"])
+    return stored.get("value")
+
+
+class StageRecord(BaseModel):
+    status: str
+    saved_at: float
+    duration: float = 0.0
+    output: dict[str, Any] = Field(default_factory=dict)
+
+
+class RunRecord(BaseModel):
+    key: str
+    ticker: str
+    start_date: str
+    end_date: str
+    config_hash: str
+    config: dict[str, Any] = Field(default_factory=dict)
+    stages: dict[str, StageRecord] = Field(default_factory=dict)
+    created_at: float = Field(default_factory=time.time)
+    updated_at: float = Field(default_factory=time.time)
+
+
+class RunStore:
+    """
+    JSON-file store of run checkpoints, one file per run key.
+
+    max_age: stages older than this many seconds are not resumed (web search results go stale).
+    """
+
+    def __init__(self, root: str | os.PathLike | None = None, max_age: float | None = None):
+        self.root = Path(root or CONFIG.run_store_dir)
+        self.max_age = max_age if max_age is not None else CONFIG.run_store_max_age
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def load(self, key: str) -> RunRecord | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            return RunRecord.model_validate_json(path.read_text())
+        except Exception as e:
+            logger.warning("Ignoring unreadable checkpoint %s: %s", path, e)
+            return None
+
+    def _write(self, record: RunRecord) -> None:
+        """Write atomically so a crash mid-write never corrupts a checkpoint."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(record.key)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(record.model_dump_json(indent=2))
+        os.replace(tmp, path)
+
+    def open_run(self, ticker: str, start_date: str, end_date: str, config: dict[str, Any]) -> RunRecord:
+        """Load the run for this key or create an empty one."""
+        pipeline_hash = config_hash(config)
+        key = run_key(ticker, start_date, end_date, pipeline_hash)
+        return self.load(key) or RunRecord(
+            key=key, ticker=ticker.upper(), start_date=start_date, end_date=end_date,
+            config_hash=pipeline_hash, config=config,
+        )
+
+    def completed_stages(self, record: RunRecord) -> dict[str, Any]:
+        """Decoded outputs of the stages that can be resumed."""
+        now = time.time()
+        return {
+            name: decode_output(stage.output)
+            for name, stage in record.stages.items()
+            if stage.status == "ok" and (self.max_age is None or now - stage.saved_at <= self.max_age)
+        }
+
+    def save_stage(self, record: RunRecord, name: str, output: Any, duration: float = 0.0) -> None:
+        with self._lock:
+            record.stages[name] = StageRecord(
+                status="ok", saved_at=time.time(), duration=duration, output=encode_output(output),
+            )
+            record.updated_at = time.time()
+            self._write(record)
+
+    async def asave_stage(self, record: RunRecord, name: str, output: Any, duration: float = 0.0) -> None:
+        """`save_stage` off the event loop."""
+        await asyncio.to_thread(self.save_stage, record, name, output, duration)
+
+    def list_runs(self) -> list[RunRecord]:
+        if not self.root.exists():
+            return []
+        records = [self.load(path.stem) for path in sorted(self.root.glob("*.json"))]
+        return [record for record in records if record is not None]
+
+    def delete(self, key: str) -> bool:
+        path = self._path(key)
+        if path.exists():
+            path.unlink()
+            return True
+        return False
+
+    def clear(self) -> int:
+        runs = self.list_runs()
+        for record in runs:
+            self.delete(record.key)
+        return len(runs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the orchestration run store.")
+    parser.add_argument("--root", default=None, help="Store directory (defaults to RUN_STORE_DIR)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List stored runs and their completed stages")
+    show = subparsers.add_parser("show", help="Print one run record")
+    show.add_argument("key")
+    delete = subparsers.add_parser("delete", help="Delete one run record")
+    delete.add_argument("key")
+    subparsers.add_parser("clear", help="Delete every run record")
+    args = parser.parse_args()
+
+    store = RunStore(args.root)
+    if args.command == "list":
+        for record in store.list_runs():
+            stages = ", ".join(f"{name}:{stage.status}" for name, stage in record.stages.items()) or "-"
+            print(f"{record.key}  updated {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.updated_at))}  {stages}")
+    elif args.command == "show":
+        record = store.load(args.key)
+        print(record.model_dump_json(indent=2) if record else f"No run {args.key}")
+    elif args.command == "delete":
+        print("Deleted" if store.delete(args.key) else f"No run {args.key}")
+    elif args.command == "clear":
+        print(f"Deleted {store.clear()} runs")
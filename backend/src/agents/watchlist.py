@@ -0,0 +1,269 @@
+"""
+Watchlist refresh daemon.
+
+Keeps the analysis of every watchlist ticker current without rerunning the whole
+pipeline on a timer. Each cycle polls two cheap signals per ticker and hashes them:
+
+- the latest metrics report (one record), for the statements and metrics agents: a new
+  filing or a revised latest report reruns both;
+- the latest headlines plus the key of the day's shared macro search, for web search.
+
+Only the agents whose signal changed rerun, fetching their full data then. The other
+agents are seeded with their previous output, and the recommendation only reruns when
+one of its inputs did. A ticker with no new filing or news costs two small data requests
+and no LLM calls. Older reports leaving the start of the lookback window do not count as
+a change on their own; web search reruns at least once per UTC day, with the new macro search.
+
+The polled headlines also feed a rolling sentiment aggregator, kept in the state file;
+each cycle logs the window scores of the whole watchlist.
+
+    python backend/src/agents/watchlist.py AAPL MSFT NVDA --interval 3600
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from backend.src.agents.company_news_agent.sentiment import SentimentAggregator, SentimentState
+from backend.src.agents.financial_metrics_agent.model import FinancialMetricsRequest
+from backend.src.agents.model import Recommendation, WatchlistRefresh
+from backend.src.agents.orchestration import run_analysis
+from backend.src.agents.websearch_agent.workflow import macro_cache_key
+from backend.src.agents.run_store import decode_output, encode_output
+from backend.src.client.clients import Clients, build_clients
+from backend.src.config import CONFIG
+from backend.src.logger import get_logger
+
+logger = get_logger(__name__)
+
+SOURCE_NODES = ("fin_statements", "fin_metrics", "web_search")
+RECOMMENDATION_NODE = "investment_recommendation"
+# Number of latest headlines whose identity decides whether web search reruns
+NEWS_FINGERPRINT_LIMIT = 10
+
+
+def fingerprint(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+async def poll_inputs(
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    clients: Clients,
+    sentiment: SentimentAggregator | None = None) -> dict[str, str | None]:
+    """
+    Fingerprint the inputs of every source agent from two small requests. A poll that fails yields None.
+    Polled headlines are added to `sentiment`, if given.
+    """
+    financial_client = clients.financial_client
+
+    def poll_filings() -> dict:
+        # The newest report up to the window's end; a new filing replaces it
+        request = FinancialMetricsRequest(ticker=ticker, period="quarterly", limit=1, report_period_lte=end_date)
+        return financial_client.fetch_financial_metrics(request).model_dump(mode="json")
+
+    def poll_news() -> dict:
+        news = financial_client.fetch_company_news(ticker, limit=NEWS_FINGERPRINT_LIMIT).news
+        if sentiment is not None:
+            sentiment.add_many(ticker, news)
+        # The macro half of web search changes with the shared search's key, whatever the headlines
+        return {"headlines": [(item.date.isoformat(), item.url) for item in news], "macro": macro_cache_key()}
+
+    async def poll(name: str, fetch) -> str | None:
+        try:
+            return fingerprint(await asyncio.to_thread(fetch))
+        except Exception as e:
+            logger.warning("Polling %s for %s failed: %s", name, ticker.upper(), e)
+            return None
+
+    filings, news = await asyncio.gather(poll("filings", poll_filings), poll("news", poll_news))
+    return {"fin_statements": filings, "fin_metrics": filings, "web_search": news}
+
+
+class TickerState(BaseModel):
+    """Last known input fingerprints and outputs of every agent for one ticker."""
+    fingerprints: dict[str, str] = Field(default_factory=dict)
+    outputs: dict[str, dict[str, Any]] = Field(default_factory=dict, description="Encoded agent outputs")
+    recommendation: Recommendation | None = None
+    refreshed_at: float | None = None
+
+
+class WatchlistState(BaseModel):
+    tickers: dict[str, TickerState] = Field(default_factory=dict)
+    sentiment: SentimentState | None = None
+
+
+class WatchlistDaemon:
+    """
+    tickers: watchlist
+    lookback_days: each analysis covers [today - lookback_days, today]
+    interval: seconds between the starts of two refresh cycles
+    state_path: JSON file the state is kept in across restarts (None keeps it in memory)
+    max_concurrent_polls: tickers polled at once; polls are cheap, so this is higher than
+        max_concurrent_tickers, which bounds the tickers being rerun
+    """
+
+    def __init__(
+        self,
+        tickers: list[str],
+        lookback_days: int = 365,
+        interval: float = 3600.0,
+        clients: Clients | None = None,
+        state_path: str | os.PathLike | None = None,
+        max_concurrent_tickers: int | None = None,
+        max_concurrent_polls: int = 32,
+        deadline: float | None = None,
+    ):
+        self.tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        self.lookback_days = lookback_days
+        self.interval = interval
+        self.clients = clients or build_clients()
+        self.state_path = Path(state_path) if state_path else None
+        self.deadline = deadline
+        self.max_concurrent_tickers = max_concurrent_tickers or CONFIG.max_concurrent_tickers
+        self.max_concurrent_polls = max_concurrent_polls
+        self.state = self._load_state()
+        self.sentiment = SentimentAggregator.from_state(self.state.sentiment) if self.state.sentiment else SentimentAggregator()
+
+    def _load_state(self) -> WatchlistState:
+        if self.state_path and self.state_path.exists():
+            try:
+                return WatchlistState.model_validate_json(self.state_path.read_text())
+            except Exception as e:
+                logger.warning("Ignoring unreadable watchlist state %s: %s", self.state_path, e)
+        return WatchlistState()
+
+    def _save_state(self) -> None:
+        if self.state_path is None:
+            return
+        self.state.sentiment = self.sentiment.to_state()
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(self.state.model_dump_json())
+        os.replace(tmp, self.state_path)
+
+    def window(self) -> tuple[str, str]:
+        end = date.today()
+        return (end - timedelta(days=self.lookback_days)).isoformat(), end.isoformat()
+
+    def outputs(self, ticker: str) -> dict[str, Any]:
+        """Latest decoded output of every agent for a ticker."""
+        state = self.state.tickers.get(ticker.upper())
+        return {name: decode_output(output) for name, output in state.outputs.items()} if state else {}
+
+    async def refresh_ticker(
+        self,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+        poll_limit: asyncio.Semaphore,
+        run_limit: asyncio.Semaphore,
+    ) -> WatchlistRefresh:
+        started = time.perf_counter()
+        state = self.state.tickers.setdefault(ticker, TickerState())
+        async with poll_limit:
+            fingerprints = await poll_inputs(ticker, start_date, end_date, self.clients, self.sentiment)
+
+        # Reuse an output when its inputs are unchanged, or could not be polled
+        seed = {
+            name: decode_output(state.outputs[name])
+            for name in SOURCE_NODES
+            if name in state.outputs and fingerprints[name] in (None, state.fingerprints.get(name))
+        }
+        if len(seed) == len(SOURCE_NODES) and RECOMMENDATION_NODE in state.outputs:
+            return WatchlistRefresh(
+                ticker=ticker, reused=[*SOURCE_NODES, RECOMMENDATION_NODE],
+                recommendation=state.recommendation, wall_time=time.perf_counter() - started,
+            )
+
+        async with run_limit:
+            result = await run_analysis(
+                ticker, start_date, end_date, clients=self.clients, deadline=self.deadline, resume=False, seed=seed,
+            )
+
+        rerun = [name for name in SOURCE_NODES if name not in seed] + [RECOMMENDATION_NODE]
+        for name in rerun:
+            output = getattr(result, name)
+            # Keep failed agents and recommendations built on missing inputs out of the state,
+            # so the next cycle runs them again
+            if output is None or (name == RECOMMENDATION_NODE and result.missing):
+                state.outputs.pop(name, None)
+                state.fingerprints.pop(name, None)
+                continue
+            state.outputs[name] = encode_output(output)
+            if fingerprints.get(name):
+                state.fingerprints[name] = fingerprints[name]
+            else:
+                state.fingerprints.pop(name, None)
+        state.recommendation = result.recommendation
+        state.refreshed_at = time.time()
+        return WatchlistRefresh(
+            ticker=ticker, rerun=rerun, reused=list(seed), recommendation=result.recommendation,
+            wall_time=time.perf_counter() - started,
+        )
+
+    async def refresh_once(self) -> list[WatchlistRefresh]:
+        """Run one refresh cycle over the whole watchlist."""
+        started = time.perf_counter()
+        start_date, end_date = self.window()
+        # Polls must see fresh data (neither cached nor read from the store), and so must the agents that rerun
+        self.clients.financial_client.clear_cache()
+        poll_limit = asyncio.Semaphore(self.max_concurrent_polls)
+        run_limit = asyncio.Semaphore(self.max_concurrent_tickers)
+
+        async def refresh(ticker: str) -> WatchlistRefresh:
+            try:
+                return await self.refresh_ticker(ticker, start_date, end_date, poll_limit, run_limit)
+            except Exception as e:
+                logger.error("❌ Refresh failed for %s: %s", ticker, e)
+                return WatchlistRefresh(ticker=ticker, error=f"{type(e).__name__}: {e}")
+
+        refreshes = await asyncio.gather(*(refresh(ticker) for ticker in self.tickers))
+        await asyncio.to_thread(self._save_state)
+
+        changed = [r for r in refreshes if r.rerun]
+        logger.info(
+            "🔁 Refreshed %d tickers in %.2fs: %d changed, %d agent reruns, %d failed",
+            len(refreshes), time.perf_counter() - started, len(changed),
+            sum(len(r.rerun) for r in refreshes), sum(1 for r in refreshes if r.error),
+        )
+        for r in changed:
+            logger.info("🔁 %s reran %s: %s", r.ticker, ", ".join(r.rerun), r.recommendation or "no recommendation")
+        logger.info("📈 News sentiment (score, articles)\n%s", self.sentiment.format_table(self.tickers, as_of=date.today()))
+        return refreshes
+
+    async def run_forever(self, cycles: int | None = None) -> None:
+        """Refresh every `interval` seconds; `cycles` bounds the number of cycles."""
+        cycle = 0
+        while cycles is None or cycle < cycles:
+            started = time.monotonic()
+            await self.refresh_once()
+            cycle += 1
+            if cycles is None or cycle < cycles:
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep watchlist analyses current, rerunning only what changed.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--interval", type=float, default=3600.0, help="Seconds between refresh cycles")
+    parser.add_argument("--lookback-days", type=int, default=365)
+    parser.add_argument("--state", default="watchlist_state.json", help="State file kept across restarts")
+    parser.add_argument("--once", action="store_true", help="Run a single refresh cycle and exit")
+    args = parser.parse_args()
+
+    daemon = WatchlistDaemon(args.tickers, args.lookback_days, args.interval, state_path=args.state)
+    try:
+        asyncio.run(daemon.run_forever(cycles=1 if args.once else None))
+    except KeyboardInterrupt:
+        logger.info("👋 Watchlist daemon stopped")
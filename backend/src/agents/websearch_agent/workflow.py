@@ -1,27 +1,76 @@
-from openai import OpenAI
-import os
+"""
+Web search agent.
+
+Market-wide conditions (rates, inflation, geopolitics) are the same for every ticker on
+a given day, so the research is split in two searches that run concurrently:
+
+- a macro search, keyed by UTC day and kept in `Clients.macro_cache`, so a portfolio run
+  or the watchlist searches the market once however many tickers it analyzes;
+- a per-ticker search about the company and its industry only, on a smaller model with
+  a low search context size.
+
+The two analyses are returned as one document with a section each. With a shared
+ContextIndex, the ticker analysis is also indexed, so later runs can draw on it.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from backend.src.agents.context_index import ContextIndex
 from backend.src.config import CONFIG
+from backend.src.client.async_cache import AsyncTTLCache
 from backend.src.client.oai.model import OpenAIRequest
 from backend.src.client.oai.responses import OpenAIClient
-import asyncio
-from pydantic import BaseModel, Field
+from backend.src.logger import get_logger, LazyRepr
+
+logger = get_logger(__name__)
+
+MACRO_MODEL = "gpt-4.1"
+TICKER_MODEL = "gpt-4.1-mini"
+MACRO_HEADING = "## Market Conditions"
+
+MACRO_SYSTEM_PROMPT = """
+You are a Chartered Financial Analyst (CFA) and a professional trader.
+You are tasked with summarizing the current market-wide conditions that matter to equity investors.
+
+Perform a web search for the latest information and cover:
+- Interest rates and central bank policy.
+- Inflation, employment and growth data.
+- Geopolitical events and trade policy.
+- Overall equity market sentiment, volatility and sector rotation.
+
+DO NOT:
+Discuss any individual company. Company analyses are written separately and combined with yours.
+
+*IMPORTANT*:
+- Focus on the most recent news and information available. DO NOT rely on outdated or historical data.
+- Keep it under 300 words, as short bullet points under a heading per topic.
+""".strip()
 
 
+def macro_cache_key() -> tuple[str, str]:
+    """Key of today's shared macro search: one per UTC day."""
+    return ("macro", datetime.now(timezone.utc).date().isoformat())
+
 
 class WebSearchAgent(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     openai_client: OpenAIClient
     ticker: str
-
-
+    macro_cache: AsyncTTLCache | None = Field(None, description="Shared macro searches; None searches for this ticker alone")
+    context_index: ContextIndex | None = Field(None, description="Shared index the ticker analysis is added to for later runs")
 
     async def _system_prompt(self) -> str:
         return """
 You are a Chartered Financial Analyst (CFA) and a professional trader.
-You are tasked with analyzing macroeconomic trends regarding a specific stock, the industry
-it operates in, and the overall market conditions.
+You are tasked with analyzing the latest developments regarding a specific stock and the industry
+it operates in.
 
 You will be provided with a stock ticker and you will need to perform a web search to gather
-the latest news and information about the stock, its industry, and the overall market conditions.
+the latest news and information about the stock and its industry.
 
 
 
@@ -31,12 +80,14 @@ its current market position, potential risks, and opportunities for investment.
 DO NOT:
 Dive too deep into technical details or financial metrics. These will be provided by other
 agents in the workflow.
+Cover market-wide conditions (interest rates, inflation, geopolitics). They are researched
+separately for all stocks at once.
 
 DO:
 - Analyze the latest news and trends related to the stock.
 - Identify key factors that may impact the stock's performance.
-- Consider the broader economic context, including interest rates, inflation, and geopolitical factors.
-- Provide a high-level analysis of the stock, its industry, and the overall market conditions.
+- Consider how the industry is exposed to the current economic environment.
+- Provide a high-level analysis of the stock and its industry.
 
 *IMPORTANT*:
 - Focus on the most recent new and information available. DO NOT rely on outdated or historical data.
@@ -49,35 +100,67 @@ Here is the stock that I want you to analyze: {self.ticker}
 """.strip()
 
 
-    async def analyze_web_with_llm(self) -> any:
-        """
-        Run the web search workflow using OpenAI's API.
-        """
-        user_prompt = await self._user_prompt()
-        system_prompt = await self._system_prompt()
+    async def _search(self, request: OpenAIRequest, label: str) -> str | None:
+        try:
+            response = await self.openai_client.create_responses_completion(request)
+        except Exception as e:
+            logger.error("Error during OpenAI %s search: %s", label, e)
+            return None
+        if not response:
+            logger.warning("No %s search response received from OpenAI.", label)
+            return None
+        logger.debug("%s search: %s", label, LazyRepr(response))
+        return response.output_text or None
 
+    async def search_macro(self) -> str | None:
+        """Market-wide analysis, shared through `macro_cache` by every ticker searching on the same UTC day."""
+        request = OpenAIRequest(
+            input=[
+                {"role": "system", "content": MACRO_SYSTEM_PROMPT},
+                {"role": "user", "content": "Summarize today's market-wide conditions."},
+            ],
+            model=MACRO_MODEL,
+            tools=[{"type": "web_search_preview", "search_context_size": "medium"}],
+        )
+        if self.macro_cache is None:
+            return await self._search(request, "macro")
+        try:
+            return await self.macro_cache.get(macro_cache_key(), lambda: self._search(request, "macro"))
+        except asyncio.TimeoutError:
+            # The shared search ran out of its own timeout; the ticker analysis is still returned
+            return None
 
+    async def search_ticker(self) -> str | None:
+        """Company and industry analysis of this ticker only."""
         request = OpenAIRequest(
             input=[
-                {"role": "user", "content": user_prompt},
-                {"role": "system", "content": system_prompt}
+                {"role": "user", "content": await self._user_prompt()},
+                {"role": "system", "content": await self._system_prompt()}
             ],
-            model="gpt-4.1",
-            tools=[{"type": "web_search_preview"}],
+            model=TICKER_MODEL,
+            tools=[{"type": "web_search_preview", "search_context_size": "low"}],
         )
+        return await self._search(request, self.ticker.upper())
 
-        try: 
-            response = await self.openai_client.create_responses_completion(request)
-        except Exception as e:
-            print(f"Error during OpenAI request: {e}")
-            return None
-        if not response:
-            print("No response received from OpenAI.")
+    async def analyze_web_with_llm(self) -> str | None:
+        """
+        Run the macro and ticker searches concurrently and combine them. Either half alone
+        is still returned; None only when both fail.
+        """
+        ticker_analysis, macro_analysis = await asyncio.gather(self.search_ticker(), self.search_macro())
+        if ticker_analysis is None and macro_analysis is None:
             return None
+        sections = []
+        if ticker_analysis is not None:
+            sections.append(ticker_analysis.strip())
+            if self.context_index is not None:
+                today = datetime.now(timezone.utc).date()
+                self.context_index.add_document(self.ticker, "web_search", ticker_analysis, today, "web_search")
+        if macro_analysis is not None:
+            sections.append(f"{MACRO_HEADING}\n\n{macro_analysis.strip()}")
+        return "\n\n".join(sections)
 
-        return response.output[1].content[0].text
 
-    
 if __name__ == "__main__":
     # Example usage
 
@@ -0,0 +1,92 @@
+"""
+Point-in-time view over the Financial Datasets API for backtests.
+
+`AsOfFinancialDatasetsClient` fetches the full report history of a ticker once and
+serves every window from that copy, so overlapping windows reuse the same data instead
+of refetching it. Reports are only visible once they would have been filed: a report
+for period P is known as of date D when P + `filing_lag_days` <= D.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
+
+from backend.src.client.fin_datasetsai import FinancialDatasetsClient
+from backend.src.timeseries.store import TimeSeriesStore
+from backend.src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Endpoint -> key of the report list(s) in its response
+HISTORY_ENDPOINTS = {
+    "financial-metrics": ("financial_metrics",),
+    "financials": ("financials", "income_statements", "balance_sheets", "cash_flow_statements"),
+}
+
+
+def _as_date(value: Any) -> Optional[date]:
+    if value is None or value == "":
+        return None
+    return date.fromisoformat(str(value)[:10])
+
+
+class AsOfFinancialDatasetsClient(FinancialDatasetsClient):
+    """
+    Drop-in FinancialDatasetsClient for backtests.
+
+    history_limit: reports fetched per (endpoint, ticker, period) history
+    filing_lag_days: days between a period end and the report being public
+    store: local time-series store; histories it already holds are read from disk
+    """
+
+    def __init__(
+        self,
+        api_key,
+        base_url,
+        history_limit: int = 120,
+        filing_lag_days: int = 45,
+        pool_size: int = 32,
+        store: Optional[TimeSeriesStore] = None,
+    ):
+        # Histories never change during a backtest, so cache them for the life of the client
+        super().__init__(api_key, base_url, cache_ttl=float("inf"), pool_size=pool_size, store=store)
+        self.history_limit = history_limit
+        self.filing_lag = timedelta(days=filing_lag_days)
+
+    def _visible(self, report_period: str, gte: Optional[date], lte: Optional[date]) -> bool:
+        period = _as_date(report_period)
+        if gte and period < gte:
+            return False
+        if lte and period + self.filing_lag > lte:
+            return False
+        return True
+
+    def _filter_reports(self, reports: list, gte: Optional[date], lte: Optional[date], limit: Optional[int]) -> list:
+        visible = [r for r in reports if self._visible(r["report_period"], gte, lte)]
+        visible.sort(key=lambda r: r["report_period"], reverse=True)
+        return visible[:limit] if limit else visible
+
+    def _get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if endpoint not in HISTORY_ENDPOINTS:
+            return super()._get(endpoint, params)
+
+        history_params = {
+            "ticker": params.get("ticker"),
+            "period": params.get("period"),
+            "limit": self.history_limit,
+        }
+        history = super()._get(endpoint, history_params)
+
+        gte = _as_date(params.get("report_period_gte"))
+        lte = _as_date(params.get("report_period_lte"))
+        limit = params.get("limit")
+
+        if endpoint == "financial-metrics":
+            return {"financial_metrics": self._filter_reports(history.get("financial_metrics", []), gte, lte, limit)}
+
+        financials = history.get("financials", {})
+        return {
+            "financials": {
+                key: self._filter_reports(financials.get(key, []), gte, lte, limit)
+                for key in HISTORY_ENDPOINTS["financials"][1:]
+            }
+        }
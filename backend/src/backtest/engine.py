@@ -0,0 +1,272 @@
+"""
+Historical backtesting engine.
+
+Replays the analysis pipeline over rolling windows per ticker, restricted to what was
+known as of each window's end date, and scores each BUY/SELL/HOLD call against the
+realized forward return.
+
+- All windows run concurrently under `max_concurrent_windows`, with shared clients.
+- Report histories and prices are fetched once per ticker and reused by every window.
+- Every window is checkpointed, so an interrupted sweep resumes where it stopped.
+- Outcomes are appended to `outcomes.jsonl` as they complete; `report.json` has the hit rates.
+
+    python backend/src/backtest/engine.py AAPL MSFT --start 2015-01-01 --end 2025-01-01
+"""
+
+import argparse
+import asyncio
+import bisect
+import calendar
+import json
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from backend.src.agents.context_index import ContextIndex
+from backend.src.agents.orchestration import run_analysis
+from backend.src.agents.run_store import RunStore
+from backend.src.backtest.as_of import AsOfFinancialDatasetsClient
+from backend.src.backtest.model import BacktestOutcome, BacktestReport, BacktestWindow, CallStats
+from backend.src.client.clients import Clients, build_clients
+from backend.src.config import CONFIG
+from backend.src.logger import get_logger
+from backend.src.timeseries.peers import PeerEngine
+
+logger = get_logger(__name__)
+
+# There is no point-in-time web data, so the web search stage is replaced with this note
+BACKTEST_WEB_SEARCH_NOTE = (
+    "Web search is not available in backtests because there is no point-in-time web data. "
+    "Base the recommendation on the financial statements and metrics analyses only."
+)
+
+
+def add_months(day: date, months: int) -> date:
+    """Shift by whole months, clamping to the last day of shorter months."""
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def rolling_windows(
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    window_months: int = 12,
+    step_months: int = 3,
+) -> list[BacktestWindow]:
+    """Windows of `window_months` whose end (as-of date) steps by `step_months` from start+window to end."""
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    windows = []
+    as_of = add_months(start, window_months)
+    while as_of <= end:
+        windows.append(BacktestWindow(
+            ticker=ticker, start_date=add_months(as_of, -window_months).isoformat(), as_of=as_of.isoformat(),
+        ))
+        as_of = add_months(as_of, step_months)
+    return windows
+
+
+class BacktestEngine:
+    """
+    tickers: tickers to sweep
+    start_date / end_date: ISO dates bounding the as-of dates
+    window_months: history each analysis sees
+    step_months: distance between consecutive as-of dates
+    horizon_days: forward-return horizon used for scoring (defaults to the step)
+    hold_band: absolute return within which a HOLD counts as correct and BUY/SELL do not
+    """
+
+    def __init__(
+        self,
+        tickers: list[str],
+        start_date: str,
+        end_date: str,
+        window_months: int = 12,
+        step_months: int = 3,
+        horizon_days: int | None = None,
+        hold_band: float = 0.05,
+        max_concurrent_windows: int | None = None,
+        output_dir: str | Path = "backtests",
+        clients: Clients | None = None,
+    ):
+        self.tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        self.start_date = start_date
+        self.end_date = end_date
+        self.window_months = window_months
+        self.step_months = step_months
+        self.horizon_days = horizon_days or step_months * 30
+        self.hold_band = hold_band
+        self.max_concurrent_windows = max_concurrent_windows or CONFIG.max_concurrent_tickers
+        self.output_dir = Path(output_dir)
+
+        if clients is None:
+            clients = build_clients()
+            clients.financial_client = AsOfFinancialDatasetsClient(
+                api_key=CONFIG.financial_datasets_api_key,
+                base_url=CONFIG.financial_datasets_api_url,
+                store=clients.financial_client.store,
+            )
+            # No earlier web searches: the live run store holds searches made after the backtest's windows
+            clients.context_index = ContextIndex()
+            if clients.peers is not None:
+                # Peers are compared on the reports that were public at each window's end
+                clients.peers = PeerEngine(clients.peers.store, filing_lag_days=clients.financial_client.filing_lag.days)
+        self.clients = clients
+        self.run_store = RunStore(self.output_dir / "runs", max_age=None)
+        self._prices: dict[str, asyncio.Task] = {}
+
+    def windows(self) -> list[BacktestWindow]:
+        return [
+            window
+            for ticker in self.tickers
+            for window in rolling_windows(ticker, self.start_date, self.end_date, self.window_months, self.step_months)
+        ]
+
+    async def _load_prices(self, ticker: str) -> tuple[list[date], list[float]]:
+        """Daily closes covering every window plus the scoring horizon, fetched once per ticker."""
+        end = date.fromisoformat(self.end_date) + timedelta(days=self.horizon_days + 10)
+        response = await asyncio.to_thread(
+            self.clients.financial_client.fetch_prices, ticker, self.start_date, end.isoformat(),
+        )
+        points = sorted((date.fromisoformat(p.time[:10]), p.close) for p in response.prices)
+        return [d for d, _ in points], [c for _, c in points]
+
+    async def prices(self, ticker: str) -> tuple[list[date], list[float]]:
+        if ticker not in self._prices:
+            self._prices[ticker] = asyncio.create_task(self._load_prices(ticker))
+        return await self._prices[ticker]
+
+    async def forward_return(self, ticker: str, as_of: str) -> float | None:
+        """Return from the first close on/after `as_of` to the first close on/after `as_of + horizon`."""
+        try:
+            dates, closes = await self.prices(ticker)
+        except Exception as e:
+            logger.warning("No prices for %s: %s", ticker, e)
+            return None
+        start = date.fromisoformat(as_of)
+        i = bisect.bisect_left(dates, start)
+        j = bisect.bisect_left(dates, start + timedelta(days=self.horizon_days))
+        if i >= len(dates) or j >= len(dates) or not closes[i]:
+            return None
+        return closes[j] / closes[i] - 1
+
+    def is_hit(self, recommendation: str, forward_return: float) -> bool:
+        if recommendation == "BUY":
+            return forward_return > self.hold_band
+        if recommendation == "SELL":
+            return forward_return < -self.hold_band
+        return abs(forward_return) <= self.hold_band
+
+    async def run_window(self, window: BacktestWindow) -> BacktestOutcome:
+        outcome = BacktestOutcome(
+            ticker=window.ticker, start_date=window.start_date, as_of=window.as_of, horizon_days=self.horizon_days,
+        )
+        try:
+            result, outcome.forward_return = await asyncio.gather(
+                run_analysis(
+                    window.ticker, window.start_date, window.as_of,
+                    clients=self.clients,
+                    run_store=self.run_store,
+                    resume=True,
+                    seed={"web_search": BACKTEST_WEB_SEARCH_NOTE},
+                ),
+                self.forward_return(window.ticker, window.as_of),
+            )
+        except Exception as e:
+            logger.error("❌ Backtest window %s as of %s failed: %s", window.ticker, window.as_of, e)
+            outcome.error = f"{type(e).__name__}: {e}"
+            return outcome
+
+        outcome.recommendation = result.recommendation
+        outcome.recommendation_text = result.recommendation_text
+        outcome.missing = result.missing
+        if outcome.recommendation and outcome.forward_return is not None:
+            outcome.hit = self.is_hit(outcome.recommendation, outcome.forward_return)
+        return outcome
+
+    async def run(self) -> BacktestReport:
+        """Run every window, appending outcomes to `outcomes.jsonl` as they complete."""
+        windows = self.windows()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        outcomes_path = self.output_dir / "outcomes.jsonl"
+        semaphore = asyncio.Semaphore(self.max_concurrent_windows)
+        logger.info("🧪 Backtesting %d windows across %d tickers", len(windows), len(self.tickers))
+
+        async def bounded(window: BacktestWindow) -> BacktestOutcome:
+            async with semaphore:
+                return await self.run_window(window)
+
+        started = time.perf_counter()
+        outcomes: list[BacktestOutcome] = []
+        tasks = [asyncio.create_task(bounded(window)) for window in windows]
+        try:
+            with outcomes_path.open("a") as f:
+                for next_done in asyncio.as_completed(tasks):
+                    outcome = await next_done
+                    outcomes.append(outcome)
+                    f.write(outcome.model_dump_json() + "\n")
+                    f.flush()
+                    logger.info(
+                        "🧪 %s as of %s: %s (forward return %s) [%d/%d]",
+                        outcome.ticker, outcome.as_of, outcome.error or outcome.recommendation,
+                        f"{outcome.forward_return:+.1%}" if outcome.forward_return is not None else "n/a",
+                        len(outcomes), len(windows),
+                    )
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        report = summarize_backtest(self.tickers, outcomes, time.perf_counter() - started)
+        (self.output_dir / "report.json").write_text(report.model_dump_json(indent=2))
+        return report
+
+
+def _call_stats(outcomes: list[BacktestOutcome]) -> CallStats:
+    returns = [o.forward_return for o in outcomes if o.forward_return is not None]
+    return CallStats(
+        count=len(outcomes),
+        hits=sum(1 for o in outcomes if o.hit),
+        mean_forward_return=sum(returns) / len(returns) if returns else None,
+    )
+
+
+def summarize_backtest(tickers: list[str], outcomes: list[BacktestOutcome], wall_time: float) -> BacktestReport:
+    """Hit rates overall, per call and per ticker, over the windows that could be scored."""
+    scored = [o for o in outcomes if o.hit is not None]
+    return BacktestReport(
+        tickers=tickers,
+        windows=len(outcomes),
+        scored=len(scored),
+        hits=sum(1 for o in scored if o.hit),
+        by_call={call: _call_stats([o for o in scored if o.recommendation == call]) for call in ("BUY", "SELL", "HOLD")},
+        by_ticker={ticker: _call_stats([o for o in scored if o.ticker == ticker]) for ticker in tickers},
+        failed=sum(1 for o in outcomes if o.error is not None),
+        wall_time=wall_time,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest the analysis pipeline over rolling windows.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--start", required=True, help="First date of history (ISO)")
+    parser.add_argument("--end", required=True, help="Last as-of date (ISO)")
+    parser.add_argument("--window-months", type=int, default=12)
+    parser.add_argument("--step-months", type=int, default=3)
+    parser.add_argument("--horizon-days", type=int, default=None)
+    parser.add_argument("--hold-band", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--output-dir", default="backtests")
+    args = parser.parse_args()
+
+    engine = BacktestEngine(
+        args.tickers, args.start, args.end,
+        window_months=args.window_months,
+        step_months=args.step_months,
+        horizon_days=args.horizon_days,
+        hold_band=args.hold_band,
+        max_concurrent_windows=args.concurrency,
+        output_dir=args.output_dir,
+    )
+    report = asyncio.run(engine.run())
+    print(json.dumps({**report.model_dump(), "hit_rate": report.hit_rate}, indent=2))
@@ -0,0 +1,71 @@
+"""
+Data models for historical backtests.
+"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from backend.src.agents.model import Recommendation
+
+
+#### PRICES ####
+## Response Model ##
+class Price(BaseModel):
+    time: str
+    open: Optional[float] = None
+    close: float
+    high: Optional[float] = None
+    low: Optional[float] = None
+    volume: Optional[float] = None
+
+class PricesResponse(BaseModel):
+    ticker: Optional[str] = None
+    prices: List[Price]
+
+
+#### BACKTEST ####
+class BacktestWindow(BaseModel):
+    """One point-in-time analysis: data from `start_date` up to what was known on `as_of`."""
+    ticker: str
+    start_date: str
+    as_of: str
+
+
+class BacktestOutcome(BaseModel):
+    """Recommendation made as of a date, scored against the realized forward return."""
+    ticker: str
+    start_date: str
+    as_of: str
+    horizon_days: int
+    recommendation: Recommendation | None = None
+    forward_return: float | None = Field(None, description="Close-to-close return over the horizon")
+    hit: bool | None = Field(None, description="Whether the call matched the realized move")
+    missing: list[str] = Field(default_factory=list)
+    error: str | None = None
+    recommendation_text: str | None = None
+
+
+class CallStats(BaseModel):
+    count: int = 0
+    hits: int = 0
+    mean_forward_return: float | None = None
+
+    @property
+    def hit_rate(self) -> float | None:
+        return self.hits / self.count if self.count else None
+
+
+class BacktestReport(BaseModel):
+    tickers: list[str]
+    windows: int
+    scored: int = Field(0, description="Windows with both a recommendation and a realized return")
+    hits: int = 0
+    by_call: dict[str, CallStats] = Field(default_factory=dict)
+    by_ticker: dict[str, CallStats] = Field(default_factory=dict)
+    failed: int = 0
+    wall_time: float = 0.0
+
+    @property
+    def hit_rate(self) -> float | None:
+        return self.hits / self.scored if self.scored else None
@@ -0,0 +1,182 @@
+"""
+Command-line entry point for the backend.
+
+    python -m backend.src.cli analyze AAPL --start 2024-01-01 --end 2025-01-01
+    python -m backend.src.cli analyze AAPL --start 2024-01-01 --end 2025-01-01 --dry-run
+    python -m backend.src.cli portfolio AAPL MSFT NVDA --start 2024-01-01 --end 2025-01-01
+    python -m backend.src.cli portfolio $(cat universe.txt) --start 2024-01-01 --end 2025-01-01 --where "debt_to_equity < 1" --top 10
+    python -m backend.src.cli export AAPL MSFT --start 2024-01-01 --end 2025-01-01 --out exports
+
+Only the standard library is imported up front. Each subcommand imports what it needs
+when it runs, so `--help`, `config` and dry runs start in a few tens of milliseconds
+instead of loading the LLM SDKs, the agents and the dashboard stack. Tools that already
+have their own command line (export, serve, watchlist, ...) are forwarded to unchanged.
+"""
+
+import argparse
+import sys
+
+# Subcommand -> module whose own command line it runs, with the remaining arguments
+FORWARDED = {
+    "export": ("backend.src.dashboard.export", "Analyze tickers and export static dashboards and JSON results"),
+    "serve": ("backend.src.dashboard.server", "Serve the job API and dashboards"),
+    "watchlist": ("backend.src.agents.watchlist", "Keep a watchlist current, rerunning only changed agents"),
+    "backtest": ("backend.src.backtest.engine", "Replay the pipeline over rolling windows and score its calls"),
+    "runs": ("backend.src.agents.run_store", "Inspect the run checkpoint store"),
+    "store": ("backend.src.timeseries.store", "Query the local statements, metrics and news store"),
+    "screen": ("backend.src.timeseries.screen", "Screen tickers on their stored metrics"),
+    "peers": ("backend.src.timeseries.peers", "Compare tickers' stored metrics with their peers"),
+    "loadtest": ("backend.src.loadtest.load_test", "Run the pipeline against the fake server under load"),
+    "benchmark": ("backend.src.loadtest.benchmark", "Run the benchmark suite and compare against the baseline"),
+    "fake-server": ("backend.src.loadtest.fake_llm_server", "Serve the fake LLM and financial data endpoints"),
+    "context": ("backend.src.agents.context_index", "Search the stored web-search context of a ticker"),
+    "import-time": ("backend.src.loadtest.import_time", "Measure start-up time against its budget"),
+}
+
+SECRET_SUFFIX = "_api_key"
+
+
+## SUBCOMMANDS ##
+
+def analyze(args: argparse.Namespace) -> int:
+    if args.dry_run:
+        return plan(args)
+
+    import asyncio
+
+    from backend.src.agents.orchestration import master_orchestrator
+
+    message = asyncio.run(master_orchestrator(
+        args.ticker, args.start, args.end,
+        serve_web=not args.no_web, deadline=args.deadline, port=args.port, export_dir=args.export,
+    ))
+    print(message)
+    return 0
+
+
+def plan(args: argparse.Namespace) -> int:
+    """Print what `analyze` would run: agents in order, their budgets and the checkpointed stages it would reuse."""
+    from backend.src.agents.orchestration import build_analysis_dag, pipeline_config, reserve_recommendation_time
+    from backend.src.agents.run_store import RunStore
+    from backend.src.client.clients import build_clients
+    from backend.src.config import CONFIG
+
+    # Building the clients validates the settings; nothing is sent until a request is made
+    dag = build_analysis_dag(args.ticker, args.start, args.end, build_clients())
+    deadline = args.deadline if args.deadline is not None else CONFIG.run_deadline
+    if deadline is not None:
+        reserve_recommendation_time(dag, deadline)
+
+    resumable: dict = {}
+    key = None
+    if CONFIG.run_store_dir:
+        store = RunStore()
+        record = store.open_run(args.ticker, args.start, args.end, pipeline_config())
+        key = record.key
+        resumable = store.completed_stages(record) if CONFIG.resume_runs else {}
+
+    print(f"Analysis of {args.ticker.upper()} from {args.start} to {args.end}")
+    print(f"Deadline: {f'{deadline:g}s' if deadline is not None else 'none'}")
+    resume = "on" if CONFIG.resume_runs else "off"
+    print(f"Checkpoints: {f'{key} (resume {resume})' if key else 'disabled'}")
+    width = max(len(name) for name in dag.nodes)
+    for name in dag.topological_order():
+        node = dag.nodes[name]
+        budget = f"{node.timeout:g}s" if node.timeout is not None else "-"
+        inputs = ", ".join(node.inputs) or "-"
+        status = "resume from checkpoint" if name in resumable else "run"
+        print(f"  {name:<{width}}  budget {budget:>6}  inputs {inputs:<45}  {status}")
+    return 0
+
+
+def portfolio(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from backend.src.agents.portfolio import portfolio_orchestrator
+    from backend.src.timeseries.screen import build_screen
+
+    _, summary = asyncio.run(portfolio_orchestrator(
+        args.tickers, args.start, args.end, max_concurrent_tickers=args.concurrency, deadline=args.deadline,
+        screen=build_screen(args.where, args.rank, args.top, args.screen),
+    ))
+    print(summary.model_dump_json(indent=2))
+    return 0
+
+
+def show_config(args: argparse.Namespace) -> int:
+    """Print the settings as loaded from .env and the environment, with API keys masked."""
+    from backend.src.config import load_config
+
+    for name, value in load_config().model_dump().items():
+        if name.endswith(SECRET_SUFFIX) and value:
+            value = f"{value[:4]}…"
+        print(f"{name} = {value!r}")
+    return 0
+
+
+def forward(command: str, argv: list[str]) -> int:
+    """Run a module's own command line, as `python -m <module> <argv>` would."""
+    import runpy
+
+    module, _ = FORWARDED[command]
+    # run_module replaces argv[0] with the module's path, like `-m` does
+    sys.argv = [module, *argv]
+    try:
+        runpy.run_module(module, run_name="__main__", alter_sys=True)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return 0
+
+
+## PARSER ##
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.src.cli",
+        description="Investment agents: analyze tickers with LLM agents over fundamentals and news.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    analyze_parser = subparsers.add_parser("analyze", help="Analyze one ticker and serve its live dashboard")
+    analyze_parser.add_argument("ticker")
+    analyze_parser.add_argument("--start", required=True, help="Start date (ISO)")
+    analyze_parser.add_argument("--end", required=True, help="End date (ISO)")
+    analyze_parser.add_argument("--no-web", action="store_true", help="Run the analysis without serving the dashboard")
+    analyze_parser.add_argument("--port", type=int, default=0, help="Dashboard port (default: any free port)")
+    analyze_parser.add_argument("--export", default=None, metavar="DIR", help="Write the dashboard and JSON result to DIR instead of serving them")
+    analyze_parser.add_argument("--deadline", type=float, default=None, help="Run deadline in seconds (defaults to RUN_DEADLINE)")
+    analyze_parser.add_argument("--dry-run", action="store_true", help="Print the agents, budgets and resumable checkpoints, then exit")
+    analyze_parser.set_defaults(handler=analyze)
+
+    portfolio_parser = subparsers.add_parser("portfolio", help="Analyze several tickers with shared clients and print the summary")
+    portfolio_parser.add_argument("tickers", nargs="+")
+    portfolio_parser.add_argument("--start", required=True, help="Start date (ISO)")
+    portfolio_parser.add_argument("--end", required=True, help="End date (ISO)")
+    portfolio_parser.add_argument("--concurrency", type=int, default=None, help="Tickers analyzed at once")
+    portfolio_parser.add_argument("--deadline", type=float, default=None, help="Deadline in seconds per ticker")
+    portfolio_parser.add_argument("--where", nargs="+", default=None, metavar="FILTER", help="Screen: metric filters such as 'debt_to_equity < 1'")
+    portfolio_parser.add_argument("--rank", nargs="+", default=None, metavar="FIELD[:asc|desc[:WEIGHT]]", help="Screen: ranking keys")
+    portfolio_parser.add_argument("--top", type=int, default=None, help="Screen: tickers analyzed after ranking")
+    portfolio_parser.add_argument("--screen", default=None, metavar="FILE", help="Screen as JSON; only its shortlist is analyzed")
+    portfolio_parser.set_defaults(handler=portfolio)
+
+    config_parser = subparsers.add_parser("config", help="Print the loaded settings, with API keys masked")
+    config_parser.set_defaults(handler=show_config)
+
+    for command, (_, help_text) in FORWARDED.items():
+        subparsers.add_parser(command, help=f"{help_text} (see `{command} --help`)", add_help=False)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    # Forwarded commands parse their own arguments, --help included
+    if argv and argv[0] in FORWARDED:
+        return forward(argv[0], argv[1:])
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,18 @@
 import os
 import json
-from typing import List, Optional, AsyncGenerator, Dict
-import httpx
-from pydantic import BaseModel, Field, field_validator
+from typing import TYPE_CHECKING, Any, List, Optional, AsyncGenerator, Dict
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 import asyncio
-from anthropic import Anthropic, AsyncAnthropic
+from contextlib import nullcontext
 from backend.src.config import CONFIG
+from backend.src.deadline import cap_timeout
+from backend.src.logger import get_logger, LazyJSON
+from backend.src.tracing import acquire_traced, span
+
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
+
+logger = get_logger(__name__)
 
 # Base URL for Claude endpoints
 ANTHROPIC_API_URL = "https://api.anthropic.com"
@@ -61,8 +68,33 @@ class AnthropicClient(BaseModel):
     """
     anthropic_api_key: str = Field(..., description="API key for Anthropic")
     anthropic_api_url: str = Field(..., description="Base URL for the Anthropic API")
-    timeout: float = CONFIG.timeout
-    max_retries: int = CONFIG.max_retries
+    timeout: float = Field(default_factory=lambda: CONFIG.timeout)
+    max_retries: int = Field(default_factory=lambda: CONFIG.max_retries)
+    max_concurrency: int | None = Field(None, ge=1, description="Max in-flight requests across all callers of this client")
+
+    _client: Any = PrivateAttr(None)
+    _semaphore: asyncio.Semaphore | None = PrivateAttr(None)
+
+    def _get_client(self) -> "AsyncAnthropic":
+        """Reuse one SDK client so requests share its connection pool."""
+        if self._client is None:
+            # The SDK is slow to import; load it with the first request, not with the module
+            from anthropic import AsyncAnthropic
+
+            self._client = AsyncAnthropic(
+                api_key=self.anthropic_api_key,
+                base_url=self.anthropic_api_url,
+                timeout=self.timeout,
+                max_retries=self.max_retries
+            )
+        return self._client
+
+    def _limit(self):
+        if self.max_concurrency is None:
+            return nullcontext()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
 
     async def chat_complete( 
         self, request: ChatCompletionRequest
@@ -70,33 +102,39 @@ class AnthropicClient(BaseModel):
         """
         Perform a chat completion call using the messages API.
         """
-        client = AsyncAnthropic(
-            api_key=self.anthropic_api_key,
-            base_url=self.anthropic_api_url,
-            timeout=self.timeout,
-            max_retries=self.max_retries
-        )
+        client = self._get_client()
 
         payload = request.model_dump(exclude_none=True)
         payload["messages"] = [
             {"role": msg.role, "content": msg.content} for msg in request.messages
         ]
 
-        print(f"Payload for chat_complete: {json.dumps(payload, indent=2)}")
-
-        try:
-            result = await client.messages.create(**payload)
-        except Exception as e:
-            print(f"Error in chat_complete: {e}")
-            return None 
+        logger.info(
+            "chat_complete model=%s messages=%d max_tokens=%d",
+            request.model, len(request.messages), request.max_tokens,
+        )
+        logger.debug("Payload for chat_complete: %s", LazyJSON(payload))
+
+        with span("chat_complete", "llm", model=request.model) as current:
+            try:
+                async with acquire_traced(self._limit(), "anthropic queue"):
+                    # Never let the request or the SDK's retries outlive the caller's deadline
+                    result = await client.messages.create(**payload, timeout=cap_timeout(self.timeout))
+            except Exception as e:
+                logger.error("Error in chat_complete: %s", e)
+                if current is not None:
+                    current.error = f"{type(e).__name__}: {e}"
+                return None
+            if current is not None and result is not None and result.usage is not None:
+                current.attrs.update(input_tokens=result.usage.input_tokens, output_tokens=result.usage.output_tokens)
 
         if not result:
-            print("No result from chat_complete.")
+            logger.warning("No result from chat_complete.")
             return None
 
         raw_response = result.model_dump(exclude_none=True)
         validated_response = ChatCompletionResponse.model_validate(raw_response)
-        print(f"Type of validated_response: {type(validated_response)}")
+        logger.debug("chat_complete usage: %s", validated_response.usage)
 
         return validated_response
 
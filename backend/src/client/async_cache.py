@@ -0,0 +1,95 @@
+"""
+TTL cache for the results of async calls, shared by every ticker of a run.
+
+The first caller of a key starts the call; callers that arrive while it is in flight
+await the same task instead of starting their own, and later callers read the stored
+result until it expires. Failed calls and None results are not stored, so the next
+caller tries again.
+
+The call runs in a task of its own, in an empty context: it belongs to no caller, so
+it is not cut short by the first caller's deadline and records no spans in its trace.
+It has its own timeout instead.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+from backend.src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AsyncTTLCache:
+    def __init__(self, ttl: float | None, max_entries: int = 64, name: str = "cache", timeout: float | None = None):
+        """
+        ttl: seconds to keep a result; None disables the cache (every call runs).
+        max_entries: results kept at most; the oldest are dropped first.
+        name: shown in logs and spans.
+        timeout: seconds a shared call may take; None waits as long as it runs.
+        """
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._results: dict[Hashable, tuple[float, Any]] = {}
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        # Clients may be shared by threads running their own event loops
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """The cached result for `key`, or the result of `fetch()` (started at most once per key and loop)."""
+        if self.ttl is None:
+            return await fetch()
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                self.hits += 1
+                logger.debug("Cache hit for %s %s", self.name, key)
+                return cached[1]
+            task = self._inflight.get(key)
+            if task is None or task.get_loop() is not loop:
+                self.misses += 1
+                task = loop.create_task(self._fetch(key, fetch), context=contextvars.Context())
+                self._inflight[key] = task
+            else:
+                self.hits += 1
+        # Shielded: one caller timing out must not cancel the call the others are waiting for
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await asyncio.wait_for(fetch(), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("⏰ Shared %s call for %s timed out after %gs", self.name, key, self.timeout)
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is asyncio.current_task():
+                    del self._inflight[key]
+        if result is not None:
+            with self._lock:
+                self._results[key] = (time.monotonic(), result)
+                self._prune()
+        return result
+
+    def _prune(self) -> None:
+        """Drop expired results, then the oldest beyond max_entries. Called with the lock held."""
+        now = time.monotonic()
+        for key in [k for k, (stored_at, _) in self._results.items() if now - stored_at >= self.ttl]:
+            del self._results[key]
+        for key in sorted(self._results, key=lambda k: self._results[k][0])[:max(0, len(self._results) - self.max_entries)]:
+            del self._results[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
@@ -0,0 +1,76 @@
+"""
+Bundle of the API clients used by the agents, so one set of clients (and their
+connection pools, caches and concurrency limits) can be shared across tickers.
+"""
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from backend.src.agents.context_index import ContextIndex
+from backend.src.agents.run_store import RunStore
+from backend.src.client.anthropic_client import AnthropicClient
+from backend.src.client.async_cache import AsyncTTLCache
+from backend.src.client.fin_datasetsai import FinancialDatasetsClient
+from backend.src.client.oai.responses import OpenAIClient
+from backend.src.config import CONFIG
+from backend.src.timeseries.peers import PeerEngine
+from backend.src.timeseries.store import TimeSeriesStore
+
+
+class Clients(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    financial_client: FinancialDatasetsClient
+    anthropic_client: AnthropicClient
+    openai_client: OpenAIClient
+    macro_cache: AsyncTTLCache = Field(
+        default_factory=lambda: AsyncTTLCache(CONFIG.macro_cache_ttl, name="macro", timeout=CONFIG.macro_search_timeout),
+        description="Market-wide web searches, shared by every ticker",
+    )
+    peers: PeerEngine | None = Field(None, description="Peer percentiles over the time-series store, shared by every ticker")
+    context_index: ContextIndex = Field(
+        default_factory=ContextIndex,
+        description="Web-search passages and headlines of this and earlier runs, shared by every ticker",
+    )
+
+
+def build_clients(
+    max_concurrent_llm_calls: int | None = None,
+    data_cache_ttl: float | None = None,
+    macro_cache_ttl: float | None = None,
+) -> Clients:
+    """
+    Build the clients from CONFIG.
+
+    max_concurrent_llm_calls: in-flight request limit per LLM provider (defaults to CONFIG)
+    data_cache_ttl: seconds to cache financial data responses (defaults to CONFIG)
+    macro_cache_ttl: seconds to share a market-wide web search across tickers (defaults to CONFIG)
+    """
+    max_concurrent_llm_calls = max_concurrent_llm_calls or CONFIG.max_concurrent_llm_calls
+    data_cache_ttl = data_cache_ttl if data_cache_ttl is not None else CONFIG.data_cache_ttl
+    macro_cache_ttl = macro_cache_ttl if macro_cache_ttl is not None else CONFIG.macro_cache_ttl
+
+    store = TimeSeriesStore() if CONFIG.timeseries_dir else None
+
+    return Clients(
+        financial_client=FinancialDatasetsClient(
+            api_key=CONFIG.financial_datasets_api_key,
+            base_url=CONFIG.financial_datasets_api_url,
+            cache_ttl=data_cache_ttl,
+            store=store,
+        ),
+        anthropic_client=AnthropicClient(
+            anthropic_api_key=CONFIG.anthropic_api_key,
+            anthropic_api_url=CONFIG.anthropic_api_url,
+            max_concurrency=max_concurrent_llm_calls,
+        ),
+        openai_client=OpenAIClient(
+            api_key=CONFIG.openai_api_key,
+            base_url=CONFIG.openai_api_url,
+            timeout=CONFIG.timeout,
+            max_retries=CONFIG.max_retries,
+            max_concurrency=max_concurrent_llm_calls,
+        ),
+        macro_cache=AsyncTTLCache(macro_cache_ttl, name="macro", timeout=CONFIG.macro_search_timeout),
+        peers=PeerEngine(store) if store is not None else None,
+        context_index=ContextIndex(RunStore() if CONFIG.run_store_dir else None, store),
+    )
@@ -1,4 +1,7 @@
 import requests
+import threading
+import time
+from requests.adapters import HTTPAdapter
 from typing import Any, Dict, List, Optional
 from pydantic import ValidationError
 from backend.exceptions import APIError, ValidationFailure
@@ -6,76 +9,199 @@ import asyncio
 from backend.src.agents.company_news_agent.model import CompanyNewsResponse
 from backend.src.agents.financial_metrics_agent.model import FinancialMetricsRequest, FinancialMetricsResponse
 from backend.src.agents.financial_statements_agent.model import FinancialStatementsRequest, FinancialStatementsResponse
+from backend.src.backtest.model import PricesResponse
 from backend.src.config import CONFIG
+from backend.src.deadline import cap_timeout
+from backend.src.logger import get_logger, LazyJSON
+from backend.src.timeseries.store import TimeSeriesStore
+from backend.src.tracing import span
+
+logger = get_logger(__name__)
+
+
+## RESPONSE PARSING ##
+# Module-level so they can run in a worker process (see backend.src.executor)
+
+def parse_financial_metrics(data: Dict[str, Any]) -> FinancialMetricsResponse:
+    metrics = data.get("financial_metrics", [])
+    if not metrics:
+        raise APIError("No financial metrics in response")
+
+    valid = []
+    for i, m in enumerate(metrics):
+        try:
+            valid.append(FinancialMetricsResponse.model_validate({"metrics": [m]}).metrics[0])
+        except ValidationError as e:
+            logger.warning("Skipping metrics item %d that failed validation: %s", i, e)
+            continue
+
+    if not valid:
+        raise ValidationFailure("All metrics failed validation")
+
+    return FinancialMetricsResponse(metrics=valid)
+
+
+def parse_financial_statements(data: Dict[str, Any]) -> FinancialStatementsResponse:
+    return FinancialStatementsResponse.model_validate(data)
+
 
 class FinancialDatasetsClient:
-    def __init__(self, api_key, base_url):
+    def __init__(
+        self,
+        api_key,
+        base_url,
+        cache_ttl: Optional[float] = None,
+        pool_size: int = 32,
+        max_cache_entries: int = 4096,
+        store: Optional[TimeSeriesStore] = None,
+    ):
+        """
+        cache_ttl: seconds to keep successful responses; None disables the cache.
+        pool_size: max pooled connections, shared by every thread using this client.
+        max_cache_entries: responses kept at most; the oldest are dropped first.
+        store: local time-series store; fetched reports are written to it and requests it covers are read from it.
+        """
         self.base_url = base_url
         self.headers = {}
         self.headers["X-API-KEY"] = api_key
+        self.cache_ttl = cache_ttl
+        self.max_cache_entries = max_cache_entries
+        self.store = store
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cache: Dict[tuple, tuple[float, Dict[str, Any]]] = {}
+        self._cache_lock = threading.Lock()
+        self._key_locks: Dict[tuple, threading.Lock] = {}
+        self._last_prune = time.monotonic()
+        # Stored reports synced before this were cleared along with the cache
+        self._store_synced_after: Optional[float] = None
+
+    @staticmethod
+    def _cache_key(endpoint: str, params: Dict[str, Any]) -> tuple:
+        return endpoint, tuple(sorted((k, str(v)) for k, v in params.items() if v is not None))
 
     def _get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        print("\nPARAMS: ", params)
+        with span(f"GET {endpoint}", "http", ticker=params.get("ticker")) as current:
+            stored = self._from_store(endpoint, params)
+            if stored is not None:
+                if current is not None:
+                    current.attrs["stored"] = True
+                return stored
+            if self.cache_ttl is None:
+                return self._fetch(endpoint, params)
+
+            key = self._cache_key(endpoint, params)
+            with self._cache_lock:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+            # One fetch per key at a time; concurrent callers wait and read the cached response
+            with key_lock:
+                cached = self._cache.get(key)
+                if cached and time.monotonic() - cached[0] < self.cache_ttl:
+                    logger.debug("Cache hit for %s", endpoint)
+                    if current is not None:
+                        current.attrs["cached"] = True
+                    return cached[1]
+                data = self._fetch(endpoint, params)
+                self._cache[key] = (time.monotonic(), data)
+            self._prune()
+            return data
+
+    def _prune(self) -> None:
+        """
+        Drop expired and excess responses, and the locks of keys no longer cached. Without
+        this a long-lived client keeps every response it ever fetched.
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            if len(self._cache) <= self.max_cache_entries and now - self._last_prune < self.cache_ttl:
+                return
+            self._last_prune = now
+            entries = sorted(list(self._cache.items()), key=lambda item: item[1][0])
+            excess = len(entries) - self.max_cache_entries
+            for i, (key, (fetched_at, _)) in enumerate(entries):
+                if i < excess or now - fetched_at >= self.cache_ttl:
+                    self._cache.pop(key, None)
+            for key, lock in list(self._key_locks.items()):
+                if key not in self._cache and not lock.locked():
+                    del self._key_locks[key]
+
+    def clear_cache(self) -> None:
+        """Drop cached responses; the next fetch of each request also skips what the store synced until now."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._key_locks.clear()
+            self._store_synced_after = time.time()
+
+    def _from_store(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if self.store is None:
+            return None
+        try:
+            stored = self.store.lookup_response(endpoint, params, synced_after=self._store_synced_after)
+        except Exception as e:
+            logger.warning("Reading %s from the time-series store failed: %s", endpoint, e)
+            return None
+        if stored is not None:
+            logger.debug("Store hit for %s %s", endpoint, params.get("ticker"))
+        return stored
+
+    def _fetch(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
         url = f"{self.base_url}/{endpoint}"
-        print("\nURL: ", url)
-        resp = requests.get(url, headers=self.headers, params=params)
-        print("\nRESPONSE: ", resp.json())
+        logger.info("GET %s", url)
+        logger.debug("GET %s params: %s", url, LazyJSON(params))
+        resp = self.session.get(url, params=params, timeout=cap_timeout(CONFIG.timeout))
         if resp.status_code != 200:
+            logger.error("GET %s failed with %s", url, resp.status_code)
             raise APIError(f"{resp.status_code} {resp.text}")
-        return resp.json()
+        data = resp.json()
+        logger.debug("GET %s response: %s", url, LazyJSON(data))
+        if self.store is not None:
+            try:
+                self.store.ingest_response(endpoint, params, data)
+            except Exception as e:
+                logger.warning("Writing %s to the time-series store failed: %s", endpoint, e)
+        return data
+
+    def fetch_financial_metrics_raw(self, fin_metrics_request: FinancialMetricsRequest) -> Dict[str, Any]:
+        """Unvalidated response of `fetch_financial_metrics`, for parsing off the event loop."""
+        return self._get(
+            "financial-metrics",
+            {
+                "ticker": fin_metrics_request.ticker,
+                "period": fin_metrics_request.period,
+                "limit": fin_metrics_request.limit,
+                "report_period_gte": fin_metrics_request.report_period_gte,
+                "report_period_lte": fin_metrics_request.report_period_lte,
+            },
+        )
 
     def fetch_financial_metrics(
         self, 
         fin_metrics_request: FinancialMetricsRequest
     ) -> FinancialMetricsResponse:
-        ticker = fin_metrics_request.ticker
-        period = fin_metrics_request.period
-        limit = fin_metrics_request.limit
-        report_period_gte = fin_metrics_request.report_period_gte
-        report_period_lte = fin_metrics_request.report_period_lte
-
-        data = self._get(
-            "financial-metrics",
-            {"ticker": ticker, "period": period, "limit": limit, "report_period_gte": report_period_gte, "report_period_lte": report_period_lte},
-        )
-        metrics = data.get("financial_metrics", [])
-        if not metrics:
-            raise APIError("No financial metrics in response")
+        return parse_financial_metrics(self.fetch_financial_metrics_raw(fin_metrics_request))
 
-        valid = []
-        for i, m in enumerate(metrics):
-            try:
-                valid.append(FinancialMetricsResponse.model_validate({"metrics": [m]}).metrics[0])
-            except ValidationError as e:
-                # log.warning(...)
-                continue
-
-        if not valid:
-            raise ValidationFailure("All metrics failed validation")
-
-        return FinancialMetricsResponse(metrics=valid)
-
-    def fetch_financial_statements(
-        self,
-        request: FinancialStatementsRequest,
-    ) -> FinancialStatementsResponse:
+    def fetch_financial_statements_raw(self, request: FinancialStatementsRequest) -> Dict[str, Any]:
+        """Unvalidated response of `fetch_financial_statements`, for parsing off the event loop."""
         params = {
             "ticker": request.ticker,
             "period": request.period,
             "limit": request.limit,
-            "period": request.period,
             "report_period_gte": request.report_period_gte,
             "report_period_lte": request.report_period_lte,
         }
-        # if report_period_gte:
-        #     params["report_period_gte"] = report_period_gte
-        # if report_period_lte:
-        #     params["report_period_lte"] = report_period_lte
-        
-        print("I GER HERE")
+        return self._get("financials", params)
 
-        data = self._get("financials", params)
-        return FinancialStatementsResponse.model_validate(data)
+    def fetch_financial_statements(
+        self,
+        request: FinancialStatementsRequest,
+    ) -> FinancialStatementsResponse:
+        return parse_financial_statements(self.fetch_financial_statements_raw(request))
 
     def fetch_company_news(
         self, ticker: str, 
@@ -94,6 +220,26 @@ class FinancialDatasetsClient:
             raise APIError("No news found")
         return CompanyNewsResponse.model_validate(data)
 
+    def fetch_prices(
+        self,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+        interval: str = "day",
+        interval_multiplier: int = 1,
+    ) -> PricesResponse:
+        params = {
+            "ticker": ticker,
+            "interval": interval,
+            "interval_multiplier": interval_multiplier,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        data = self._get("prices", params)
+        if not data.get("prices"):
+            raise APIError("No prices found")
+        return PricesResponse.model_validate(data)
+
 async def run_fetch_all_data():
     client = FinancialDatasetsClient(
         api_key=CONFIG.financial_datasets_api_key,
@@ -7,7 +7,8 @@ from enum import Enum
 OPENAI_MODELS = Literal[
     'gpt-4o',
     'o3',
-    'gpt-4.1'
+    'gpt-4.1',
+    'gpt-4.1-mini'
 ]
 
 INCLUDE_OPTIONS = Literal[
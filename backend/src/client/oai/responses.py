@@ -1,37 +1,73 @@
 from backend.src.client.oai.model import OpenAIRequest
 from backend.src.config import CONFIG
-from pydantic import BaseModel
-from openai import OpenAI, AsyncOpenAI
+from backend.src.deadline import cap_timeout
+from pydantic import BaseModel, Field, PrivateAttr
 import asyncio
+from contextlib import nullcontext
 from typing import Literal
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Optional
+from backend.src.logger import get_logger, LazyJSON
+from backend.src.tracing import acquire_traced, span
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = get_logger(__name__)
 
 
 
 
 
 class OpenAIClient(BaseModel):
-    api_key: str = CONFIG.openai_api_key
-    base_url: str = CONFIG.openai_api_url
-    timeout: Optional[float] = CONFIG.timeout
-    max_retries: Optional[int] = CONFIG.max_retries
+    api_key: str = Field(default_factory=lambda: CONFIG.openai_api_key)
+    base_url: str = Field(default_factory=lambda: CONFIG.openai_api_url)
+    timeout: Optional[float] = Field(default_factory=lambda: CONFIG.timeout)
+    max_retries: Optional[int] = Field(default_factory=lambda: CONFIG.max_retries)
+    max_concurrency: Optional[int] = Field(None, ge=1, description="Max in-flight requests across all callers of this client")
+
+    _client: Any = PrivateAttr(None)
+    _semaphore: Optional[asyncio.Semaphore] = PrivateAttr(None)
+
+    def _get_client(self) -> "AsyncOpenAI":
+        """Reuse one SDK client so requests share its connection pool."""
+        if self._client is None:
+            # The SDK is slow to import; load it with the first request, not with the module
+            from openai import AsyncOpenAI
+
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self.timeout,
+                max_retries=self.max_retries
+            )
+        return self._client
+
+    def _limit(self):
+        if self.max_concurrency is None:
+            return nullcontext()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
 
     async def create_responses_completion(self, request: OpenAIRequest) -> any:
-        client = AsyncOpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url,
-            timeout=self.timeout,
-            max_retries=self.max_retries
-        )
+        client = self._get_client()
 
         payload = request.model_dump(exclude_none=True)
-        print(f"Payload for create_responses_completion: {payload}")
+        logger.info("create_responses_completion model=%s", request.model)
+        logger.debug("Payload for create_responses_completion: %s", LazyJSON(payload))
 
-        try:
-            response = await client.responses.create(**payload)
-        except Exception as e:
-            print(f"Error in create_responses_completion: {e}")
-            return None
+        with span("create_responses_completion", "llm", model=request.model) as current:
+            try:
+                async with acquire_traced(self._limit(), "openai queue"):
+                    # Never let the request or the SDK's retries outlive the caller's deadline
+                    response = await client.responses.create(**payload, timeout=cap_timeout(self.timeout))
+            except Exception as e:
+                logger.error("Error in create_responses_completion: %s", e)
+                if current is not None:
+                    current.error = f"{type(e).__name__}: {e}"
+                return None
+            if current is not None and getattr(response, "usage", None) is not None:
+                current.attrs.update(input_tokens=response.usage.input_tokens, output_tokens=response.usage.output_tokens)
 
         return response
 
@@ -1,8 +1,9 @@
+from pathlib import Path
 from pydantic import BaseModel, Field
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
+# Relative data paths are resolved against the repository root, not the working directory
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
 
 class GlobalConfig(BaseModel):
     """
@@ -20,17 +21,137 @@ class GlobalConfig(BaseModel):
     timeout: int | None = Field(None, description="Timeout for API requests in seconds") 
     max_retries: int | None = Field(None, description="Maximum number of retries for failed requests")
 
-# Create a global config instance
-CONFIG = GlobalConfig(
-    anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
-    anthropic_api_url=os.getenv("ANTHROPIC_API_URL"),
+    data_cache_ttl: float | None = Field(900.0, description="Seconds to cache financial data responses (inf: no expiry); None disables it")
+    macro_cache_ttl: float | None = Field(21600.0, description="Seconds a market-wide web search is shared across tickers; None disables it")
+    macro_search_timeout: float | None = Field(120.0, description="Seconds the shared market-wide web search may take, whatever each ticker's budget")
+    max_concurrent_tickers: int = Field(8, ge=1, description="Tickers analyzed at once in portfolio mode")
+    max_concurrent_llm_calls: int = Field(16, ge=1, description="LLM requests in flight at once, per provider")
 
-    financial_datasets_api_key=os.getenv("FINANCIAL_DATASETS_API_KEY"),
-    financial_datasets_api_url=os.getenv("FINANCIAL_DATASETS_API_URL"),
+    run_deadline: float | None = Field(None, description="Hard upper bound in seconds for one ticker's analysis")
+    agent_budget: float | None = Field(None, description="Default time budget in seconds for each data/analysis agent")
+    recommendation_reserve: float = Field(30.0, ge=0, description="Seconds of the run deadline reserved for the recommendation")
 
-    openai_api_key=os.getenv("OPENAI_API_KEY"),
-    openai_api_url=os.getenv("OPENAI_API_URL"),
+    run_store_dir: str | None = Field(str(PROJECT_ROOT / ".runs"), description="Directory for run checkpoints; empty disables checkpointing")
+    run_store_max_age: float | None = Field(86400.0, description="Seconds a checkpointed stage stays resumable")
+    resume_runs: bool = Field(False, description="Reuse stages checkpointed by an earlier run of the same analysis instead of rerunning them")
 
-    timeout=int(os.getenv("API_TIMEOUT", "30")),
-    max_retries=int(os.getenv("API_MAX_RETRIES", "3"))
-) 
\ No newline at end of file
+    timeseries_dir: str | None = Field(str(PROJECT_ROOT / ".timeseries"), description="Directory of the local statements/metrics/news store; empty disables it")
+    timeseries_max_age: float | None = Field(86400.0, description="Seconds stored reports are served for a window that includes recent periods")
+    peer_groups_path: str | None = Field(None, description="JSON file of peer groups (name -> tickers) for metric percentiles; every stored ticker is also in 'all'")
+
+    job_store_path: str = Field(str(PROJECT_ROOT / ".jobs.sqlite3"), description="SQLite file of the analysis job queue")
+    job_workers: int = Field(4, ge=1, description="Analysis jobs run at once by the job API")
+    degraded_job_ttl: float = Field(900.0, ge=0, description="Seconds a finished job missing some analyses is reused before it is run again")
+
+    cpu_executor: str = Field("process", description="Executor for CPU-bound stages: 'process', 'thread' or 'inline'")
+    cpu_workers: int | None = Field(None, ge=1, description="Workers of the CPU executor; None uses the CPU count")
+
+    loop_monitor: bool = Field(False, description="Detect and report event-loop stalls during a run")
+    loop_block_threshold: float = Field(0.1, gt=0, description="Seconds the event loop may be blocked before it is reported")
+
+    memory_profile: bool = Field(False, description="Snapshot memory at stage boundaries and track retained objects")
+    memory_profile_top: int = Field(10, ge=1, description="Top allocators reported per stage")
+
+    tracing: bool = Field(True, description="Record spans of each run for the dashboard waterfall")
+    trace_dir: str | None = Field(None, description="Directory to write each run's trace to as JSON; None disables it")
+
+    sentiment_windows: list[int] = Field(default_factory=lambda: [1, 7, 30], description="Rolling news sentiment windows in days")
+
+    log_level: str = Field("INFO", description="Log level for the backend loggers")
+    log_sample_rate: float = Field(1.0, ge=0.0, le=1.0, description="Fraction of DEBUG records to keep")
+    log_format: str = Field("text", description="Log output format: 'text' or 'json'")
+
+def data_path(value: str | None) -> str | None:
+    """Absolute form of a configured data path; empty disables it."""
+    return str(PROJECT_ROOT / Path(value).expanduser()) if value else None
+
+def load_config() -> GlobalConfig:
+    """Read .env and the environment into a GlobalConfig."""
+    # Imported here with the rest of the work, so importing this module stays cheap
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return GlobalConfig(
+        anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
+        anthropic_api_url=os.getenv("ANTHROPIC_API_URL"),
+
+        financial_datasets_api_key=os.getenv("FINANCIAL_DATASETS_API_KEY"),
+        financial_datasets_api_url=os.getenv("FINANCIAL_DATASETS_API_URL"),
+
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        openai_api_url=os.getenv("OPENAI_API_URL"),
+
+        timeout=int(os.getenv("API_TIMEOUT", "30")),
+        max_retries=int(os.getenv("API_MAX_RETRIES", "3")),
+
+        # Empty DATA_CACHE_TTL keeps responses for the life of the process
+        data_cache_ttl=float(os.getenv("DATA_CACHE_TTL", "900") or "inf"),
+        macro_cache_ttl=float(os.getenv("MACRO_CACHE_TTL", "21600")) if os.getenv("MACRO_CACHE_TTL", "21600") else None,
+        macro_search_timeout=float(os.getenv("MACRO_SEARCH_TIMEOUT", "120")) if os.getenv("MACRO_SEARCH_TIMEOUT", "120") else None,
+        max_concurrent_tickers=int(os.getenv("MAX_CONCURRENT_TICKERS", "8")),
+        max_concurrent_llm_calls=int(os.getenv("MAX_CONCURRENT_LLM_CALLS", "16")),
+
+        run_deadline=float(os.getenv("RUN_DEADLINE")) if os.getenv("RUN_DEADLINE") else None,
+        agent_budget=float(os.getenv("AGENT_BUDGET")) if os.getenv("AGENT_BUDGET") else None,
+        recommendation_reserve=float(os.getenv("RECOMMENDATION_RESERVE", "30")),
+
+        run_store_dir=data_path(os.getenv("RUN_STORE_DIR", ".runs")),
+        run_store_max_age=float(os.getenv("RUN_STORE_MAX_AGE", "86400")),
+        resume_runs=os.getenv("RESUME_RUNS", "").lower() in ("1", "true", "yes"),
+
+        timeseries_dir=data_path(os.getenv("TIMESERIES_DIR", ".timeseries")),
+        timeseries_max_age=float(os.getenv("TIMESERIES_MAX_AGE", "86400")),
+        peer_groups_path=data_path(os.getenv("PEER_GROUPS")),
+
+        job_store_path=data_path(os.getenv("JOB_STORE_PATH", ".jobs.sqlite3")),
+        job_workers=int(os.getenv("JOB_WORKERS", "4")),
+        degraded_job_ttl=float(os.getenv("DEGRADED_JOB_TTL", "900")),
+
+        cpu_executor=os.getenv("CPU_EXECUTOR", "process"),
+        cpu_workers=int(os.getenv("CPU_WORKERS")) if os.getenv("CPU_WORKERS") else None,
+
+        loop_monitor=os.getenv("LOOP_MONITOR", "").lower() in ("1", "true", "yes"),
+        loop_block_threshold=float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.1")),
+
+        memory_profile=os.getenv("MEMORY_PROFILE", "").lower() in ("1", "true", "yes"),
+        memory_profile_top=int(os.getenv("MEMORY_PROFILE_TOP", "10")),
+
+        tracing=os.getenv("TRACING", "1").lower() in ("1", "true", "yes"),
+        trace_dir=data_path(os.getenv("TRACE_DIR")),
+
+        sentiment_windows=[int(days) for days in os.getenv("SENTIMENT_WINDOWS", "1,7,30").split(",") if days.strip()],
+
+        log_level=os.getenv("LOG_LEVEL", "INFO"),
+        log_sample_rate=float(os.getenv("LOG_SAMPLE_RATE", "1.0")),
+        log_format=os.getenv("LOG_FORMAT", "text"),
+    ) 
+
+
+class LazyConfig:
+    """
+    Stands in for the GlobalConfig until an attribute is first read, then loads it.
+    Modules import CONFIG at the top; only code that actually reads a setting pays for
+    .env parsing and validation (and needs the API keys set), so `--help` and dry runs
+    start without them.
+    """
+
+    def __init__(self):
+        object.__setattr__(self, "_config", None)
+
+    def _load(self) -> GlobalConfig:
+        if self._config is None:
+            object.__setattr__(self, "_config", load_config())
+        return self._config
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._load(), name, value)
+
+    def __repr__(self) -> str:
+        return repr(self._config) if self._config is not None else "LazyConfig(<not loaded>)"
+
+
+# Global config instance, loaded on first use
+CONFIG = LazyConfig()
@@ -0,0 +1,165 @@
+"""
+Static export of dashboards and results.
+
+Batch runs write a self-contained HTML dashboard and a JSON result per ticker instead
+of starting a server, so the job exits as soon as the analyses finish and the output
+can be served from any static host. In a portfolio run each ticker's files are written
+as soon as it completes, and the index page is rewritten each time, so a partial run
+is still browsable.
+
+    python backend/src/dashboard/export.py AAPL MSFT NVDA --start 2024-01-01 --end 2025-01-01 --out exports
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+from jinja2 import Environment
+
+from backend.src.agents.model import AnalysisResult, PortfolioSummary
+from backend.src.agents.portfolio import stream_portfolio, summarize_portfolio
+from backend.src.client.clients import Clients
+from backend.src.dashboard.render import build_dashboard_page
+from backend.src.logger import get_logger
+from backend.src.loop_monitor import monitored
+
+logger = get_logger(__name__)
+
+INDEX_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Portfolio Analysis - {{ start_date }} to {{ end_date }}</title>
+    <style>
+        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; color: #333;
+               background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); min-height: 100vh; padding: 20px; margin: 0; }
+        .container { max-width: 1000px; margin: 0 auto; background: white; border-radius: 15px; overflow: hidden;
+                     box-shadow: 0 25px 50px rgba(0,0,0,0.15); }
+        .header { background: linear-gradient(45deg, #2c3e50, #34495e); color: white; padding: 2rem; text-align: center; }
+        table { width: 100%; border-collapse: collapse; }
+        th, td { padding: 0.8rem 1.2rem; text-align: left; border-bottom: 1px solid #e8ecef; }
+        th { background: #34495e; color: white; text-transform: uppercase; font-size: 0.85rem; }
+        .BUY { color: #27ae60; font-weight: 600; } .SELL { color: #e74c3c; font-weight: 600; } .HOLD { color: #7f8c8d; font-weight: 600; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>Portfolio Analysis</h1>
+            <div>{{ start_date }} to {{ end_date }} | {{ rows | length }}{% if total %} of {{ total }}{% endif %} tickers</div>
+        </div>
+        <table>
+            <tr><th>Ticker</th><th>Recommendation</th><th>Missing</th><th>Time</th><th>Files</th></tr>
+            {% for row in rows %}
+            <tr>
+                <td><a href="{{ row.html }}">{{ row.ticker }}</a></td>
+                <td class="{{ row.recommendation or '' }}">{{ row.error and 'FAILED' or row.recommendation or 'UNKNOWN' }}</td>
+                <td>{{ row.missing | join(', ') }}</td>
+                <td>{{ '%.1f' | format(row.wall_time) }}s</td>
+                <td><a href="{{ row.html }}">html</a> · <a href="{{ row.json }}">json</a></td>
+            </tr>
+            {% endfor %}
+        </table>
+    </div>
+</body>
+</html>
+"""
+
+_index_template = Environment(autoescape=True).from_string(INDEX_TEMPLATE)
+
+
+def export_name(ticker: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "-", ticker.upper())
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write via a temporary file so a static host never serves a half-written file."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+async def export_result(result: AnalysisResult, out_dir: str | Path) -> tuple[Path, Path]:
+    """Write `<TICKER>.html` and `<TICKER>.json` for one result and return their paths."""
+    out_dir = Path(out_dir)
+    name = export_name(result.ticker)
+    html_path, json_path = out_dir / f"{name}.html", out_dir / f"{name}.json"
+    page = await build_dashboard_page(result)
+    report = json.dumps(result.to_report(), indent=2, default=str).encode()
+
+    def write() -> None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(html_path, page.body)
+        _write_atomic(json_path, report)
+
+    await asyncio.to_thread(write)
+    return html_path, json_path
+
+
+def render_index(start_date: str, end_date: str, results: list[AnalysisResult], total: int | None = None) -> bytes:
+    rows = [
+        {
+            "ticker": r.ticker.upper(),
+            "recommendation": r.recommendation,
+            "error": r.error,
+            "missing": r.missing,
+            "wall_time": r.wall_time,
+            "html": f"{export_name(r.ticker)}.html",
+            "json": f"{export_name(r.ticker)}.json",
+        }
+        for r in sorted(results, key=lambda r: r.ticker.upper())
+    ]
+    return _index_template.render(start_date=start_date, end_date=end_date, rows=rows, total=total).encode()
+
+
+@monitored
+async def export_portfolio(
+    tickers: list[str],
+    start_date: str,
+    end_date: str,
+    out_dir: str | Path,
+    clients: Clients | None = None,
+    max_concurrent_tickers: int | None = None,
+    deadline: float | None = None,
+) -> PortfolioSummary:
+    """
+    Analyze a portfolio and export every ticker as it completes, plus `index.html`
+    and `portfolio.json` with the summary.
+    """
+    out_dir = Path(out_dir)
+    started = time.perf_counter()
+    total = len(dict.fromkeys(tickers))
+    results: list[AnalysisResult] = []
+    async for result in stream_portfolio(
+        tickers, start_date, end_date, clients, max_concurrent_tickers, deadline=deadline,
+    ):
+        results.append(result)
+        html_path, _ = await export_result(result, out_dir)
+        index = render_index(start_date, end_date, results, total)
+        await asyncio.to_thread(_write_atomic, out_dir / "index.html", index)
+        logger.info("💾 Exported %s (%d/%d) to %s", result.ticker.upper(), len(results), total, html_path)
+
+    summary = summarize_portfolio(results, time.perf_counter() - started)
+    await asyncio.to_thread(
+        _write_atomic, out_dir / "portfolio.json", summary.model_dump_json(indent=2).encode(),
+    )
+    logger.info("📁 Portfolio export written to %s", out_dir / "index.html")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze tickers and export static dashboards and JSON results.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--start", required=True, help="Start date (ISO)")
+    parser.add_argument("--end", required=True, help="End date (ISO)")
+    parser.add_argument("--out", default="exports", help="Output directory")
+    parser.add_argument("--concurrency", type=int, default=None, help="Tickers analyzed at once")
+    args = parser.parse_args()
+
+    summary = asyncio.run(export_portfolio(args.tickers, args.start, args.end, args.out, max_concurrent_tickers=args.concurrency))
+    print(summary.model_dump_json(indent=2))
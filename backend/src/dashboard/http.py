@@ -0,0 +1,195 @@
+"""
+Minimal HTTP/1.1 server on asyncio streams.
+
+Runs inside the caller's event loop, so handlers can read orchestration state directly
+and stream Server-Sent Events while agents are still running. Supports keep-alive,
+fixed-length bodies and streamed responses; it is meant for the local dashboard and
+job API, not as a general-purpose web server. Requests it cannot read (malformed or
+oversized Content-Length, chunked bodies) get an error reply and the connection is closed.
+"""
+
+import asyncio
+import json
+import re
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Awaitable, Callable
+from urllib.parse import parse_qs, urlsplit
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from backend.src.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_BODY_BYTES = 1 << 20
+KEEP_ALIVE_TIMEOUT = 15.0
+
+
+class Request(BaseModel):
+    method: str
+    path: str
+    query: dict[str, str] = Field(default_factory=dict)
+    headers: dict[str, str] = Field(default_factory=dict, description="Lower-cased header names")
+    body: bytes = b""
+
+    def json(self) -> Any:
+        return json.loads(self.body or b"null")
+
+
+class Response(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    status: int = 200
+    headers: dict[str, str] = Field(default_factory=dict)
+    body: bytes = b""
+    stream: AsyncIterator[bytes] | None = Field(None, description="Chunks sent after the headers; closes the connection")
+
+    @classmethod
+    def json(cls, value: Any, status: int = 200, headers: dict[str, str] | None = None) -> "Response":
+        return cls(
+            status=status,
+            headers={"Content-Type": "application/json", **(headers or {})},
+            body=json.dumps(value, default=str).encode(),
+        )
+
+    @classmethod
+    def error(cls, status: int, message: str | None = None) -> "Response":
+        return cls.json({"error": message or HTTPStatus(status).phrase}, status=status)
+
+
+Handler = Callable[..., Awaitable[Response]]
+
+
+class RequestError(Exception):
+    """A request that cannot be read; answered with `status` before the connection is closed."""
+
+    def __init__(self, status: int, message: str | None = None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+        self.message = message
+
+
+class HTTPServer:
+    """
+    Route requests to async handlers: `server.route("GET", r"/jobs/(?P<job_id>\\w+)", handler)`
+    calls `handler(request, job_id=...)`.
+    """
+
+    def __init__(self):
+        self._routes: list[tuple[str, re.Pattern, Handler]] = []
+        self._server: asyncio.Server | None = None
+
+    def route(self, method: str, pattern: str, handler: Handler) -> None:
+        self._routes.append((method.upper(), re.compile(f"^{pattern}$"), handler))
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start listening (port 0 picks a free port) and return the base URL."""
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _dispatch(self, request: Request) -> Response:
+        path_matched = False
+        for method, pattern, handler in self._routes:
+            match = pattern.match(request.path)
+            if match is None:
+                continue
+            path_matched = True
+            if method != request.method and not (method == "GET" and request.method == "HEAD"):
+                continue
+            try:
+                return await handler(request, **match.groupdict())
+            except Exception as e:
+                logger.error("❌ %s %s failed: %s", request.method, request.path, e)
+                return Response.error(500)
+        return Response.error(405 if path_matched else 404)
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Request | None:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+            return None
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            return None
+        headers = {}
+        for line in header_lines:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+
+        transfer_encoding = headers.get("transfer-encoding", "").lower()
+        if transfer_encoding:
+            if "chunked" in transfer_encoding:
+                raise RequestError(411, "Chunked request bodies are not supported; send a Content-Length")
+            raise RequestError(501, f"Unsupported Transfer-Encoding: {transfer_encoding}")
+        content_length = headers.get("content-length") or "0"
+        if not content_length.isdigit():
+            raise RequestError(400, "Invalid Content-Length")
+        length = int(content_length)
+        if length > MAX_BODY_BYTES:
+            raise RequestError(413)
+        body = await reader.readexactly(length) if length else b""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return Request(method=method.upper(), path=url.path, query=query, headers=headers, body=body)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except RequestError as e:
+                    logger.warning("Rejected a request with %s: %s", e.status, e)
+                    await self._write_response(writer, Request(method="GET", path=""), Response.error(e.status, e.message), False)
+                    break
+                if request is None:
+                    break
+                response = await self._dispatch(request)
+                keep_alive = request.headers.get("connection", "").lower() != "close" and response.stream is None
+                await self._write_response(writer, request, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _write_response(
+        self, writer: asyncio.StreamWriter, request: Request, response: Response, keep_alive: bool,
+    ) -> None:
+        headers = dict(response.headers)
+        if response.stream is None and response.status != 304:
+            headers.setdefault("Content-Length", str(len(response.body)))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        head = f"HTTP/1.1 {response.status} {HTTPStatus(response.status).phrase}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items()) + "\r\n"
+        writer.write(head.encode("latin-1"))
+        if request.method != "HEAD" and response.status != 304:
+            writer.write(response.body)
+        await writer.drain()
+
+        if response.stream is not None:
+            try:
+                if request.method != "HEAD":
+                    async for chunk in response.stream:
+                        writer.write(chunk)
+                        await writer.drain()
+            finally:
+                # Let the stream unsubscribe when the client goes away
+                await response.stream.aclose()
@@ -0,0 +1,290 @@
+"""
+Analysis job queue.
+
+Jobs are (ticker, start_date, end_date) analyses submitted over HTTP and executed by a
+pool of async workers that share one set of clients, so every user benefits from the
+same warm connection pools, data cache and LLM limits. The queue lives in SQLite:
+queued jobs survive a restart, and jobs that were running when the process died are
+queued again. A submission for a key that already has a queued, running or finished
+job attaches to that job instead of running the analysis again. A finished job that is
+missing some analyses is only attached to for CONFIG.degraded_job_ttl seconds; after
+that the next submission runs the analysis again.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+from backend.src.agents.model import AnalysisResult, Recommendation
+from backend.src.agents.orchestration import run_analysis
+from backend.src.client.clients import Clients, build_clients
+from backend.src.config import CONFIG
+from backend.src.dashboard.live import LiveDashboard
+from backend.src.logger import get_logger
+
+logger = get_logger(__name__)
+
+JobStatus = Literal["queued", "running", "done", "failed"]
+
+# Finished live dashboards kept so late page loads still get their panel events
+MAX_FINISHED_DASHBOARDS = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    recommendation TEXT,
+    error TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (ticker, start_date, end_date, status);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, created_at);
+"""
+
+JOB_COLUMNS = "id, ticker, start_date, end_date, status, created_at, started_at, finished_at, recommendation, error"
+
+
+class JobRequest(BaseModel):
+    ticker: str = Field(..., pattern=r"^[A-Za-z0-9.\-]{1,12}$")
+    start_date: date
+    end_date: date
+    force: bool = Field(False, description="Run again even if a finished job exists for this key")
+
+    @model_validator(mode="after")
+    def _check_window(self) -> "JobRequest":
+        if self.start_date > self.end_date:
+            raise ValueError(f"start_date {self.start_date} is after end_date {self.end_date}")
+        return self
+
+
+class Job(BaseModel):
+    id: str
+    ticker: str
+    start_date: str
+    end_date: str
+    status: JobStatus
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    recommendation: Recommendation | None = None
+    error: str | None = None
+
+
+class JobStore:
+    """
+    SQLite-backed job queue. Methods are blocking; call them through `asyncio.to_thread`.
+
+    degraded_ttl: seconds a finished job with missing analyses is reused (defaults to CONFIG.degraded_job_ttl)
+    """
+
+    def __init__(self, path: str | Path | None = None, degraded_ttl: float | None = None):
+        self.path = Path(path or CONFIG.job_store_path)
+        self.degraded_ttl = degraded_ttl if degraded_ttl is not None else CONFIG.degraded_job_ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _job(self, row: tuple | None) -> Job | None:
+        return Job(**dict(zip(JOB_COLUMNS.split(", "), row))) if row else None
+
+    def submit(self, ticker: str, start_date: str, end_date: str, force: bool = False) -> tuple[Job, bool]:
+        """Queue a job, or return the existing one for this key. The flag is True for a new job."""
+        ticker = ticker.upper()
+        # Finished jobs are reused unless forced; degraded ones (missing analyses) only while recent
+        reuse_done = (
+            "" if force else
+            " OR (status = 'done' AND (IFNULL(json_array_length(result, '$.missing'), 0) = 0 OR finished_at >= ?))"
+        )
+        params = () if force else (time.time() - self.degraded_ttl,)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {JOB_COLUMNS} FROM jobs WHERE ticker = ? AND start_date = ? AND end_date = ? "
+                f"AND (status IN ('queued', 'running'){reuse_done}) ORDER BY created_at DESC LIMIT 1",
+                (ticker, start_date, end_date, *params),
+            ).fetchone()
+            if row:
+                return self._job(row), False
+            job = Job(
+                id=uuid.uuid4().hex[:12], ticker=ticker, start_date=start_date, end_date=end_date,
+                status="queued", created_at=time.time(),
+            )
+            self._conn.execute(
+                "INSERT INTO jobs (id, ticker, start_date, end_date, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job.id, job.ticker, job.start_date, job.end_date, job.status, job.created_at),
+            )
+            return job, True
+
+    def claim(self) -> Job | None:
+        """Mark the oldest queued job as running and return it."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {JOB_COLUMNS} FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if not row:
+                return None
+            job = self._job(row)
+            job.status, job.started_at = "running", time.time()
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?", (job.status, job.started_at, job.id),
+            )
+            return job
+
+    def finish(self, job_id: str, report: dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', finished_at = ?, recommendation = ?, result = ? WHERE id = ?",
+                (time.time(), report.get("recommendation"), json.dumps(report, default=str), job_id),
+            )
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE id = ?",
+                (time.time(), error, job_id),
+            )
+
+    def requeue_running(self) -> int:
+        """Queue again the jobs a previous process was running when it stopped."""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            ).rowcount
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._job(self._conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def result(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def list_jobs(self, status: JobStatus | None = None, limit: int = 100) -> list[Job]:
+        query = f"SELECT {JOB_COLUMNS} FROM jobs"
+        params: tuple = ()
+        if status:
+            query, params = query + " WHERE status = ?", (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at DESC LIMIT ?", (*params, limit)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobRunner:
+    """
+    Pool of async workers executing queued jobs with shared clients.
+
+    workers: jobs run at once (defaults to CONFIG.job_workers)
+    deadline: per-job run deadline in seconds (defaults to CONFIG.run_deadline)
+    """
+
+    def __init__(
+        self,
+        store: JobStore | None = None,
+        clients: Clients | None = None,
+        workers: int | None = None,
+        deadline: float | None = None,
+    ):
+        self.store = store or JobStore()
+        self.clients = clients or build_clients()
+        self.workers = workers or CONFIG.job_workers
+        self.deadline = deadline
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._dashboards: OrderedDict[str, LiveDashboard] = OrderedDict()
+
+    async def start(self) -> None:
+        requeued = await asyncio.to_thread(self.store.requeue_running)
+        if requeued:
+            logger.info("♻️  Requeued %d jobs that were running when the server stopped", requeued)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info("👷 Started %d job workers", self.workers)
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, request: JobRequest) -> tuple[Job, bool]:
+        job, created = await asyncio.to_thread(
+            self.store.submit,
+            request.ticker, request.start_date.isoformat(), request.end_date.isoformat(), request.force,
+        )
+        if created:
+            logger.info("📥 Queued job %s for %s %s to %s", job.id, job.ticker, job.start_date, job.end_date)
+            self._wakeup.set()
+        return job, created
+
+    def dashboard(self, job_id: str) -> LiveDashboard | None:
+        """Live dashboard of a running (or recently finished) job."""
+        return self._dashboards.get(job_id)
+
+    def _track(self, job_id: str, dashboard: LiveDashboard) -> None:
+        self._dashboards[job_id] = dashboard
+        finished = [key for key, d in self._dashboards.items() if d.done]
+        for key in finished[:max(0, len(finished) - MAX_FINISHED_DASHBOARDS)]:
+            del self._dashboards[key]
+
+    async def _worker(self) -> None:
+        while True:
+            # Clear before claiming, so a job submitted after an empty claim still wakes us
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self.store.claim)
+            if job is None:
+                await self._wakeup.wait()
+                continue
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # A worker must outlive any job; losing it would shrink the pool for good
+                logger.exception("❌ Worker error while running job %s", job.id)
+
+    async def _run(self, job: Job) -> None:
+        logger.info("🏃 Running job %s for %s", job.id, job.ticker)
+        dashboard = LiveDashboard(job.ticker, job.start_date, job.end_date, events_url=f"/jobs/{job.id}/events")
+        self._track(job.id, dashboard)
+        try:
+            result: AnalysisResult = await run_analysis(
+                job.ticker, job.start_date, job.end_date,
+                clients=self.clients, deadline=self.deadline, on_node_done=dashboard.on_node_done,
+            )
+            await dashboard.complete(result)
+            await asyncio.to_thread(self.store.finish, job.id, result.to_report())
+            logger.info("✅ Job %s for %s done: %s", job.id, job.ticker, result.recommendation)
+        except asyncio.CancelledError:
+            # Shutting down: leave the job 'running' so the next start queues it again
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.error("❌ Job %s for %s failed: %s", job.id, job.ticker, error)
+            try:
+                await asyncio.to_thread(self.store.fail, job.id, error)
+            except Exception as store_error:
+                logger.error("❌ Could not record job %s as failed: %s", job.id, store_error)
+            try:
+                await dashboard.fail(error)
+            except Exception as dashboard_error:
+                logger.error("❌ Could not show the failure of job %s: %s", job.id, dashboard_error)
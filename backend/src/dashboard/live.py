@@ -0,0 +1,139 @@
+"""
+Progressive dashboard for an analysis that is still running.
+
+The page is served as soon as the run starts, with a loading placeholder in every
+panel. The DAG reports each finished agent through `LiveDashboard.on_node_done`; its
+panel is rendered once and pushed to every open page over Server-Sent Events, so the
+first panel shows up as soon as the fastest agent finishes. Once the run completes, the
+page is served from the cached final render like any other dashboard.
+"""
+
+import asyncio
+import html
+import json
+
+from backend.src.agents.dag import NodeTiming
+from backend.src.agents.model import AnalysisResult
+from backend.src.dashboard.http import HTTPServer, Request, Response
+from backend.src.dashboard.render import DASHBOARD_PANELS, RenderedPage, page_response, render_page, render_panel
+from backend.src.executor import run_cpu
+from backend.src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Agent (DAG node) name -> panel id
+PANEL_BY_NODE = {field: panel for panel, field in DASHBOARD_PANELS.items()}
+# Comment sent on idle event streams so proxies keep them open
+SSE_HEARTBEAT = 15.0
+
+
+def sse_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class LiveDashboard:
+    """
+    Dashboard of one analysis that fills in panel by panel.
+
+    events_url: where the page subscribes for panel updates
+    """
+
+    def __init__(self, ticker: str, start_date: str, end_date: str, events_url: str = "/events"):
+        self.ticker = ticker
+        self.start_date = start_date
+        self.end_date = end_date
+        self.events_url = events_url
+        self.panels: dict[str, str] = {}
+        self.done = False
+        self._page: RenderedPage | None = None
+        self._subscribers: set[asyncio.Queue] = set()
+
+    def _publish(self, event: bytes) -> None:
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    def _set_panel(self, panel: str, html: str) -> None:
+        self.panels[panel] = html
+        # The partial page is stale; the next request renders the new state
+        self._page = None
+        self._publish(sse_event("panel", {"id": panel, "html": html}))
+
+    async def on_node_done(self, name: str, timing: NodeTiming, output) -> None:
+        """DAG callback: render and push the panel of a finished agent."""
+        panel = PANEL_BY_NODE.get(name)
+        if panel is not None and timing.status != "skipped":
+            self._set_panel(panel, await render_panel(output))
+
+    async def complete(self, result: AnalysisResult) -> None:
+        """Fill any panel that was never reported and switch to the final page."""
+        for panel, field in DASHBOARD_PANELS.items():
+            if panel not in self.panels:
+                self._set_panel(panel, await render_panel(getattr(result, field)))
+        self._page = await run_cpu(
+            render_page, self.ticker, self.start_date, self.end_date, self.panels, None, result.trace,
+        )
+        self.done = True
+        self._publish(sse_event("done", {}))
+
+    async def fail(self, error: str) -> None:
+        error_html = f'<div class="error">Analysis failed: {html.escape(error)}</div>'
+        for panel in DASHBOARD_PANELS:
+            if panel not in self.panels:
+                self._set_panel(panel, error_html)
+        self.done = True
+        self._publish(sse_event("done", {}))
+
+    async def page(self) -> RenderedPage:
+        if self._page is None:
+            panels = dict(self.panels)
+            events_url = None if self.done else self.events_url
+            page = await run_cpu(render_page, self.ticker, self.start_date, self.end_date, panels, events_url)
+            # Keep it only if no panel arrived while rendering
+            if panels == self.panels:
+                self._page = page
+            return page
+        return self._page
+
+    async def page_response(self, request: Request) -> Response:
+        status, headers, body = page_response(
+            await self.page(), request.headers.get("if-none-match"), request.headers.get("accept-encoding"),
+        )
+        return Response(status=status, headers=headers, body=body)
+
+    async def _events(self):
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        # Snapshot right after subscribing: earlier panels come from here, later ones from the queue
+        snapshot, done = list(self.panels.items()), self.done
+        try:
+            for panel, html in snapshot:
+                yield sse_event("panel", {"id": panel, "html": html})
+            if done:
+                yield sse_event("done", {})
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                yield event
+                if event.startswith(b"event: done"):
+                    return
+        finally:
+            self._subscribers.discard(queue)
+
+    async def events_response(self, request: Request) -> Response:
+        return Response(
+            headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"},
+            stream=self._events(),
+        )
+
+
+async def serve_dashboard(dashboard: LiveDashboard, host: str = "127.0.0.1", port: int = 0) -> tuple[HTTPServer, str]:
+    """Serve one dashboard at `/` (events at `dashboard.events_url`) and return the server and its URL."""
+    server = HTTPServer()
+    server.route("GET", "/", dashboard.page_response)
+    server.route("GET", dashboard.events_url, dashboard.events_response)
+    url = await server.start(host, port)
+    return server, url
@@ -0,0 +1,638 @@
+"""
+Dashboard rendering.
+
+A dashboard page is rendered once per analysis result: the markdown panels in the CPU
+executor, then the template, then compressed copies of the page. Servers hand out the
+cached bytes with an ETag, so a refresh costs a `304 Not Modified` and a page load is a
+memory copy, however many people are polling the dashboard.
+"""
+
+import asyncio
+import functools
+import gzip
+import hashlib
+import html
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from jinja2 import Environment
+from pydantic import BaseModel, Field
+
+from backend.src.agents.model import AnalysisResult
+from backend.src.executor import run_cpu
+from backend.src.tracing import Span, span
+
+try:
+    import brotli
+except ImportError:  # optional: pages are served gzip-compressed only
+    brotli = None
+
+# HTML template for the dashboard
+HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Financial Analysis Dashboard - {{ ticker }}</title>
+    <style>
+        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }
+
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            min-height: 100vh;
+            padding: 20px;
+        }
+
+        .container {
+            max-width: 1400px;
+            margin: 0 auto;
+            background: white;
+            border-radius: 15px;
+            box-shadow: 0 25px 50px rgba(0,0,0,0.15);
+            overflow: hidden;
+        }
+
+        .header {
+            background: linear-gradient(45deg, #2c3e50, #34495e);
+            color: white;
+            padding: 2.5rem 2rem;
+            text-align: center;
+        }
+
+        .header h1 {
+            font-size: 2.8rem;
+            margin-bottom: 0.5rem;
+            font-weight: 700;
+            text-shadow: 0 2px 4px rgba(0,0,0,0.3);
+        }
+
+        .header .subtitle {
+            font-size: 1.2rem;
+            opacity: 0.9;
+            font-weight: 300;
+        }
+
+        .content {
+            display: grid;
+            grid-template-columns: 1fr 1fr;
+            gap: 0;
+            min-height: 70vh;
+        }
+
+        .analysis-section {
+            padding: 2.5rem;
+            border-right: 1px solid #e8ecef;
+            overflow-y: auto;
+            max-height: 80vh;
+        }
+
+        .analysis-section:last-child {
+            border-right: none;
+        }
+
+        .section-title {
+            color: #2c3e50;
+            font-size: 1.6rem;
+            margin-bottom: 1.5rem;
+            padding-bottom: 0.8rem;
+            border-bottom: 3px solid #3498db;
+            font-weight: 600;
+            display: flex;
+            align-items: center;
+            gap: 0.5rem;
+        }
+
+        .markdown-content {
+            font-size: 0.95rem;
+            line-height: 1.7;
+        }
+
+        .markdown-content h1 {
+            color: #2c3e50;
+            font-size: 1.8rem;
+            margin: 2rem 0 1rem;
+            font-weight: 600;
+            border-bottom: 2px solid #ecf0f1;
+            padding-bottom: 0.5rem;
+        }
+
+        .markdown-content h2 {
+            color: #34495e;
+            font-size: 1.4rem;
+            margin: 1.5rem 0 0.8rem;
+            font-weight: 600;
+        }
+
+        .markdown-content h3 {
+            color: #7f8c8d;
+            font-size: 1.2rem;
+            margin: 1.2rem 0 0.6rem;
+            font-weight: 600;
+        }
+
+        .markdown-content p {
+            margin-bottom: 1.2rem;
+            color: #555;
+            text-align: justify;
+        }
+
+        .markdown-content ul, .markdown-content ol {
+            margin-left: 1.8rem;
+            margin-bottom: 1.2rem;
+        }
+
+        .markdown-content li {
+            margin-bottom: 0.6rem;
+            color: #555;
+        }
+
+        .markdown-content strong {
+            color: #2c3e50;
+            font-weight: 600;
+        }
+
+        .markdown-content code {
+            background: #f8f9fa;
+            padding: 0.3rem 0.5rem;
+            border-radius: 4px;
+            font-family: 'Monaco', 'Menlo', 'Consolas', monospace;
+            font-size: 0.85rem;
+            color: #e74c3c;
+        }
+
+        .markdown-content pre {
+            background: #f8f9fa;
+            padding: 1.5rem;
+            border-radius: 8px;
+            overflow-x: auto;
+            margin: 1.5rem 0;
+            border-left: 4px solid #3498db;
+        }
+
+        .markdown-content blockquote {
+            border-left: 4px solid #3498db;
+            padding-left: 1.5rem;
+            margin: 1.5rem 0;
+            color: #7f8c8d;
+            font-style: italic;
+            background: #f8f9fa;
+            padding: 1rem 1.5rem;
+            border-radius: 0 8px 8px 0;
+        }
+
+        .markdown-content table {
+            width: 100%;
+            border-collapse: collapse;
+            margin: 1.5rem 0;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+            border-radius: 8px;
+            overflow: hidden;
+        }
+
+        .markdown-content th, .markdown-content td {
+            border: 1px solid #e8ecef;
+            padding: 0.8rem;
+            text-align: left;
+        }
+
+        .markdown-content th {
+            background: #34495e;
+            color: white;
+            font-weight: 600;
+            text-transform: uppercase;
+            font-size: 0.85rem;
+            letter-spacing: 0.5px;
+        }
+
+        .markdown-content td {
+            background: white;
+        }
+
+        .markdown-content tr:nth-child(even) td {
+            background: #f8f9fa;
+        }
+
+        @media (max-width: 1024px) {
+            .content {
+                grid-template-columns: 1fr;
+            }
+            
+            .analysis-section {
+                border-right: none;
+                border-bottom: 1px solid #e8ecef;
+                max-height: none;
+            }
+            
+            .analysis-section:last-child {
+                border-bottom: none;
+            }
+            
+            .header h1 {
+                font-size: 2.2rem;
+            }
+            
+            .container {
+                margin: 10px;
+                border-radius: 10px;
+            }
+        }
+
+        .loading {
+            text-align: center;
+            padding: 3rem;
+            color: #7f8c8d;
+            font-size: 1.1rem;
+        }
+
+        .error {
+            background: #e74c3c;
+            color: white;
+            padding: 1.5rem;
+            border-radius: 8px;
+            margin: 1.5rem 0;
+            font-weight: 500;
+        }
+
+        /* Run timeline (span waterfall) */
+        .waterfall {
+            padding: 2rem 2.5rem;
+            border-top: 1px solid #e8ecef;
+            font-size: 0.8rem;
+        }
+
+        .wf-row {
+            display: grid;
+            grid-template-columns: 22rem 1fr 5rem;
+            align-items: center;
+            gap: 0.8rem;
+            height: 1.4rem;
+        }
+
+        .wf-label {
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
+            font-family: 'SF Mono', Monaco, Consolas, monospace;
+        }
+
+        .wf-track {
+            position: relative;
+            height: 0.8rem;
+            background: #f4f6f7;
+            border-radius: 2px;
+        }
+
+        .wf-bar {
+            position: absolute;
+            top: 0;
+            height: 100%;
+            min-width: 2px;
+            border-radius: 2px;
+            background: #95a5a6;
+        }
+
+        .wf-time {
+            text-align: right;
+            color: #7f8c8d;
+        }
+
+        .wf-agent { background: #2c3e50; }
+        .wf-http { background: #3498db; }
+        .wf-queue { background: #f39c12; }
+        .wf-llm { background: #9b59b6; }
+        .wf-cpu { background: #16a085; }
+        .wf-render { background: #27ae60; }
+        .wf-failed { background: #e74c3c; }
+
+        /* Scrollbar styling */
+        .analysis-section::-webkit-scrollbar {
+            width: 6px;
+        }
+
+        .analysis-section::-webkit-scrollbar-track {
+            background: #f1f1f1;
+        }
+
+        .analysis-section::-webkit-scrollbar-thumb {
+            background: #c1c1c1;
+            border-radius: 3px;
+        }
+
+        .analysis-section::-webkit-scrollbar-thumb:hover {
+            background: #a8a8a8;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>Financial Analysis Dashboard</h1>
+            <div class="subtitle">{{ ticker }} | {{ start_date }} to {{ end_date }}</div>
+        </div>
+        
+        <div class="content">
+            <div class="analysis-section">
+                <div class="section-title">📊 Financial Statements Analysis</div>
+                <div class="markdown-content" id="fin_statements_html">
+                    {{ fin_statements_html | safe }}
+                </div>
+            </div>
+            
+            <div class="analysis-section">
+                <div class="section-title">📈 Financial Metrics Analysis</div>
+                <div class="markdown-content" id="fin_metrics_html">
+                    {{ fin_metrics_html | safe }}
+                </div>
+            </div>
+
+            <div class="analysis-section">
+                <div class="section-title">📈 Web Search Analysis</div>
+                <div class="markdown-content" id="web_search_html">
+                    {{ web_search_html | safe }}
+                </div>
+            </div>
+
+            <div class="analysis-section">
+                <div class="section-title">🎯 Investment Recommendation</div>
+                <div class="markdown-content" id="investment_recommendation_html">
+                    {{ investment_recommendation_html | safe }}
+                </div>
+            </div>
+        </div>
+        {% if waterfall %}
+        <div class="waterfall">
+            <div class="section-title">🧭 Run Timeline ({{ trace_duration_ms }} ms)</div>
+            {% for row in waterfall %}
+            <div class="wf-row" title="{{ row.title }}">
+                <div class="wf-label" style="padding-left: {{ row.depth }}rem">{{ row.name }}</div>
+                <div class="wf-track"><div class="wf-bar wf-{{ row.kind }}" style="left: {{ row.left }}%; width: {{ row.width }}%"></div></div>
+                <div class="wf-time">{{ row.duration_ms }} ms</div>
+            </div>
+            {% endfor %}
+        </div>
+        {% endif %}
+    </div>
+    {% if events_url %}
+    <script>
+        // Fill in each panel as its agent finishes
+        const source = new EventSource("{{ events_url }}");
+        source.addEventListener("panel", (event) => {
+            const panel = JSON.parse(event.data);
+            document.getElementById(panel.id).innerHTML = panel.html;
+        });
+        // The final page adds the run timeline
+        source.addEventListener("done", () => { source.close(); location.reload(); });
+    </script>
+    {% endif %}
+</body>
+</html>
+"""
+
+
+@functools.cache
+def _template():
+    """The page template, compiled on first render rather than at import."""
+    return Environment(autoescape=True).from_string(HTML_TEMPLATE)
+
+
+MARKDOWN_EXTENSIONS = ['tables', 'fenced_code', 'codehilite']
+
+# Dashboard panel -> AnalysisResult field
+DASHBOARD_PANELS = {
+    "fin_statements_html": "fin_statements",
+    "fin_metrics_html": "fin_metrics",
+    "web_search_html": "web_search",
+    "investment_recommendation_html": "investment_recommendation",
+}
+
+LOADING_PANEL = '<div class="loading">⏳ Analysis in progress...</div>'
+MISSING_PANEL = '<div class="error">This analysis is not available: the agent failed or ran out of time.</div>'
+
+# Longest traces are cut to their earliest spans in the waterfall
+MAX_WATERFALL_ROWS = 200
+
+# Content codings in order of preference
+PREFERRED_ENCODINGS = ("br", "gzip")
+
+# ETag suffix per content coding, so each representation has its own strong validator
+ETAG_SUFFIXES = {"br": "-br", "gzip": "-gz"}
+
+
+def extract_markdown_content(analysis_text):
+    """Extract markdown content from the analysis text."""
+    if isinstance(analysis_text, str):
+        return analysis_text
+    
+    # Handle different response object structures
+    if hasattr(analysis_text, 'content') and analysis_text.content:
+        if isinstance(analysis_text.content, list) and len(analysis_text.content) > 0:
+            # Handle list of content items
+            content_item = analysis_text.content[0]
+            if isinstance(content_item, dict):
+                return content_item.get('text', str(analysis_text))
+            else:
+                return str(content_item)
+        elif isinstance(analysis_text.content, str):
+            return analysis_text.content
+    
+    # Handle message-like objects
+    if hasattr(analysis_text, 'text'):
+        return analysis_text.text
+    
+    # Fallback to string conversion
+    return str(analysis_text)
+
+
+def render_markdown(markdown_text: str) -> str:
+    """Markdown -> HTML. Module-level so it can run in the CPU executor."""
+    # Imported on first use: the main process only needs it with CPU_EXECUTOR=inline or thread
+    import markdown
+
+    return markdown.markdown(markdown_text, extensions=MARKDOWN_EXTENSIONS)
+
+
+async def render_panel(output) -> str:
+    """Render one agent output as panel HTML in the CPU executor."""
+    if output is None:
+        return MISSING_PANEL
+    with span("render_panel", "render"):
+        try:
+            return await run_cpu(render_markdown, extract_markdown_content(output))
+        except Exception as e:
+            return f'<div class="error">Error rendering dashboard: {html.escape(str(e))}</div>'
+
+
+async def render_dashboard_panels(result: AnalysisResult) -> dict[str, str]:
+    """Render every dashboard panel in the CPU executor, concurrently."""
+    rendered = await asyncio.gather(*(render_panel(getattr(result, field)) for field in DASHBOARD_PANELS.values()))
+    return dict(zip(DASHBOARD_PANELS, rendered))
+
+
+class RenderedPage(BaseModel):
+    """A rendered page and its compressed copies."""
+    etag: str
+    body: bytes
+    encoded: dict[str, bytes] = Field(default_factory=dict, description="Content coding -> compressed body")
+
+    def etag_for(self, coding: str | None) -> str:
+        """ETag of the representation served with `coding` (None for identity)."""
+        return self.etag if coding is None else f'{self.etag[:-1]}{ETAG_SUFFIXES.get(coding, "-" + coding)}"'
+
+
+def waterfall_rows(trace: list[Span]) -> list[dict]:
+    """Bars of the run timeline: offsets and widths in percent of the trace, nested under their parents."""
+    spans = sorted(trace, key=lambda s: s.start)[:MAX_WATERFALL_ROWS]
+    if not spans:
+        return []
+    origin = spans[0].start
+    total = max(s.end for s in spans) - origin or 1.0
+    by_id = {s.id: s for s in trace}
+
+    def depth(s: Span) -> int:
+        d = 0
+        while s.parent in by_id and d < 10:
+            s, d = by_id[s.parent], d + 1
+        return d
+
+    rows = []
+    for s in spans:
+        attrs = ", ".join(f"{k}={v}" for k, v in s.attrs.items() if v is not None)
+        rows.append({
+            "name": s.name,
+            "kind": "failed" if s.error else s.kind,
+            "depth": depth(s),
+            "left": round((s.start - origin) / total * 100, 2),
+            "width": round(s.duration / total * 100, 2),
+            "duration_ms": round(s.duration * 1000),
+            "title": f"{s.kind}: {s.name} {attrs} {s.error or ''}".strip(),
+        })
+    return rows
+
+
+def render_page(
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    panels: dict[str, str],
+    events_url: str | None = None,
+    trace: list[Span] | None = None,
+) -> RenderedPage:
+    """
+    Template and compression. Module-level so it can run in the CPU executor.
+    Panels not rendered yet show a loading placeholder; with `events_url` the page
+    subscribes to it and fills them in as they arrive. With `trace`, the page ends
+    with a waterfall of the run's spans.
+    """
+    panels = {panel: panels.get(panel, LOADING_PANEL) for panel in DASHBOARD_PANELS}
+    waterfall = waterfall_rows(trace or [])
+    trace_duration = max((s.end for s in trace), default=0.0) - min((s.start for s in trace), default=0.0) if trace else 0.0
+    body = _template().render(
+        ticker=ticker.upper(), start_date=start_date, end_date=end_date, events_url=events_url,
+        waterfall=waterfall, trace_duration_ms=round(trace_duration * 1000), **panels,
+    ).encode()
+    encoded = {"gzip": gzip.compress(body, compresslevel=6)}
+    if brotli is not None:
+        encoded["br"] = brotli.compress(body, quality=5)
+    return RenderedPage(etag=f'"{hashlib.sha256(body).hexdigest()[:20]}"', body=body, encoded=encoded)
+
+
+async def build_dashboard_page(result: AnalysisResult) -> RenderedPage:
+    with span("build_dashboard_page", "render"):
+        panels = await render_dashboard_panels(result)
+        return await run_cpu(render_page, result.ticker, result.start_date, result.end_date, panels, None, result.trace)
+
+
+class PageCache:
+    """
+    LRU cache of rendered dashboard pages keyed by a stored result's identity
+    (e.g. its job id and finish time), so a hit never loads or hashes the result.
+    Concurrent requests for the same uncached result share one render.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._pages: OrderedDict[str, RenderedPage] = OrderedDict()
+        self._rendering: dict[str, asyncio.Future] = {}
+
+    async def get(self, key: str, load: Callable[[], Awaitable[AnalysisResult]]) -> RenderedPage:
+        """Page for `key`, rendering the result `load` returns on a miss."""
+        if key in self._pages:
+            self._pages.move_to_end(key)
+            return self._pages[key]
+        rendering = self._rendering.get(key)
+        if rendering is None:
+            rendering = self._rendering[key] = asyncio.ensure_future(self._build(load))
+            rendering.add_done_callback(lambda _: self._rendering.pop(key, None))
+        # A cancelled caller must not cancel the render other callers are waiting on
+        page = await asyncio.shield(rendering)
+        self._pages[key] = page
+        while len(self._pages) > self.max_entries:
+            self._pages.popitem(last=False)
+        return page
+
+    @staticmethod
+    async def _build(load: Callable[[], Awaitable[AnalysisResult]]) -> RenderedPage:
+        return await build_dashboard_page(await load())
+
+
+page_cache = PageCache()
+
+
+## HTTP ##
+
+def negotiate_encoding(accept_encoding: str | None, available) -> str | None:
+    """Pick the preferred content coding the client accepts, or None for identity."""
+    if not accept_encoding:
+        return None
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    for coding in PREFERRED_ENCODINGS:
+        if coding in available and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def page_response(
+    page: RenderedPage,
+    if_none_match: str | None = None,
+    accept_encoding: str | None = None,
+) -> tuple[int, dict[str, str], bytes]:
+    """Status, headers and body to serve a cached page with (`304` when the client's copy is current)."""
+    coding = negotiate_encoding(accept_encoding, page.encoded)
+    headers = {
+        "Content-Type": "text/html; charset=utf-8",
+        "ETag": page.etag_for(coding),
+        # Revalidate on every load; unchanged pages cost an empty 304
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return 304, headers, b""
+    body = page.encoded[coding] if coding else page.body
+    if coding:
+        headers["Content-Encoding"] = coding
+    headers["Content-Length"] = str(len(body))
+    return 200, headers, body
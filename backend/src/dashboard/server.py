@@ -0,0 +1,119 @@
+"""
+Dashboard server with the analysis job API.
+
+    POST /jobs                   {"ticker": "AAPL", "start_date": "2024-01-01", "end_date": "2025-01-01"}
+                                 201 with the new job, or 200 with the job already covering that key
+    GET  /jobs[?status=queued]   latest jobs
+    GET  /jobs/<id>              job status
+    GET  /jobs/<id>/result       200 with the result when done, 202 while queued or running
+    GET  /jobs/<id>/dashboard    dashboard page; fills in live while the job runs
+    GET  /jobs/<id>/events       panel updates (Server-Sent Events)
+
+    python backend/src/dashboard/server.py --port 8000 --workers 4
+"""
+
+import argparse
+import asyncio
+
+from pydantic import ValidationError
+
+from backend.src.agents.model import AnalysisResult
+from backend.src.dashboard.http import HTTPServer, Request, Response
+from backend.src.dashboard.jobs import JobRequest, JobRunner, JobStore
+from backend.src.dashboard.render import page_cache, page_response
+from backend.src.logger import get_logger
+from backend.src.loop_monitor import monitored
+
+logger = get_logger(__name__)
+
+JOB_ID = r"/jobs/(?P<job_id>[0-9a-f]+)"
+
+
+def build_server(runner: JobRunner) -> HTTPServer:
+    store = runner.store
+
+    async def submit_job(request: Request) -> Response:
+        try:
+            job_request = JobRequest.model_validate(request.json())
+        except (ValueError, ValidationError) as e:
+            return Response.error(400, str(e))
+        job, created = await runner.submit(job_request)
+        return Response.json(job.model_dump(), status=201 if created else 200)
+
+    async def list_jobs(request: Request) -> Response:
+        jobs = await asyncio.to_thread(store.list_jobs, request.query.get("status"))
+        return Response.json([job.model_dump() for job in jobs])
+
+    async def get_job(request: Request, job_id: str) -> Response:
+        job = await asyncio.to_thread(store.get, job_id)
+        return Response.json(job.model_dump()) if job else Response.error(404, "No such job")
+
+    async def get_result(request: Request, job_id: str) -> Response:
+        job = await asyncio.to_thread(store.get, job_id)
+        if job is None:
+            return Response.error(404, "No such job")
+        if job.status in ("queued", "running"):
+            return Response.json(job.model_dump(), status=202)
+        if job.status == "failed":
+            return Response.error(409, job.error)
+        return Response.json(await asyncio.to_thread(store.result, job_id))
+
+    async def get_dashboard(request: Request, job_id: str) -> Response:
+        dashboard = runner.dashboard(job_id)
+        if dashboard is not None:
+            return await dashboard.page_response(request)
+        job = await asyncio.to_thread(store.get, job_id)
+        if job is None:
+            return Response.error(404, "No such job")
+        if job.status != "done":
+            return Response.error(409, f"Job is {job.status}")
+
+        async def load() -> AnalysisResult:
+            return AnalysisResult.model_validate(await asyncio.to_thread(store.result, job_id))
+
+        # A finished job's result never changes, so its id and finish time identify the page
+        page = await page_cache.get(f"{job.id}:{job.finished_at}", load)
+        status, headers, body = page_response(
+            page, request.headers.get("if-none-match"), request.headers.get("accept-encoding"),
+        )
+        return Response(status=status, headers=headers, body=body)
+
+    async def get_events(request: Request, job_id: str) -> Response:
+        dashboard = runner.dashboard(job_id)
+        return await dashboard.events_response(request) if dashboard else Response.error(404, "No live dashboard")
+
+    server = HTTPServer()
+    server.route("POST", "/jobs", submit_job)
+    server.route("GET", "/jobs", list_jobs)
+    server.route("GET", JOB_ID, get_job)
+    server.route("GET", f"{JOB_ID}/result", get_result)
+    server.route("GET", f"{JOB_ID}/dashboard", get_dashboard)
+    server.route("GET", f"{JOB_ID}/events", get_events)
+    return server
+
+
+@monitored
+async def serve(host: str = "127.0.0.1", port: int = 8000, workers: int | None = None) -> None:
+    runner = JobRunner(workers=workers)
+    await runner.start()
+    server = build_server(runner)
+    url = await server.start(host, port)
+    logger.info("🌐 Job API listening on %s", url)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+        await runner.close()
+        runner.store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the analysis job API and dashboards.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="Jobs run at once (defaults to JOB_WORKERS)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        logger.info("👋 Job API stopped")
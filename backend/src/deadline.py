@@ -0,0 +1,63 @@
+"""
+Deadline propagation for orchestration runs.
+
+The DAG engine sets an absolute deadline in a context variable for every node it runs.
+Clients read it with `remaining_time()` and cap their request timeouts, so a request
+(and the SDK's retries) never outlive the budget of the agent that issued it.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when work is started after its deadline has already passed."""
+    pass
+
+
+def current_deadline() -> float | None:
+    """Absolute deadline on the `time.monotonic()` clock, or None."""
+    return _deadline.get()
+
+
+def remaining_time() -> float | None:
+    """Seconds left before the current deadline, or None when there is no deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def cap_timeout(timeout: float | None) -> float | None:
+    """
+    Cap a request timeout to the remaining budget.
+    Raises DeadlineExceeded if the budget is already spent.
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        raise DeadlineExceeded("Deadline already passed")
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[None]:
+    """
+    Set a deadline `seconds` from now for the enclosed code. Nested scopes can only
+    tighten the deadline, never extend it.
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(deadline, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
@@ -0,0 +1,108 @@
+"""
+Executor for CPU-bound pipeline stages.
+
+Response validation, prompt serialization and markdown rendering are pure CPU work.
+Run on the event loop thread (or in `asyncio.to_thread`, which still holds the GIL)
+they delay every network callback of a portfolio run. `run_cpu` sends them to a
+process pool instead, so they scale across cores and the loop stays responsive.
+
+The executor is picked by CONFIG.cpu_executor:
+- "process": a process pool of CONFIG.cpu_workers workers (default)
+- "thread": a thread pool, for environments where worker processes are unavailable
+- "inline": run on the calling thread, for debugging and profiling
+
+Functions sent to the process pool must be module-level and take and return picklable
+values. Keep what crosses the boundary small: pass raw JSON in and get a string back,
+rather than shipping validated models both ways.
+"""
+
+import asyncio
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Literal, TypeVar
+
+from backend.src.config import CONFIG
+from backend.src.logger import get_logger
+from backend.src.tracing import span
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+ExecutorKind = Literal["process", "thread", "inline"]
+
+# Imported once by the fork server, so workers start warm instead of importing on first use
+PRELOAD_MODULES = [
+    "markdown",
+    "backend.src.client.fin_datasetsai",
+    "backend.src.agents.financial_metrics_agent.workflow",
+    "backend.src.agents.financial_statements_agent.workflow_new",
+    "backend.src.dashboard.render",
+]
+
+_executor: Executor | None = None
+_kind: ExecutorKind | None = None
+_workers: int | None = None
+_lock = threading.Lock()
+
+
+def configure_executor(kind: ExecutorKind | None = None, workers: int | None = None) -> None:
+    """Select the executor (defaults to CONFIG); replaces any executor already running."""
+    global _kind, _workers
+    if kind is not None and kind not in ("process", "thread", "inline"):
+        raise ValueError(f"Unknown executor kind: {kind}")
+    shutdown_executor()
+    _kind, _workers = kind, workers
+
+
+def executor_kind() -> ExecutorKind:
+    return _kind or CONFIG.cpu_executor
+
+
+def get_executor() -> Executor | None:
+    """The shared executor, created on first use; None when running inline."""
+    global _executor
+    kind = executor_kind()
+    if kind == "inline":
+        return None
+    with _lock:
+        if _executor is None:
+            workers = _workers or CONFIG.cpu_workers
+            if kind == "process":
+                # Never fork: the parent runs logging and connection pool threads
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context("forkserver")
+                    context.set_forkserver_preload(PRELOAD_MODULES)
+                else:
+                    context = multiprocessing.get_context("spawn")
+                _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+                # Start the fork server (and its imports) now rather than on the first task
+                _executor.submit(int).result()
+            else:
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cpu")
+            logger.info("⚙️  Started %s executor for CPU-bound stages", kind)
+        return _executor
+
+
+async def run_cpu(fn: Callable[..., T], *args) -> T:
+    """Run `fn(*args)` on the CPU executor and await its result."""
+    with span(fn.__name__, "cpu"):
+        if executor_kind() == "inline":
+            return fn(*args)
+        # Starting a process pool blocks, so the first caller does it off the loop
+        executor = _executor or await asyncio.to_thread(get_executor)
+        if executor is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+atexit.register(shutdown_executor)
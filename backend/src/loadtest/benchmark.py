@@ -0,0 +1,394 @@
+"""
+End-to-end benchmark suite for the analysis pipeline.
+
+Drives `master_orchestrator`, each agent and each client against the fake LLM server at
+several scales (tickers per run) and records, per scenario and scale:
+
+- wall time and per-ticker latency
+- event-loop blocking: total time the loop was late by more than LOOP_LAG_THRESHOLD,
+  and the worst single stall
+- memory high-water mark (max RSS) of the benchmark process
+- requests, input tokens and output tokens per ticker, counted by the fake server
+
+Each scenario and scale runs in a fresh interpreter, so memory high-water marks and
+caches do not leak from one measurement into the next. Results are written as JSON and
+compared against a stored baseline; the exit status is 1 when a metric regressed.
+
+    python -m backend.src.loadtest.benchmark --scales 1 10 100 1000
+    python -m backend.src.loadtest.benchmark --save-baseline              # record the reference run
+    python -m backend.src.loadtest.benchmark --scenarios orchestrator --scales 1 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from pydantic import BaseModel, Field
+
+from backend.src.loadtest.fake_llm_server import FakeServerConfig, server_env, start_fake_server
+from backend.src.loadtest.load_test import percentile
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_SCALES = (1, 10, 100, 1000)
+DEFAULT_OUTPUT = "benchmarks/results.json"
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+START_DATE, END_DATE = "2024-01-01", "2025-01-01"
+RESULT_PREFIX = "BENCHMARK_RESULT "
+
+# Fast latency profile: long enough to exercise concurrency, short enough for 1,000 tickers
+BENCHMARK_SERVER = FakeServerConfig(
+    ttft_ms=50, tokens_per_sec=4000, output_tokens=200, jitter=0.0, data_latency_ms=10,
+)
+
+# Loop lag sampling
+LOOP_LAG_INTERVAL = 0.005
+LOOP_LAG_THRESHOLD = 0.010
+
+# metric -> allowed relative increase over the baseline before it counts as a regression
+REGRESSION_TOLERANCE = {
+    "wall_time_s": 0.20,
+    "latency_p95_s": 0.25,
+    "loop_blocked_s": 0.50,
+    "max_loop_lag_ms": 0.50,
+    "rss_high_water_mb": 0.20,
+    "requests_per_ticker": 0.05,
+    "input_tokens_per_ticker": 0.05,
+    "output_tokens_per_ticker": 0.05,
+}
+# Changes below these absolute amounts are noise, whatever the ratio
+NOISE_FLOOR = {
+    "wall_time_s": 0.05,
+    "latency_p95_s": 0.05,
+    "loop_blocked_s": 0.05,
+    "max_loop_lag_ms": 20.0,
+    "rss_high_water_mb": 10.0,
+}
+
+
+class ScenarioResult(BaseModel):
+    scenario: str
+    tickers: int
+    concurrency: int
+    wall_time_s: float
+    latency_p50_s: float
+    latency_p95_s: float
+    failed: int = 0
+    loop_blocked_s: float = Field(..., description="Total loop lag above LOOP_LAG_THRESHOLD")
+    max_loop_lag_ms: float
+    rss_high_water_mb: float
+    rss_after_import_mb: float
+    requests_per_ticker: float = 0.0
+    input_tokens_per_ticker: float = 0.0
+    output_tokens_per_ticker: float = 0.0
+    requests: dict[str, int] = Field(default_factory=dict, description="Fake server route -> requests")
+
+
+class Regression(BaseModel):
+    scenario: str
+    tickers: int
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else float("inf")
+
+
+## MEASUREMENT ##
+
+class LoopLagMonitor:
+    """
+    Samples how late the event loop wakes a short sleep. Lag beyond the threshold
+    means a callback held the loop; it is summed into `blocked` and the worst stall is kept.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, threshold: float = LOOP_LAG_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.blocked = 0.0
+        self.max_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - expected
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.threshold:
+                self.blocked += lag
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._sample())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+def max_rss_mb() -> float:
+    """High-water RSS of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024
+
+
+## SCENARIOS ##
+
+# Scenario callables take (ticker, clients) and run one unit of work for that ticker
+ScenarioFn = Callable[..., Awaitable[object]]
+
+CANNED_ANALYSIS = "Revenue grew 8% year over year; margins were stable and guidance was reaffirmed."
+
+
+def build_scenarios() -> dict[str, ScenarioFn]:
+    """Import the pipeline (after the environment points CONFIG at the fake server) and list the scenarios."""
+    from backend.src.agents.orchestration import (
+        build_analysis_dag, build_fin_metrics_request, build_fin_statements_request, master_orchestrator,
+    )
+    from backend.src.client.anthropic_client import ChatCompletionRequest, ChatMessage
+    from backend.src.client.oai.model import OpenAIRequest
+
+    async def orchestrator(ticker, clients):
+        return await master_orchestrator(ticker, START_DATE, END_DATE, serve_web=False, clients=clients)
+
+    def agent(name: str) -> ScenarioFn:
+        async def run(ticker, clients):
+            node = build_analysis_dag(ticker, START_DATE, END_DATE, clients).nodes[name]
+            output = await node.run(**{key: CANNED_ANALYSIS for key in node.inputs})
+            if output is None:
+                raise RuntimeError(f"{name} returned no output")
+            return output
+        return run
+
+    async def financial_metrics(ticker, clients):
+        request = build_fin_metrics_request(ticker, START_DATE, END_DATE)
+        return await asyncio.to_thread(clients.financial_client.fetch_financial_metrics, request)
+
+    async def financial_statements(ticker, clients):
+        request = build_fin_statements_request(ticker, START_DATE, END_DATE)
+        return await asyncio.to_thread(clients.financial_client.fetch_financial_statements, request)
+
+    async def company_news(ticker, clients):
+        return await asyncio.to_thread(clients.financial_client.fetch_company_news, ticker, 10)
+
+    async def anthropic(ticker, clients):
+        request = ChatCompletionRequest(
+            model="claude-sonnet-4-20250514",
+            messages=[ChatMessage(role="user", content=f"Summarize the outlook for {ticker}. {CANNED_ANALYSIS}")],
+            max_tokens=1024,
+        )
+        if await clients.anthropic_client.chat_complete(request) is None:
+            raise RuntimeError("chat_complete returned no response")
+
+    async def openai(ticker, clients):
+        request = OpenAIRequest(input=f"Latest news on {ticker}", model="gpt-4.1", tools=[{"type": "web_search_preview"}])
+        if await clients.openai_client.create_responses_completion(request) is None:
+            raise RuntimeError("create_responses_completion returned no response")
+
+    return {
+        "orchestrator": orchestrator,
+        "agent:fin_statements": agent("fin_statements"),
+        "agent:fin_metrics": agent("fin_metrics"),
+        "agent:web_search": agent("web_search"),
+        "agent:investment_recommendation": agent("investment_recommendation"),
+        "client:financial_metrics": financial_metrics,
+        "client:financial_statements": financial_statements,
+        "client:company_news": company_news,
+        "client:anthropic": anthropic,
+        "client:openai": openai,
+    }
+
+
+SCENARIOS = (
+    "orchestrator",
+    "agent:fin_statements", "agent:fin_metrics", "agent:web_search", "agent:investment_recommendation",
+    "client:financial_metrics", "client:financial_statements", "client:company_news",
+    "client:anthropic", "client:openai",
+)
+
+
+async def measure(scenario: str, n_tickers: int, concurrency: int) -> dict:
+    """Run one scenario for `n_tickers` synthetic tickers in this process and return its measurements."""
+    from backend.src.client.clients import build_clients
+
+    fn = build_scenarios()[scenario]
+    clients = build_clients()
+    rss_after_import = max_rss_mb()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(ticker: str) -> tuple[float, bool]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await fn(ticker, clients)
+                ok = True
+            except Exception as e:
+                print(f"{scenario} {ticker}: {type(e).__name__}: {e}", file=sys.stderr)
+                ok = False
+            return time.perf_counter() - started, ok
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(one(f"T{i:04d}") for i in range(n_tickers)))
+    wall_time = time.perf_counter() - started
+    await monitor.stop()
+
+    latencies = [latency for latency, _ in outcomes]
+    return {
+        "scenario": scenario,
+        "tickers": n_tickers,
+        "concurrency": concurrency,
+        "wall_time_s": round(wall_time, 4),
+        "latency_p50_s": round(percentile(latencies, 50), 4),
+        "latency_p95_s": round(percentile(latencies, 95), 4),
+        "failed": sum(not ok for _, ok in outcomes),
+        "loop_blocked_s": round(monitor.blocked, 4),
+        "max_loop_lag_ms": round(monitor.max_lag * 1000, 2),
+        "rss_high_water_mb": round(max_rss_mb(), 1),
+        "rss_after_import_mb": round(rss_after_import, 1),
+    }
+
+
+def run_isolated(scenario: str, n_tickers: int, concurrency: int, env: dict[str, str], timeout: float) -> dict:
+    """Run `measure` in a fresh interpreter and return its measurements."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "backend.src.loadtest.benchmark", "--worker",
+         "--scenarios", scenario, "--scales", str(n_tickers), "--concurrency", str(concurrency)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=timeout,
+    )
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"{scenario} at {n_tickers} tickers exited with {proc.returncode}: {proc.stderr[-2000:]}")
+
+
+## SUITE ##
+
+def run_suite(
+    scenarios: list[str],
+    scales: list[int],
+    concurrency: int,
+    server_config: FakeServerConfig = BENCHMARK_SERVER,
+    timeout: float = 1800,
+) -> dict:
+    """Run every scenario at every scale against one fake server and return the report."""
+    server = start_fake_server(server_config)
+    env = {
+        **os.environ,
+        **server_env(server),
+        "LOG_LEVEL": "WARNING",
+        # Measure the work itself: no checkpoint resumes, and a cold data cache per process
+        "RUN_STORE_DIR": "",
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])),
+    }
+    results: list[ScenarioResult] = []
+    try:
+        for scenario in scenarios:
+            for n_tickers in scales:
+                server.stats.reset()
+                measured = run_isolated(scenario, n_tickers, concurrency, env, timeout)
+                stats = server.stats.snapshot()
+                result = ScenarioResult(
+                    **measured,
+                    requests_per_ticker=round(sum(stats["requests"].values()) / n_tickers, 3),
+                    input_tokens_per_ticker=round(stats["input_tokens"] / n_tickers, 1),
+                    output_tokens_per_ticker=round(stats["output_tokens"] / n_tickers, 1),
+                    requests=stats["requests"],
+                )
+                results.append(result)
+                print(
+                    f"{scenario:<34} {n_tickers:>5} tickers  {result.wall_time_s:>8.2f}s  "
+                    f"blocked {result.loop_blocked_s:>6.3f}s  rss {result.rss_high_water_mb:>7.1f}MB  "
+                    f"{result.requests_per_ticker:>5.1f} req/ticker  failed {result.failed}",
+                    file=sys.stderr,
+                )
+    finally:
+        server.shutdown()
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "server_config": server_config.model_dump(),
+        "results": [result.model_dump() for result in results],
+    }
+
+
+def compare(report: dict, baseline: dict) -> list[Regression]:
+    """Metrics of `report` that are worse than `baseline` beyond their tolerance and noise floor."""
+    previous = {(r["scenario"], r["tickers"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        base = previous.get((result["scenario"], result["tickers"]))
+        if base is None:
+            continue
+        for metric, tolerance in REGRESSION_TOLERANCE.items():
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if new - old > NOISE_FLOOR.get(metric, 0.0) and new > old * (1 + tolerance):
+                regressions.append(Regression(
+                    scenario=result["scenario"], tickers=result["tickers"], metric=metric, baseline=old, current=new,
+                ))
+        if result["failed"] > base.get("failed", 0):
+            regressions.append(Regression(
+                scenario=result["scenario"], tickers=result["tickers"], metric="failed",
+                baseline=base.get("failed", 0), current=result["failed"],
+            ))
+    return regressions
+
+
+def write_json(path: str | Path, value: dict) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(value, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline, agents and clients against the fake LLM server.")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--scales", nargs="+", type=int, default=list(DEFAULT_SCALES), help="Tickers per run")
+    parser.add_argument("--concurrency", type=int, default=50, help="Tickers in flight at once")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds allowed per scenario and scale")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        measured = asyncio.run(measure(args.scenarios[0], args.scales[0], args.concurrency))
+        print(RESULT_PREFIX + json.dumps(measured), flush=True)
+        sys.exit(0)
+
+    report = run_suite(args.scenarios, args.scales, args.concurrency, timeout=args.timeout)
+    write_json(args.output, report)
+    print(f"📝 Results written to {args.output}")
+
+    if args.save_baseline:
+        write_json(args.baseline, report)
+        print(f"📌 Baseline saved to {args.baseline}")
+        sys.exit(0)
+    if not Path(args.baseline).exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        sys.exit(0)
+
+    regressions = compare(report, json.loads(Path(args.baseline).read_text()))
+    for r in regressions:
+        print(f"❌ {r.scenario} @ {r.tickers}: {r.metric} {r.baseline} -> {r.current} ({r.change:+.0%})")
+    if regressions:
+        sys.exit(1)
+    print("✅ No regressions against the baseline")
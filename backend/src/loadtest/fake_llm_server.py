@@ -0,0 +1,487 @@
+"""
+Latency-simulating stand-in for the upstream APIs used by the agents.
+
+Speaks the subset of the APIs our clients call:
+- Anthropic Messages:     POST /v1/messages   (JSON or SSE streaming)
+- OpenAI Responses:       POST /v1/responses  (JSON or SSE streaming)
+- Financial Datasets:     GET  /fd/financial-metrics, /fd/financials, /fd/news, /fd/prices
+
+Point the clients at it with
+    ANTHROPIC_API_URL=http://127.0.0.1:<port>
+    OPENAI_API_URL=http://127.0.0.1:<port>/v1
+    FINANCIAL_DATASETS_API_URL=http://127.0.0.1:<port>/fd
+
+Run standalone:
+    python backend/src/loadtest/fake_llm_server.py --port 8787 --ttft-ms 400 --tokens-per-sec 80
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from pydantic import BaseModel, Field
+
+
+class FakeServerConfig(BaseModel):
+    """
+    Latency and failure profile of the fake server.
+    """
+    ttft_ms: float = Field(300.0, ge=0, description="Time to first token in milliseconds")
+    tokens_per_sec: float = Field(100.0, gt=0, description="Generation speed after the first token")
+    output_tokens: int = Field(400, ge=1, description="Tokens generated per LLM response")
+    jitter: float = Field(0.1, ge=0, le=1, description="Relative random jitter applied to latencies")
+    error_rate: float = Field(0.0, ge=0, le=1, description="Fraction of LLM requests answered with a 500")
+    rate_limit_rate: float = Field(0.0, ge=0, le=1, description="Fraction of LLM requests answered with a 429")
+    retry_after_ms: int = Field(200, ge=0, description="Retry-after hint sent with 429 responses")
+    data_latency_ms: float = Field(50.0, ge=0, description="Latency of the financial data endpoints")
+
+
+class FakeServerStats:
+    """
+    Thread-safe counters, exposed at GET /_stats.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests: dict[str, int] = {}
+            self.rate_limited = 0
+            self.errors = 0
+            self.input_tokens = 0
+            self.output_tokens = 0
+
+    def record(self, route: str, input_tokens: int = 0, output_tokens: int = 0) -> None:
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+    def record_failure(self, rate_limited: bool) -> None:
+        with self._lock:
+            if rate_limited:
+                self.rate_limited += 1
+            else:
+                self.errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "rate_limited": self.rate_limited,
+                "errors": self.errors,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+            }
+
+
+FILLER_WORDS = (
+    "revenue margin growth guidance liquidity leverage outlook demand pricing "
+    "supply chain buyback dividend valuation multiple risk catalyst quarter"
+).split()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def fake_tokens(n: int) -> list[str]:
+    """Generate `n` pseudo tokens; the first one is a recommendation so parsers have something to find."""
+    tokens = ["## HOLD\n"]
+    tokens.extend(f"{random.choice(FILLER_WORDS)} " for _ in range(n - 1))
+    return tokens
+
+
+## FINANCIAL DATA FIXTURES ##
+
+def _rng(*parts: str) -> random.Random:
+    """Deterministic values per report period or news item, so repeated polls agree."""
+    return random.Random("|".join(parts))
+
+
+def _report_periods(limit: int, lte: str | None) -> list[str]:
+    end = date.fromisoformat(lte[:10]) if lte else date.today()
+    return [(end - timedelta(days=91 * i)).isoformat() for i in range(limit)]
+
+
+def _header(ticker: str, report_period: str, period: str) -> dict:
+    return {
+        "ticker": ticker,
+        "report_period": report_period,
+        "fiscal_period": f"{report_period[:4]}-Q{(int(report_period[5:7]) - 1) // 3 + 1}",
+        "period": period,
+        "currency": "USD",
+    }
+
+
+def fake_financial_metrics(ticker: str, period: str, limit: int, lte: str | None) -> dict:
+    fields = [
+        "market_cap", "enterprise_value", "price_to_earnings_ratio", "price_to_book_ratio",
+        "price_to_sales_ratio", "enterprise_value_to_ebitda_ratio", "enterprise_value_to_revenue_ratio",
+        "gross_margin", "operating_margin", "net_margin", "return_on_equity", "return_on_assets",
+        "current_ratio", "quick_ratio", "earnings_per_share", "debt_to_equity",
+        "free_cash_flow_yield", "return_on_invested_capital", "revenue_growth",
+    ]
+    return {
+        "financial_metrics": [
+            {**_header(ticker, rp, period), **{f: round(rng.uniform(0.01, 30.0), 4) for f in fields}}
+            for rp in _report_periods(limit, lte)
+            for rng in [_rng("metrics", ticker, rp)]
+        ]
+    }
+
+
+def fake_financial_statements(ticker: str, period: str, limit: int, lte: str | None) -> dict:
+    periods = _report_periods(limit, lte)
+
+    def rows(fields: list[str]) -> list[dict]:
+        return [
+            {**_header(ticker, rp, period), **{f: round(rng.uniform(1e6, 1e11), 2) for f in fields}}
+            for rp in periods
+            for rng in [_rng("financials", ticker, rp, *fields)]
+        ]
+
+    return {
+        "financials": {
+            "income_statements": rows(["revenue", "gross_profit", "operating_income", "net_income"]),
+            "balance_sheets": rows(["total_assets", "total_liabilities", "shareholders_equity", "total_debt"]),
+            "cash_flow_statements": rows(["net_cash_flow_from_operations", "capital_expenditure", "free_cash_flow"]),
+        }
+    }
+
+
+# Each story is carried by this many outlets, with the variations syndication produces
+NEWS_SYNDICATION = 3
+NEWS_SOURCES = ["Reuters", "Bloomberg", "Motley Fool", "Benzinga"]
+HEADLINE_VARIANTS = ["{headline}", "UPDATE 1-{headline}", "{headline} - {source}", "{headline}, analysts say"]
+
+
+def fake_company_news(ticker: str, limit: int) -> dict:
+    news = []
+    for i in range(limit):
+        day = (date.today() - timedelta(days=i // NEWS_SYNDICATION)).isoformat()
+        story = _rng("news", ticker, day)
+        headline = f"{ticker} {story.choice(FILLER_WORDS)} update {day}"
+        rng = _rng("news", ticker, day, str(i))
+        source = rng.choice(NEWS_SOURCES)
+        news.append({
+            "ticker": ticker,
+            "title": rng.choice(HEADLINE_VARIANTS).format(headline=headline, source=source),
+            "author": "Fake Wire",
+            "source": source,
+            "date": day + "T12:00:00Z",
+            "url": f"https://example.com/{ticker.lower()}/{day}/{i}",
+            "image_url": None,
+            "sentiment": story.choice(["positive", "neutral", "negative"]),
+        })
+    return {"news": news}
+
+
+def fake_prices(ticker: str, start_date: str, end_date: str) -> dict:
+    """Daily random-walk closes, seeded per ticker so repeated calls agree."""
+    rng = random.Random(ticker)
+    day = date.fromisoformat(start_date[:10])
+    end = date.fromisoformat(end_date[:10])
+    close = 100.0
+    prices = []
+    while day <= end:
+        close *= 1 + rng.gauss(0.0003, 0.015)
+        prices.append({"time": f"{day.isoformat()}T00:00:00Z", "open": close, "close": close,
+                       "high": close, "low": close, "volume": 1_000_000})
+        day += timedelta(days=1)
+    return {"ticker": ticker, "prices": prices}
+
+
+## REQUEST HANDLER ##
+
+class FakeAPIHandler(BaseHTTPRequestHandler):
+    server_version = "FakeLLM/1.0"
+    protocol_version = "HTTP/1.1"
+
+    # Set on the server instance by `start_fake_server`
+    @property
+    def config(self) -> FakeServerConfig:
+        return self.server.config
+
+    @property
+    def stats(self) -> FakeServerStats:
+        return self.server.stats
+
+    def log_message(self, format, *args):  # noqa: A002 - stdlib signature
+        pass
+
+    def _jittered(self, seconds: float) -> float:
+        if self.config.jitter:
+            seconds *= random.uniform(1 - self.config.jitter, 1 + self.config.jitter)
+        return max(0.0, seconds)
+
+    def _send_json(self, status: int, body: dict, headers: dict | None = None) -> None:
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _maybe_fail(self, anthropic: bool) -> bool:
+        """Answer with a 429 or a 500 according to the configured rates."""
+        roll = random.random()
+        if roll < self.config.rate_limit_rate:
+            self.stats.record_failure(rate_limited=True)
+            error = ({"type": "error", "error": {"type": "rate_limit_error", "message": "Rate limited"}}
+                     if anthropic else {"error": {"type": "rate_limit_exceeded", "message": "Rate limited", "code": None}})
+            retry_after = self.config.retry_after_ms
+            self._send_json(429, error, {
+                "retry-after-ms": str(retry_after),
+                "retry-after": str(max(1, retry_after // 1000)),
+            })
+            return True
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self.stats.record_failure(rate_limited=False)
+            error = ({"type": "error", "error": {"type": "api_error", "message": "Internal error"}}
+                     if anthropic else {"error": {"type": "server_error", "message": "Internal error", "code": None}})
+            self._send_json(500, error)
+            return True
+        return False
+
+    def _start_sse(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+    def _sse(self, event: str, data: dict) -> None:
+        self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+        self.wfile.flush()
+
+    def _stream_tokens(self, tokens: list[str]):
+        """Yield tokens paced at the configured generation speed, after the TTFT delay."""
+        time.sleep(self._jittered(self.config.ttft_ms / 1000))
+        per_token = 1 / self.config.tokens_per_sec
+        for token in tokens:
+            yield token
+            time.sleep(self._jittered(per_token))
+
+    ## ROUTES ##
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        ticker = query.get("ticker", "TEST").upper()
+        limit = int(query.get("limit") or 4)
+        period = query.get("period", "quarterly")
+
+        if parsed.path == "/_stats":
+            self._send_json(200, self.stats.snapshot())
+            return
+
+        time.sleep(self._jittered(self.config.data_latency_ms / 1000))
+        if parsed.path == "/fd/financial-metrics":
+            body = fake_financial_metrics(ticker, period, limit, query.get("report_period_lte"))
+        elif parsed.path == "/fd/financials":
+            body = fake_financial_statements(ticker, period, limit, query.get("report_period_lte"))
+        elif parsed.path == "/fd/news":
+            body = fake_company_news(ticker, limit)
+        elif parsed.path == "/fd/prices":
+            today = date.today().isoformat()
+            body = fake_prices(ticker, query.get("start_date", today), query.get("end_date", today))
+        else:
+            self._send_json(404, {"error": f"Unknown route {parsed.path}"})
+            return
+
+        self.stats.record(parsed.path)
+        self._send_json(200, body)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path == "/v1/messages":
+            self._anthropic_messages()
+        elif path == "/v1/responses":
+            self._openai_responses()
+        else:
+            self._send_json(404, {"error": f"Unknown route {path}"})
+
+    def _anthropic_messages(self) -> None:
+        payload = self._read_json()
+        if self._maybe_fail(anthropic=True):
+            return
+
+        prompt = "".join(str(m.get("content", "")) for m in payload.get("messages", []))
+        input_tokens = estimate_tokens(prompt + (payload.get("system") or ""))
+        n_tokens = min(self.config.output_tokens, payload.get("max_tokens", self.config.output_tokens))
+        tokens = fake_tokens(n_tokens)
+        message_id = f"msg_{uuid.uuid4().hex}"
+        model = payload.get("model", "claude-fake")
+        self.stats.record("/v1/messages", input_tokens, len(tokens))
+
+        if not payload.get("stream"):
+            text = "".join(self._stream_tokens(tokens))
+            self._send_json(200, {
+                "id": message_id,
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": input_tokens, "output_tokens": len(tokens)},
+            })
+            return
+
+        self._start_sse()
+        self._sse("message_start", {"type": "message_start", "message": {
+            "id": message_id, "type": "message", "role": "assistant", "model": model, "content": [],
+            "stop_reason": None, "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": 1},
+        }})
+        self._sse("content_block_start", {"type": "content_block_start", "index": 0,
+                                          "content_block": {"type": "text", "text": ""}})
+        for token in self._stream_tokens(tokens):
+            self._sse("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                              "delta": {"type": "text_delta", "text": token}})
+        self._sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._sse("message_delta", {"type": "message_delta",
+                                    "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                    "usage": {"output_tokens": len(tokens)}})
+        self._sse("message_stop", {"type": "message_stop"})
+
+    def _openai_responses(self) -> None:
+        payload = self._read_json()
+        if self._maybe_fail(anthropic=False):
+            return
+
+        raw_input = payload.get("input", "")
+        prompt = raw_input if isinstance(raw_input, str) else "".join(str(m.get("content", "")) for m in raw_input)
+        input_tokens = estimate_tokens(prompt + (payload.get("instructions") or ""))
+        n_tokens = min(self.config.output_tokens, payload.get("max_output_tokens") or self.config.output_tokens)
+        tokens = fake_tokens(n_tokens)
+        message_id = f"msg_{uuid.uuid4().hex}"
+        self.stats.record("/v1/responses", input_tokens, len(tokens))
+
+        def response_body(text: str, status: str) -> dict:
+            output = []
+            if payload.get("tools"):
+                output.append({"id": f"ws_{uuid.uuid4().hex}", "type": "web_search_call", "status": "completed"})
+            output.append({
+                "id": message_id, "type": "message", "role": "assistant", "status": status,
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            })
+            return {
+                "id": f"resp_{uuid.uuid4().hex}",
+                "object": "response",
+                "created_at": time.time(),
+                "status": status,
+                "model": payload.get("model", "gpt-fake"),
+                "output": output,
+                "parallel_tool_calls": True,
+                "tool_choice": "auto",
+                "tools": payload.get("tools", []),
+                "temperature": payload.get("temperature"),
+                "top_p": payload.get("top_p"),
+                "error": None,
+                "incomplete_details": None,
+                "instructions": payload.get("instructions"),
+                "metadata": {},
+                "usage": {
+                    "input_tokens": input_tokens,
+                    "input_tokens_details": {"cached_tokens": 0},
+                    "output_tokens": len(tokens),
+                    "output_tokens_details": {"reasoning_tokens": 0},
+                    "total_tokens": input_tokens + len(tokens),
+                },
+            }
+
+        if not payload.get("stream"):
+            self._send_json(200, response_body("".join(self._stream_tokens(tokens)), "completed"))
+            return
+
+        self._start_sse()
+        sequence = 0
+        self._sse("response.created", {"type": "response.created", "sequence_number": sequence,
+                                       "response": response_body("", "in_progress")})
+        output_index = 1 if payload.get("tools") else 0
+        for token in self._stream_tokens(tokens):
+            sequence += 1
+            self._sse("response.output_text.delta", {
+                "type": "response.output_text.delta", "sequence_number": sequence, "item_id": message_id,
+                "output_index": output_index, "content_index": 0, "delta": token,
+            })
+        self._sse("response.completed", {"type": "response.completed", "sequence_number": sequence + 1,
+                                         "response": response_body("".join(tokens), "completed")})
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that hit their deadline close the connection mid-response; that is expected
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def start_fake_server(
+    config: FakeServerConfig | None = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> FakeServer:
+    """
+    Start the fake server on a daemon thread. Use `server.server_address` for the bound port
+    and `server.shutdown()` to stop it.
+    """
+    server = FakeServer((host, port), FakeAPIHandler)
+    server.config = config or FakeServerConfig()
+    server.stats = FakeServerStats()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def server_env(server: FakeServer) -> dict[str, str]:
+    """Environment variables that point CONFIG at the fake server."""
+    host, port = server.server_address[:2]
+    base = f"http://{host}:{port}"
+    return {
+        "ANTHROPIC_API_URL": base,
+        "ANTHROPIC_API_KEY": "fake-key",
+        "OPENAI_API_URL": f"{base}/v1",
+        "OPENAI_API_KEY": "fake-key",
+        "FINANCIAL_DATASETS_API_URL": f"{base}/fd",
+        "FINANCIAL_DATASETS_API_KEY": "fake-key",
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the latency-simulating fake LLM server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    for name, field in FakeServerConfig.model_fields.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(field.default), default=field.default,
+                            help=field.description)
+    args = parser.parse_args()
+
+    config = FakeServerConfig(**{name: getattr(args, name) for name in FakeServerConfig.model_fields})
+    server = start_fake_server(config, args.host, args.port)
+    for key, value in server_env(server).items():
+        print(f"{key}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,182 @@
+"""
+Start-up time benchmark.
+
+Every CLI invocation pays for the imports of the modules it loads before doing any
+work. This measures them in fresh interpreters and checks each against a budget:
+
+- module budgets: cumulative import time of the module, as reported by `-X importtime`
+- command budgets: wall time of a CLI invocation, from process start to exit
+
+The median of several runs is compared against the budget, and the slowest imports
+behind each measurement are listed so a regression can be traced to the module that
+pulled in a heavy dependency. The exit status is 1 when a budget is exceeded.
+
+    python -m backend.src.loadtest.import_time
+    python -m backend.src.loadtest.import_time --runs 9 --top 15 --output benchmarks/import_time.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_RUNS = 5
+
+
+class Budget(BaseModel):
+    name: str
+    module: str | None = Field(None, description="Module whose cumulative import time is measured")
+    command: list[str] | None = Field(None, description="Interpreter arguments whose wall time is measured")
+    budget_ms: float
+
+
+# Generous for a laptop; the point is to catch an eager import of the SDKs or the agents,
+# which costs hundreds of milliseconds, not to track interpreter noise.
+BUDGETS = (
+    Budget(name="cli --help", command=["-m", "backend.src.cli", "--help"], budget_ms=150),
+    Budget(name="import backend.src.cli", module="backend.src.cli", budget_ms=15),
+    Budget(name="import backend.src.config", module="backend.src.config", budget_ms=250),
+    Budget(name="import backend.src.agents.orchestration", module="backend.src.agents.orchestration", budget_ms=500),
+)
+
+
+class ImportEntry(BaseModel):
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int = Field(..., description="Nesting level; 0 is imported directly by the measured code")
+
+
+class Measurement(BaseModel):
+    name: str
+    measured_ms: float = Field(..., description="Median over the runs")
+    budget_ms: float
+    runs: list[float] = Field(default_factory=list)
+    slowest: list[ImportEntry] = Field(default_factory=list, description="Largest self times of a median run")
+
+    @property
+    def over_budget(self) -> bool:
+        return self.measured_ms > self.budget_ms
+
+
+## IMPORTTIME PARSING ##
+
+def parse_importtime(stderr: str) -> list[ImportEntry]:
+    """Entries of `-X importtime` output: `import time: self [us] | cumulative | imported package`."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            # The header line
+            continue
+        stripped = name.lstrip()
+        entries.append(ImportEntry(
+            module=stripped,
+            self_ms=int(self_us) / 1000,
+            cumulative_ms=int(cumulative_us) / 1000,
+            depth=(len(name) - len(stripped) - 1) // 2,
+        ))
+    return entries
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    env.pop("PYTHONIMPORTTIME", None)
+    return env
+
+
+def _run(args: list[str], importtime: bool) -> tuple[float, list[ImportEntry]]:
+    """Run a fresh interpreter; returns its wall time in ms and, with `importtime`, its imports."""
+    flags = ["-X", "importtime"] if importtime else []
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, *flags, *args], cwd=REPO_ROOT, env=_env(),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"{' '.join(args)} exited with {proc.returncode}:\n" + "\n".join(errors[-20:]))
+    return wall_ms, parse_importtime(proc.stderr) if importtime else []
+
+
+def _slowest(entries: list[ImportEntry], top: int) -> list[ImportEntry]:
+    return sorted(entries, key=lambda e: e.self_ms, reverse=True)[:top]
+
+
+def _subtree(entries: list[ImportEntry], module: str) -> tuple[ImportEntry, list[ImportEntry]]:
+    """The top-level entry of `module` and everything it imported (listed before it, nested deeper)."""
+    index = next(i for i, e in enumerate(entries) if e.module == module and e.depth == 0)
+    start = index
+    while start > 0 and entries[start - 1].depth > 0:
+        start -= 1
+    return entries[index], entries[start:index + 1]
+
+
+## MEASUREMENT ##
+
+def measure(budget: Budget, runs: int = DEFAULT_RUNS, top: int = 10) -> Measurement:
+    if budget.module is not None:
+        samples = []
+        for _ in range(runs):
+            _, entries = _run(["-c", f"import {budget.module}"], importtime=True)
+            # Leave out what the interpreter imported at start-up (site and .pth files)
+            measured, imported = _subtree(entries, budget.module)
+            samples.append((measured.cumulative_ms, imported))
+        samples.sort(key=lambda s: s[0])
+        median_ms, entries = samples[len(samples) // 2]
+        return Measurement(
+            name=budget.name, measured_ms=round(median_ms, 1), budget_ms=budget.budget_ms,
+            runs=[round(ms, 1) for ms, _ in samples], slowest=_slowest(entries, top),
+        )
+
+    walls = [_run(budget.command, importtime=False)[0] for _ in range(runs)]
+    # One more run for the breakdown; importtime itself adds overhead, so it is not timed
+    _, entries = _run(budget.command, importtime=True)
+    return Measurement(
+        name=budget.name, measured_ms=round(statistics.median(walls), 1), budget_ms=budget.budget_ms,
+        runs=sorted(round(ms, 1) for ms in walls), slowest=_slowest(entries, top),
+    )
+
+
+def format_report(measurements: list[Measurement], top: int) -> str:
+    width = max(len("NAME"), *(len(m.name) for m in measurements))
+    lines = [f"{'NAME':<{width}}  {'MEDIAN ms':>9}  {'BUDGET ms':>9}"]
+    for m in measurements:
+        status = "❌ over budget" if m.over_budget else "✅"
+        lines.append(f"{m.name:<{width}}  {m.measured_ms:>9.1f}  {m.budget_ms:>9.0f}  {status}")
+    for m in measurements:
+        if not m.slowest:
+            continue
+        lines.append(f"Slowest imports of {m.name} (self ms)")
+        lines.extend(f"  {e.self_ms:>8.1f}  {e.module}" for e in m.slowest[:top])
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure start-up and import times against their budgets.")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports listed per measurement")
+    parser.add_argument("--only", nargs="+", choices=[b.name for b in BUDGETS], default=None, help="Measure only these")
+    parser.add_argument("--output", default=None, help="Also write the measurements as JSON")
+    args = parser.parse_args()
+
+    budgets = [b for b in BUDGETS if args.only is None or b.name in args.only]
+    measurements = [measure(b, runs=args.runs, top=args.top) for b in budgets]
+    print(format_report(measurements, args.top))
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps([m.model_dump() for m in measurements], indent=2))
+        print(f"📝 Measurements written to {args.output}")
+    if any(m.over_budget for m in measurements):
+        sys.exit(1)
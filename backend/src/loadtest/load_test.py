@@ -0,0 +1,106 @@
+"""
+Load test for `master_orchestrator` against the fake LLM server.
+
+Starts the fake server in-process, points CONFIG at it and runs the orchestrator for
+N synthetic tickers at a bounded concurrency, then reports throughput and latency
+percentiles. No real tokens are spent.
+
+    python backend/src/loadtest/load_test.py --tickers 50 --concurrency 10 --ttft-ms 500
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+
+from backend.src.loadtest.fake_llm_server import FakeServerConfig, start_fake_server, server_env
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of `values`."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+async def _run_ticker(master_orchestrator, ticker: str, start_date: str, end_date: str,
+                      semaphore: asyncio.Semaphore) -> tuple[str, float, str | None]:
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            await master_orchestrator(ticker, start_date, end_date, serve_web=False)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return ticker, time.perf_counter() - started, error
+
+
+async def run_load_test(
+    n_tickers: int,
+    concurrency: int,
+    start_date: str,
+    end_date: str,
+    server_config: FakeServerConfig,
+) -> dict:
+    """
+    Drive `master_orchestrator` across `n_tickers` synthetic tickers and return a report dict.
+    """
+    server = start_fake_server(server_config)
+    # CONFIG is built from the environment at import time, so point it at the fake server first
+    os.environ.update(server_env(server))
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from backend.src.agents.orchestration import master_orchestrator
+
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    started = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(
+            _run_ticker(master_orchestrator, ticker, start_date, end_date, semaphore)
+            for ticker in tickers
+        ))
+    finally:
+        wall_time = time.perf_counter() - started
+        server.shutdown()
+
+    latencies = [latency for _, latency, error in results if error is None]
+    errors = {ticker: error for ticker, _, error in results if error is not None}
+
+    return {
+        "tickers": n_tickers,
+        "concurrency": concurrency,
+        "wall_time_s": round(wall_time, 3),
+        "throughput_tickers_per_s": round(len(latencies) / wall_time, 3) if wall_time else None,
+        "latency_s": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p90": round(percentile(latencies, 90), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies), 3) if latencies else None,
+        },
+        "failed": len(errors),
+        "errors": errors,
+        "server": server.stats.snapshot(),
+        "server_config": server_config.model_dump(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test master_orchestrator against the fake LLM server.")
+    parser.add_argument("--tickers", type=int, default=10, help="Number of synthetic tickers")
+    parser.add_argument("--concurrency", type=int, default=10, help="Tickers in flight at once")
+    parser.add_argument("--start-date", default="2024-01-01")
+    parser.add_argument("--end-date", default="2025-01-01")
+    for name, field in FakeServerConfig.model_fields.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(field.default), default=field.default,
+                            help=field.description)
+    args = parser.parse_args()
+
+    config = FakeServerConfig(**{name: getattr(args, name) for name in FakeServerConfig.model_fields})
+    report = asyncio.run(run_load_test(args.tickers, args.concurrency, args.start_date, args.end_date, config))
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,222 @@
+"""
+Structured, level-gated logging for the clients and agents.
+
+Records are handed to a queue and written by a background listener thread, so the
+event loop never blocks on stdout. Large payloads are wrapped in `LazyJSON` and are
+only serialized when a handler actually emits the record, i.e. when DEBUG is enabled.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from typing import Any
+
+from pydantic import ValidationError
+
+from backend.src.config import CONFIG
+
+ROOT_LOGGER_NAME = "backend"
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s %(name)s | %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is
+# treated as a structured field.
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_configure_lock = threading.Lock()
+_listener: logging.handlers.QueueListener | None = None
+
+
+class LazyJSON:
+    """
+    Defers `json.dumps` until the record is formatted.
+    Pass it as a logging argument: `logger.debug("payload: %s", LazyJSON(payload))`.
+    """
+    __slots__ = ("obj", "indent")
+
+    def __init__(self, obj: Any, indent: int | None = 2):
+        self.obj = obj
+        self.indent = indent
+
+    def __str__(self) -> str:
+        try:
+            return json.dumps(self.obj, indent=self.indent, default=str)
+        except (TypeError, ValueError):
+            return str(self.obj)
+
+
+class LazyRepr:
+    """
+    Defers `str(obj)`, optionally truncated, until the record is formatted.
+    """
+    __slots__ = ("obj", "max_chars")
+
+    def __init__(self, obj: Any, max_chars: int | None = None):
+        self.obj = obj
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        text = str(self.obj)
+        if self.max_chars is not None and len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}... [{len(text) - self.max_chars} more chars]"
+        return text
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of the records at or below `max_level`.
+    Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, rate: float, max_level: int = logging.DEBUG):
+        super().__init__()
+        self.rate = max(0.0, min(1.0, rate))
+        self.max_level = max_level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, including any `extra=` fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _FormattingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stdlib QueueHandler calls `self.format()` in the emitting thread, which would
+    render every lazy payload on the event loop. Here the record is only sampled on
+    the caller's side and rendered by the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _logging_settings() -> tuple[str, float, str]:
+    """LOG_LEVEL, LOG_SAMPLE_RATE and LOG_FORMAT; from the environment alone when the config cannot load."""
+    try:
+        return CONFIG.log_level, CONFIG.log_sample_rate, CONFIG.log_format
+    except ValidationError:
+        # Missing API keys must not turn a log line into a crash (e.g. `--help` or tooling without .env)
+        return (
+            os.getenv("LOG_LEVEL", "INFO"),
+            float(os.getenv("LOG_SAMPLE_RATE") or "1.0"),
+            os.getenv("LOG_FORMAT", "text"),
+        )
+
+
+def configure_logging(
+    level: str | int | None = None,
+    sample_rate: float | None = None,
+    fmt: str | None = None,
+) -> logging.Logger:
+    """
+    Configure the `backend` logger tree. Safe to call more than once; the last call wins.
+
+    Defaults come from CONFIG (LOG_LEVEL, LOG_SAMPLE_RATE, LOG_FORMAT).
+    """
+    global _listener
+
+    default_level, default_sample_rate, default_fmt = _logging_settings()
+    level = level if level is not None else default_level
+    sample_rate = sample_rate if sample_rate is not None else default_sample_rate
+    fmt = fmt or default_fmt
+
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(
+            StructuredFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+        )
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = _FormattingQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+
+        root.addHandler(queue_handler)
+        root.setLevel(level.upper() if isinstance(level, str) else level)
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(
+            log_queue, stream_handler, respect_handler_level=True
+        )
+        _listener.start()
+
+    return root
+
+
+def shutdown_logging() -> None:
+    """Flush and stop the background listener."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+class _ConfigureOnFirstRecord(logging.Handler):
+    """
+    Placeholder on the `backend` logger until the first record arrives.
+
+    Configuring reads CONFIG, and with it .env and the API keys. Modules call `get_logger`
+    at import, so doing it there would load the config for every import, `--help` included.
+    """
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        if _listener is None:
+            configure_logging()
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        if root.isEnabledFor(record.levelno):
+            for handler in root.handlers:
+                if handler is not self:
+                    handler.handle(record)
+        return True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Return a logger under the `backend` namespace. Logging is configured when the first record is logged.
+    """
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    if _listener is None and not root.handlers:
+        root.addHandler(_ConfigureOnFirstRecord())
+        # Let the first record through whatever its level; configuring sets the real one
+        root.setLevel(logging.DEBUG)
+        root.propagate = False
+    if not name.startswith(ROOT_LOGGER_NAME):
+        name = f"{ROOT_LOGGER_NAME}.{name}"
+    return logging.getLogger(name)
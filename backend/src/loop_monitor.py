@@ -0,0 +1,249 @@
+"""
+Event-loop blocking detector.
+
+A synchronous call made on the event loop (an HTTP request, a large parse, a file write)
+stalls every other ticker and agent for as long as it runs. With LOOP_MONITOR=1 the entry
+points run under a `LoopMonitor`:
+
+- a heartbeat task on the loop records when it last ran;
+- a watchdog thread notices when the heartbeat is overdue and samples the loop thread's
+  stack while it is blocked;
+- when the heartbeat runs again, the stall is recorded with its duration and attributed
+  to the innermost agent or client frame seen in the samples.
+
+A summary table of blocking sites is logged when the run ends. The monitor is off by
+default and costs one short sleep per heartbeat when on.
+"""
+
+import asyncio
+import functools
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import AsyncIterator
+
+from pydantic import BaseModel, Field
+
+from backend.src.config import CONFIG
+from backend.src.logger import get_logger
+from backend.src.memory_profile import profile_memory
+
+logger = get_logger(__name__)
+
+BACKEND_ROOT = Path(__file__).resolve().parent
+# Frames under these directories are what a stall is blamed on, innermost first
+ATTRIBUTED_DIRS = (BACKEND_ROOT / "agents", BACKEND_ROOT / "client")
+MAX_STACK_DEPTH = 40
+MAX_STALLS = 1000
+
+_active: ContextVar["LoopMonitor | None"] = ContextVar("loop_monitor", default=None)
+
+
+class Stall(BaseModel):
+    started_at: float = Field(..., description="time.monotonic() when the loop stopped responding")
+    duration: float = Field(..., description="Seconds the loop was blocked")
+    site: str = Field(..., description="Agent or client method the stall is attributed to")
+    stack: list[str] = Field(default_factory=list, description="Most frequent sampled stack, outermost first")
+    samples: int = 0
+
+
+class SiteSummary(BaseModel):
+    site: str
+    stalls: int
+    total: float
+    max: float
+    stack: list[str] = Field(default_factory=list)
+
+
+## STACK SAMPLING ##
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    path = Path(code.co_filename)
+    try:
+        path = path.relative_to(BACKEND_ROOT.parent.parent)
+    except ValueError:
+        pass
+    return f"{path}:{frame.f_lineno} {name}"
+
+
+def _site(frame) -> str:
+    code = frame.f_code
+    module = Path(code.co_filename).stem
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def sample_stack(thread_id: int) -> tuple[str, list[str]] | None:
+    """(site, stack) of what `thread_id` is running, or None if the thread is gone."""
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return None
+    stack, site, fallback = [], None, None
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        stack.append(_frame_label(frame))
+        path = Path(frame.f_code.co_filename)
+        if site is None and any(path.is_relative_to(d) for d in ATTRIBUTED_DIRS):
+            site = _site(frame)
+        if fallback is None and path.is_relative_to(BACKEND_ROOT):
+            fallback = _site(frame)
+        frame = frame.f_back
+    stack.reverse()
+    return site or fallback or stack[-1].split(" ", 1)[-1], stack
+
+
+## MONITOR ##
+
+class LoopMonitor:
+    """
+    Detects stalls of the running event loop longer than `threshold` seconds.
+
+    sample_interval: seconds between watchdog checks, and between stack samples during a stall
+    """
+
+    def __init__(self, threshold: float | None = None, sample_interval: float | None = None):
+        self.threshold = threshold or CONFIG.loop_block_threshold
+        self.sample_interval = sample_interval or max(self.threshold / 5, 0.002)
+        self.heartbeat_interval = self.threshold / 2
+        self.stalls: list[Stall] = []
+        self.dropped = 0
+        self.started = 0.0
+        self._beat = 0.0
+        self._samples: list[tuple[str, list[str]]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._loop_thread: int | None = None
+        self._heartbeat: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+
+    async def start(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self.started = self._beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat = asyncio.create_task(self._run_heartbeat())
+        self._watchdog = threading.Thread(target=self._run_watchdog, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+
+    async def _run_heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.heartbeat_interval
+            await asyncio.sleep(self.heartbeat_interval)
+            now = loop.time()
+            lag = now - expected
+            with self._lock:
+                samples, self._samples = self._samples, []
+                self._beat = time.monotonic()
+            if lag > self.threshold:
+                self._record(lag, samples)
+
+    def _run_watchdog(self) -> None:
+        overdue = self.heartbeat_interval + self.threshold
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                blocked = time.monotonic() - self._beat > overdue
+            if not blocked:
+                continue
+            sample = sample_stack(self._loop_thread)
+            if sample is not None:
+                with self._lock:
+                    self._samples.append(sample)
+
+    def _record(self, duration: float, samples: list[tuple[str, list[str]]]) -> None:
+        if len(self.stalls) >= MAX_STALLS:
+            self.dropped += 1
+            return
+        if samples:
+            site, _ = Counter(site for site, _ in samples).most_common(1)[0]
+            stack = next(stack for s, stack in samples if s == site)
+        else:
+            # Shorter than one watchdog period past the threshold
+            site, stack = "(not sampled)", []
+        self.stalls.append(Stall(
+            started_at=time.monotonic() - duration, duration=duration, site=site, stack=stack, samples=len(samples),
+        ))
+        logger.debug("🐢 Event loop blocked for %.0fms in %s", duration * 1000, site)
+
+    def summary(self) -> list[SiteSummary]:
+        """Stalls grouped by site, worst total first."""
+        by_site: dict[str, list[Stall]] = {}
+        for stall in self.stalls:
+            by_site.setdefault(stall.site, []).append(stall)
+        summaries = [
+            SiteSummary(
+                site=site,
+                stalls=len(stalls),
+                total=sum(s.duration for s in stalls),
+                max=max(s.duration for s in stalls),
+                stack=max(stalls, key=lambda s: s.duration).stack,
+            )
+            for site, stalls in by_site.items()
+        ]
+        return sorted(summaries, key=lambda s: s.total, reverse=True)
+
+    def format_summary(self, stack_lines: int = 3) -> str:
+        """Plain-text table of `summary()`, with the innermost frames of each site's worst stall."""
+        elapsed = time.monotonic() - self.started
+        summaries = self.summary()
+        blocked = sum(s.total for s in summaries)
+        lines = [
+            f"Event loop blocked {len(self.stalls)} times for {blocked * 1000:.0f}ms total "
+            f"({blocked / elapsed:.1%} of {elapsed:.1f}s), threshold {self.threshold * 1000:.0f}ms",
+        ]
+        if self.dropped:
+            lines.append(f"({self.dropped} more stalls not recorded)")
+        if not summaries:
+            return lines[0]
+        width = max(len("SITE"), *(len(s.site) for s in summaries))
+        lines.append(f"{'SITE':<{width}}  {'STALLS':>6}  {'TOTAL ms':>9}  {'MAX ms':>8}")
+        for s in summaries:
+            lines.append(f"{s.site:<{width}}  {s.stalls:>6}  {s.total * 1000:>9.0f}  {s.max * 1000:>8.0f}")
+            lines.extend(f"    {frame}" for frame in s.stack[-stack_lines:])
+        return "\n".join(lines)
+
+
+@asynccontextmanager
+async def monitor_loop(threshold: float | None = None, enabled: bool | None = None) -> AsyncIterator[LoopMonitor | None]:
+    """
+    Monitor the running loop for the duration of the block and log the summary table at the end.
+    Does nothing unless enabled (defaults to CONFIG.loop_monitor) or when a monitor is already active.
+    """
+    enabled = CONFIG.loop_monitor if enabled is None else enabled
+    if not enabled or _active.get() is not None:
+        yield _active.get()
+        return
+
+    monitor = LoopMonitor(threshold)
+    token = _active.set(monitor)
+    await monitor.start()
+    try:
+        yield monitor
+    finally:
+        await monitor.stop()
+        _active.reset(token)
+        if monitor.stalls:
+            logger.warning("🐢 %s", monitor.format_summary())
+        else:
+            logger.info("🐢 %s", monitor.format_summary())
+
+
+def monitored(fn):
+    """Run an async entry point under the opt-in monitors: `monitor_loop()` and `profile_memory()`."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with profile_memory():
+            async with monitor_loop():
+                return await fn(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,245 @@
+"""
+Opt-in memory profiling of pipeline stages.
+
+With MEMORY_PROFILE=1 the entry points run under a `MemoryProfiler`:
+
+- tracemalloc is started, and `run_analysis` records every stage boundary (run start,
+  each agent finishing, run done) with the traced memory, its peak since the previous
+  boundary and the retained growth. A heap snapshot is diffed once per ticker for the
+  source lines that allocated the most of that ticker's growth.
+- every agent output and `AnalysisResult` is tracked with a weak reference. Objects
+  still alive after their ticker finished are reported with what refers to them, so
+  growth in long-lived processes (job server, watchlist daemon) can be traced to the
+  cache or closure that keeps them.
+
+Tickers running concurrently interleave their allocations; run with
+MAX_CONCURRENT_TICKERS=1 for clean per-stage numbers. Snapshots are slow on large heaps,
+so this is a diagnostic mode, off by default.
+"""
+
+import gc
+import time
+import tracemalloc
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Iterator
+
+from pydantic import BaseModel, Field
+
+from backend.src.config import CONFIG
+from backend.src.logger import get_logger
+
+logger = get_logger(__name__)
+
+TRACEMALLOC_FRAMES = 1
+MAX_STAGES = 5000
+# Log a retention summary every this many finished tickers
+REPORT_EVERY_TICKERS = 50
+# Allocations by the profiler itself and by the import system are left out of the top allocators.
+# Filtering the stats rather than the snapshot: `filter_traces` is pure Python over every trace.
+IGNORED_FILES = (tracemalloc.__file__, __file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", "<unknown>")
+
+_profiler: "MemoryProfiler | None" = None
+
+
+class Allocation(BaseModel):
+    location: str
+    size_kb: float = Field(..., description="Growth since the previous stage boundary")
+    count: int
+
+
+class StageMemory(BaseModel):
+    label: str
+    at: float = Field(..., description="Seconds since profiling started")
+    traced_mb: float = Field(..., description="Memory traced by tracemalloc at the boundary")
+    peak_mb: float = Field(..., description="Highest traced memory since the previous boundary")
+    retained_mb: float = Field(..., description="Growth of traced memory since the previous boundary")
+    top: list[Allocation] = Field(default_factory=list)
+
+
+class RetainedGroup(BaseModel):
+    kind: str
+    alive: int
+    tickers: list[str] = Field(default_factory=list)
+    referrers: list[str] = Field(default_factory=list, description="Types holding a sample of the objects")
+
+
+class MemoryProfiler:
+    """
+    Stage snapshots and retention tracking. Call `checkpoint` at stage boundaries,
+    `track` on objects that should die with their ticker, `ticker_done` when it finishes.
+    """
+
+    def __init__(self, top: int | None = None):
+        self.top = top or CONFIG.memory_profile_top
+        self.stages: list[StageMemory] = []
+        self.started = time.perf_counter()
+        self.tickers_done = 0
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._traced = 0
+        self._owns_tracemalloc = False
+        # id -> (kind, ticker, weakref); entries drop out when the object is collected
+        self._tracked: dict[int, tuple[str, str, weakref.ref]] = {}
+        self._finished_tickers: set[str] = set()
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._owns_tracemalloc = True
+        self._snapshot = tracemalloc.take_snapshot()
+        self._traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def stop(self) -> None:
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        self._snapshot = None
+
+    def checkpoint(self, label: str, snapshot: bool = False) -> StageMemory:
+        """
+        Record a stage boundary. With `snapshot`, also diff a heap snapshot against the
+        previous one for the top allocators; that is the slow part, so `run_analysis`
+        does it once per ticker and only reads the traced totals per agent.
+        """
+        traced, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        top = []
+        if snapshot:
+            current = tracemalloc.take_snapshot()
+            if self._snapshot is not None:
+                for stat in current.compare_to(self._snapshot, "lineno"):
+                    if len(top) >= self.top:
+                        break
+                    frame = stat.traceback[0]
+                    if stat.size_diff <= 0 or frame.filename in IGNORED_FILES:
+                        continue
+                    top.append(Allocation(
+                        location=f"{frame.filename}:{frame.lineno}",
+                        size_kb=round(stat.size_diff / 1024, 1),
+                        count=stat.count_diff,
+                    ))
+            self._snapshot = current
+        stage = StageMemory(
+            label=label,
+            at=round(time.perf_counter() - self.started, 3),
+            traced_mb=round(traced / 2**20, 2),
+            peak_mb=round(peak / 2**20, 2),
+            retained_mb=round((traced - self._traced) / 2**20, 3),
+            top=top,
+        )
+        self._traced = traced
+        if len(self.stages) < MAX_STAGES:
+            self.stages.append(stage)
+        logger.debug("🧠 %s: %.1fMB traced (%+.2fMB)", label, stage.traced_mb, stage.retained_mb)
+        return stage
+
+    def track(self, obj: Any, ticker: str, kind: str | None = None) -> None:
+        """Watch an object that should be freed once its ticker is finished and consumed."""
+        try:
+            ref = weakref.ref(obj, lambda _, key=id(obj): self._tracked.pop(key, None))
+        except TypeError:
+            # str and other builtins cannot be weakly referenced; their size shows in the snapshots
+            return
+        self._tracked[id(obj)] = (kind or type(obj).__name__, ticker.upper(), ref)
+
+    def ticker_done(self, ticker: str) -> None:
+        self._finished_tickers.add(ticker.upper())
+        self.tickers_done += 1
+        if self.tickers_done % REPORT_EVERY_TICKERS == 0:
+            groups = self.retained()
+            logger.info(
+                "🧠 %d tickers done, %.1fMB traced, still alive: %s",
+                self.tickers_done, tracemalloc.get_traced_memory()[0] / 2**20,
+                ", ".join(f"{g.kind} x{g.alive}" for g in groups) or "nothing",
+            )
+
+    def retained(self, referrer_samples: int = 3) -> list[RetainedGroup]:
+        """Tracked objects of finished tickers that are still alive, grouped by kind."""
+        gc.collect()
+        by_kind: dict[str, list[tuple[str, Any]]] = {}
+        for kind, ticker, ref in list(self._tracked.values()):
+            obj = ref()
+            if obj is not None and ticker in self._finished_tickers:
+                by_kind.setdefault(kind, []).append((ticker, obj))
+        groups = []
+        for kind, items in sorted(by_kind.items(), key=lambda kv: -len(kv[1])):
+            referrers = Counter()
+            # Our own bookkeeping refers to the objects too
+            own = {id(item) for item in items} | {id(by_kind)}
+            for _, obj in items[:referrer_samples]:
+                for ref in gc.get_referrers(obj):
+                    if id(ref) not in own and not isinstance(ref, FrameType):
+                        referrers[_describe(ref)] += 1
+            groups.append(RetainedGroup(
+                kind=kind, alive=len(items), tickers=sorted({t for t, _ in items})[:20],
+                referrers=[name for name, _ in referrers.most_common(5)],
+            ))
+        return groups
+
+    def format_report(self, stages: int = 15) -> str:
+        lines = []
+        if self.stages:
+            worst = sorted(self.stages, key=lambda s: s.retained_mb, reverse=True)[:stages]
+            width = max(len("STAGE"), *(len(s.label) for s in worst))
+            lines.append(f"Stages with the largest retained growth ({len(self.stages)} boundaries recorded)")
+            lines.append(f"{'STAGE':<{width}}  {'TRACED MB':>9}  {'PEAK MB':>8}  {'RETAINED MB':>11}  TOP ALLOCATOR")
+            for s in worst:
+                top = f"{s.top[0].location} (+{s.top[0].size_kb:.0f}KB)" if s.top else ""
+                lines.append(f"{s.label:<{width}}  {s.traced_mb:>9.2f}  {s.peak_mb:>8.2f}  {s.retained_mb:>11.3f}  {top}")
+            allocators = Counter()
+            for s in self.stages:
+                for a in s.top:
+                    allocators[a.location] += a.size_kb
+            if allocators:
+                lines.append("Top allocators of retained growth, over all tickers")
+                lines.extend(f"  {kb:>9.0f}KB  {location}" for location, kb in allocators.most_common(self.top))
+        groups = self.retained()
+        if groups:
+            lines.append("Objects still alive after their ticker finished")
+            for g in groups:
+                lines.append(f"  {g.kind} x{g.alive} ({', '.join(g.tickers)}) held by: {', '.join(g.referrers) or 'unknown'}")
+        else:
+            lines.append("No tracked objects outlived their ticker")
+        return "\n".join(lines)
+
+
+def _describe(referrer: Any) -> str:
+    if isinstance(referrer, dict):
+        # Usually an instance __dict__ or a module namespace; name its owner if we can find one
+        for owner in gc.get_referrers(referrer):
+            if getattr(owner, "__dict__", None) is referrer:
+                return f"{type(owner).__qualname__}.__dict__"
+        return "dict"
+    if hasattr(referrer, "cell_contents"):
+        return "closure cell"
+    return type(referrer).__qualname__
+
+
+def active_profiler() -> MemoryProfiler | None:
+    return _profiler
+
+
+@contextmanager
+def profile_memory(enabled: bool | None = None) -> Iterator[MemoryProfiler | None]:
+    """
+    Profile memory for the duration of the block and log the report at the end.
+    Does nothing unless enabled (defaults to CONFIG.memory_profile) or when a profiler is already active.
+    """
+    global _profiler
+    enabled = CONFIG.memory_profile if enabled is None else enabled
+    if not enabled or _profiler is not None:
+        yield _profiler
+        return
+
+    _profiler = profiler = MemoryProfiler()
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        try:
+            logger.info("🧠 Memory profile\n%s", profiler.format_report())
+        finally:
+            _profiler = None
+            profiler.stop()
@@ -0,0 +1,373 @@
+"""
+Peer percentiles and z-scores of financial metrics across the stored universe.
+
+Each ticker is compared with the tickers of its peer groups (PEER_GROUPS, a JSON file of
+group name -> tickers) and with every ticker in the store ("all"), on the newest report
+of each as of a date. The metrics prompt gets one line per metric instead of the peers'
+raw numbers:
+
+    gross_margin 0.4621: semiconductors p82 z+0.9 (n=24); all p91 z+1.3 (n=480)
+
+Per group and metric the engine keeps the values sorted, so a percentile is two bisections.
+The mean and standard deviation are computed in two passes when a group's values change
+and reused until they change again, so a z-score is O(1) between updates. The first use of a
+date builds every group in one pass per metric column of the store. After that only the
+tickers whose rows appear in the store's change log are moved between the sorted lists,
+so a new report costs a few list operations per group and metric instead of a rescan.
+
+    python -m backend.src.timeseries.peers NVDA AMD --period quarterly
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Iterable
+
+from pydantic import BaseModel, Field
+
+from backend.src.config import CONFIG
+from backend.src.logger import get_logger
+from backend.src.timeseries.store import MAX_REPORT_AGE_DAYS, METRICS_TABLE, TableView, TimeSeriesStore, iso_day
+
+logger = get_logger(__name__)
+
+## PEER CONFIGURATION ##
+ALL_PEERS = "all"
+# Ratios and growth rates; sizes and per-share amounts say little across companies
+PEER_METRICS = (
+    "gross_margin",
+    "operating_margin",
+    "net_margin",
+    "return_on_equity",
+    "return_on_assets",
+    "return_on_invested_capital",
+    "revenue_growth",
+    "earnings_growth",
+    "free_cash_flow_growth",
+    "price_to_earnings_ratio",
+    "price_to_sales_ratio",
+    "enterprise_value_to_ebitda_ratio",
+    "free_cash_flow_yield",
+    "peg_ratio",
+    "debt_to_equity",
+    "current_ratio",
+    "interest_coverage",
+)
+# A group is left out of a metric's line when fewer of its tickers report the metric
+MIN_PEERS = 5
+# Dates kept in memory: today's and a few backtest windows
+MAX_STATES = 8
+
+
+def load_peer_groups(path: str | None = None) -> dict[str, list[str]]:
+    """
+    Peer groups from a JSON file of group name -> tickers (defaults to CONFIG.peer_groups_path).
+    A file that cannot be read counts as no groups, so tickers are compared with "all" only.
+    """
+    path = path or CONFIG.peer_groups_path
+    if not path:
+        return {}
+    try:
+        groups = json.loads(Path(path).read_text())
+    except OSError as e:
+        logger.warning("⚠️  Cannot read peer groups %s, comparing with all stored tickers only: %s", path, e)
+        return {}
+    if ALL_PEERS in groups:
+        raise ValueError(f"'{ALL_PEERS}' is the group of every stored ticker and cannot be defined in {path}")
+    return {name: [ticker.upper() for ticker in tickers] for name, tickers in groups.items()}
+
+
+def peer_groups_digest(path: str | None = None) -> str | None:
+    """Hash of the peer groups file's content (defaults to CONFIG.peer_groups_path), None without a readable one."""
+    path = path or CONFIG.peer_groups_path
+    if not path:
+        return None
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+    except OSError as e:
+        logger.warning("⚠️  Cannot read peer groups %s, comparing with all stored tickers only: %s", path, e)
+        return None
+
+
+## MODELS ##
+
+class PeerStat(BaseModel):
+    group: str
+    size: int = Field(description="Tickers of the group reporting the metric, this one included")
+    percentile: float = Field(description="Percent of the group below this value, ties counted half")
+    z_score: float | None = Field(None, description="None when the whole group has the same value")
+
+
+class MetricPeers(BaseModel):
+    metric: str
+    value: float
+    peers: list[PeerStat]
+
+
+class PeerContext(BaseModel):
+    ticker: str
+    report_period: str
+    as_of: str
+    metrics: list[MetricPeers] = Field(default_factory=list)
+
+    def format(self) -> str:
+        """One line per metric, for the prompt."""
+        lines = []
+        for m in self.metrics:
+            stats = "; ".join(
+                f"{s.group} p{s.percentile:.0f} z{'-' if s.z_score is None else f'{s.z_score:+.1f}'} (n={s.size})"
+                for s in m.peers
+            )
+            lines.append(f"{m.metric} {m.value:.4g}: {stats}")
+        return "\n".join(lines)
+
+
+## DISTRIBUTIONS ##
+
+class _Distribution:
+    """Sorted values of one metric within one group, with their mean and spread computed on demand."""
+
+    __slots__ = ("values", "_moments")
+
+    def __init__(self, values: Iterable[float] = ()):
+        self.values = sorted(values)
+        self._moments: tuple[float, float] | None = None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, value: float) -> None:
+        insort(self.values, value)
+        self._moments = None
+
+    def remove(self, value: float) -> None:
+        del self.values[bisect_left(self.values, value)]
+        self._moments = None
+
+    def moments(self) -> tuple[float, float]:
+        """Mean and population standard deviation, two-pass so large values keep their precision."""
+        if self._moments is None:
+            n = len(self.values)
+            mean = math.fsum(self.values) / n
+            std = math.sqrt(math.fsum((v - mean) ** 2 for v in self.values) / n)
+            self._moments = mean, std
+        return self._moments
+
+    def stat(self, group: str, value: float) -> PeerStat:
+        n = len(self.values)
+        below = bisect_left(self.values, value)
+        ties = bisect_right(self.values, value) - below
+        mean, std = self.moments()
+        # Below this the spread is rounding error of the mean
+        flat = std <= 1e-12 * max(abs(mean), 1.0)
+        return PeerStat(
+            group=group,
+            size=n,
+            percentile=round(100 * (below + ties / 2) / n, 1),
+            z_score=None if flat else round((value - mean) / std, 2),
+        )
+
+
+def _same_member(a: tuple[str, tuple[float, ...]] | None, b: tuple[str, tuple[float, ...]] | None) -> bool:
+    """Same report period and values; a metric missing (NaN) from both counts as unchanged."""
+    if a is None or b is None:
+        return a is b
+    return a[0] == b[0] and all(x == y or (x != x and y != y) for x, y in zip(a[1], b[1]))
+
+
+class _PeerState:
+    """The newest report of every ticker as of one date, and each group's distribution of each metric."""
+
+    def __init__(self, cutoff: str, oldest: str | None, period: str | None, metrics: tuple[str, ...]):
+        self.cutoff = cutoff
+        self.oldest = oldest
+        self.period = period
+        self.metrics = metrics
+        # Change log offset this state is current with
+        self.offset = 0
+        # Ticker -> (report period, value of each metric)
+        self.members: dict[str, tuple[str, tuple[float, ...]]] = {}
+        self.distributions: dict[tuple[str, str], _Distribution] = {}
+
+    def build(self, view: TableView, groups_of: Callable[[str], tuple[str, ...]]) -> None:
+        """Every ticker at once: one pass per metric column, values grouped, then each group sorted."""
+        rows = view.select(None, self.period, self.oldest, self.cutoff, limit=1)
+        tickers = [view.rows[i][0] for i in rows]
+        memberships = [groups_of(ticker) for ticker in tickers]
+        columns = []
+        for metric in self.metrics:
+            column = view.column(metric)
+            values = [column[i] for i in rows]
+            grouped: dict[str, list[float]] = {}
+            for value, groups in zip(values, memberships):
+                if value == value:
+                    for group in groups:
+                        grouped.setdefault(group, []).append(value)
+            for group, group_values in grouped.items():
+                self.distributions[(group, metric)] = _Distribution(group_values)
+            columns.append(values)
+        periods = [view.value(i, "report_period") for i in rows]
+        self.members = dict(zip(tickers, zip(periods, zip(*columns))))
+
+    def update(self, view: TableView, tickers: Iterable[str], groups_of: Callable[[str], tuple[str, ...]]) -> int:
+        """Move `tickers` to their newest report in `view`; returns how many changed."""
+        moved = 0
+        for ticker in tickers:
+            rows = view.select([ticker], self.period, self.oldest, self.cutoff, limit=1)
+            new = None
+            if rows:
+                new = (view.value(rows[0], "report_period"), tuple(view.column(m)[rows[0]] for m in self.metrics))
+            old = self.members.pop(ticker, None)
+            if old is not None:
+                self._apply(groups_of(ticker), old[1], _Distribution.remove)
+            if new is not None:
+                self.members[ticker] = new
+                self._apply(groups_of(ticker), new[1], _Distribution.add)
+            moved += not _same_member(old, new)
+        return moved
+
+    def _apply(self, groups: tuple[str, ...], values: tuple[float, ...], operation: Callable) -> None:
+        for metric, value in zip(self.metrics, values):
+            if value != value:
+                continue
+            for group in groups:
+                distribution = self.distributions.get((group, metric))
+                if distribution is None:
+                    distribution = self.distributions[(group, metric)] = _Distribution()
+                operation(distribution, value)
+
+    def context(self, ticker: str, as_of: str, groups: tuple[str, ...]) -> PeerContext | None:
+        member = self.members.get(ticker)
+        if member is None:
+            return None
+        report_period, values = member
+        metrics = []
+        for metric, value in zip(self.metrics, values):
+            if value != value:
+                continue
+            stats = []
+            for group in groups:
+                distribution = self.distributions.get((group, metric))
+                if distribution is not None and len(distribution) >= MIN_PEERS:
+                    stats.append(distribution.stat(group, value))
+            if stats:
+                metrics.append(MetricPeers(metric=metric, value=value, peers=stats))
+        if not metrics:
+            return None
+        return PeerContext(ticker=ticker, report_period=report_period, as_of=as_of, metrics=metrics)
+
+
+## ENGINE ##
+
+class PeerEngine:
+    """
+    Peer percentiles of the metrics in `store`, kept current from its change log.
+    Safe to share between threads.
+
+    groups: group name -> tickers (defaults to PEER_GROUPS); every ticker is also in "all"
+    filing_lag_days: reports count from this many days after their period ends (backtests)
+    """
+
+    def __init__(
+        self,
+        store: TimeSeriesStore,
+        groups: dict[str, list[str]] | None = None,
+        metrics: Iterable[str] = PEER_METRICS,
+        max_report_age_days: int | None = MAX_REPORT_AGE_DAYS,
+        filing_lag_days: int = 0):
+        self.store = store
+        self.groups = load_peer_groups() if groups is None else {g: [t.upper() for t in ts] for g, ts in groups.items()}
+        self.metrics = tuple(metrics)
+        self.max_report_age_days = max_report_age_days
+        self.filing_lag_days = filing_lag_days
+        memberships: dict[str, list[str]] = {}
+        for group, tickers in self.groups.items():
+            for ticker in tickers:
+                memberships.setdefault(ticker, []).append(group)
+        # The broadest group last
+        self._memberships = {ticker: (*groups, ALL_PEERS) for ticker, groups in memberships.items()}
+        self._states: OrderedDict[tuple[str, str | None], _PeerState] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def groups_of(self, ticker: str) -> tuple[str, ...]:
+        return self._memberships.get(ticker, (ALL_PEERS,))
+
+    def _state(self, as_of: str, period: str | None) -> _PeerState:
+        """The state of `as_of`, brought up to date with the change log. Called with the lock held."""
+        key = (as_of, period)
+        state = self._states.get(key)
+        # The change log is read before the view, so the view holds every row it lists
+        changed, offset = self.store.changes(METRICS_TABLE, state.offset if state is not None else 0)
+        if state is not None and offset < state.offset:
+            # The store was cleared
+            state = None
+            changed, offset = self.store.changes(METRICS_TABLE, 0)
+
+        if state is None:
+            started = time.perf_counter()
+            cutoff = date.fromisoformat(as_of) - timedelta(days=self.filing_lag_days)
+            oldest = None
+            if self.max_report_age_days is not None:
+                oldest = (cutoff - timedelta(days=self.max_report_age_days)).isoformat()
+            state = _PeerState(cutoff.isoformat(), oldest, period, self.metrics)
+            with self.store.view(METRICS_TABLE) as view:
+                state.build(view, self.groups_of)
+            logger.info(
+                "📊 Built peer percentiles as of %s: %d tickers, %d metrics, groups %s in %.1fms",
+                as_of, len(state.members), len(self.metrics), ", ".join([*self.groups, ALL_PEERS]),
+                (time.perf_counter() - started) * 1000,
+            )
+        elif changed:
+            started = time.perf_counter()
+            with self.store.view(METRICS_TABLE) as view:
+                tickers = {view.rows[i][0] for i in changed if i < len(view)}
+                moved = state.update(view, tickers, self.groups_of)
+            logger.debug(
+                "Updated peer percentiles as of %s: %d changed rows, %d tickers moved in %.1fms",
+                as_of, len(changed), moved, (time.perf_counter() - started) * 1000,
+            )
+        state.offset = offset
+
+        self._states[key] = state
+        self._states.move_to_end(key)
+        while len(self._states) > MAX_STATES:
+            self._states.popitem(last=False)
+        return state
+
+    def context(self, ticker: str, as_of: str | None = None, period: str | None = None) -> PeerContext | None:
+        """
+        How the newest `period` report of `ticker` as of `as_of` (default today) compares with
+        its peers; None if the ticker has no recent report or no group has enough peers.
+        """
+        today = date.today().isoformat()
+        as_of = min(iso_day(as_of), today) if as_of else today
+        ticker = ticker.upper()
+        with self._lock:
+            state = self._state(as_of, period)
+            return state.context(ticker, as_of, self.groups_of(ticker))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show how tickers' stored metrics compare with their peers.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--as-of", default=None, help="Comparison date (ISO, default today)")
+    parser.add_argument("--period", default="quarterly", help="Report period compared (quarterly, annual or ttm)")
+    parser.add_argument("--groups", default=None, metavar="FILE", help="Peer groups JSON (defaults to PEER_GROUPS)")
+    parser.add_argument("--root", default=None, help="Store directory (defaults to TIMESERIES_DIR)")
+    args = parser.parse_args()
+
+    engine = PeerEngine(TimeSeriesStore(args.root), load_peer_groups(args.groups))
+    for ticker in args.tickers:
+        peer_context = engine.context(ticker, args.as_of, args.period)
+        if peer_context is None:
+            print(f"{ticker.upper()}: no recent report or too few peers\n")
+            continue
+        print(f"{peer_context.ticker} ({args.period} report {peer_context.report_period}, as of {peer_context.as_of})")
+        print(peer_context.format() + "\n")
@@ -0,0 +1,319 @@
+"""
+Pre-LLM screening over the metrics in the time-series store.
+
+A screen is declarative: filters on FinancialMetrics fields, and ranking keys whose
+percentile ranks are combined into one score.
+
+    Screen(
+        filters=[Filter.parse("return_on_invested_capital > 0.1"), Filter.parse("debt_to_equity <= 1.5")],
+        rank=[Rank.parse("free_cash_flow_yield"), Rank.parse("peg_ratio:asc")],
+        top=20,
+    )
+
+Each ticker is represented by its newest report as of the screen date. Filters run a
+column at a time over the mapped metric columns, each on the rows that survived the
+previous one, so a screen over thousands of tickers takes tens of milliseconds and
+nothing is parsed from JSON. Only the shortlist goes on to the LLM pipeline:
+
+    python -m backend.src.timeseries.screen --where "return_on_invested_capital > 0.1" --rank free_cash_flow_yield --top 20
+    python -m backend.src.cli portfolio $(cat universe.txt) --start 2024-01-01 --end 2025-01-01 --where "debt_to_equity < 1" --top 10
+"""
+
+import argparse
+import asyncio
+import math
+import operator
+import re
+import time
+from datetime import date, timedelta
+from itertools import groupby
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel, Field, field_validator
+
+from backend.src.agents.financial_metrics_agent.model import FinancialMetricsRequest
+from backend.src.client.fin_datasetsai import FinancialDatasetsClient
+from backend.src.logger import get_logger
+from backend.src.timeseries.store import MAX_REPORT_AGE_DAYS, METRICS_TABLE, TABLES, TimeSeriesStore, iso_day
+
+logger = get_logger(__name__)
+
+## SCREEN CONFIGURATION ##
+METRIC_FIELDS = TABLES[METRICS_TABLE].floats
+SYNC_CONCURRENCY = 16
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+_FILTER = re.compile(r"^\s*(\w+)\s*(>=|<=|==|!=|>|<)\s*(\S+)\s*$")
+
+
+def _check_field(name: str) -> str:
+    if name not in METRIC_FIELDS:
+        raise ValueError(f"Unknown metric '{name}'; expected one of: {', '.join(METRIC_FIELDS)}")
+    return name
+
+
+class Filter(BaseModel):
+    field: str
+    op: Literal[">", ">=", "<", "<=", "==", "!=", "not_null"]
+    value: float | None = None
+
+    _validate_field = field_validator("field")(_check_field)
+
+    @classmethod
+    def parse(cls, expression: str) -> "Filter":
+        """'debt_to_equity <= 1.5', or a bare field name for 'reported at all'."""
+        if re.fullmatch(r"\s*\w+\s*", expression):
+            return cls(field=expression.strip(), op="not_null")
+        match = _FILTER.match(expression)
+        if match is None:
+            raise ValueError(f"Cannot parse filter '{expression}'; expected '<field> <op> <number>'")
+        return cls(field=match.group(1), op=match.group(2), value=float(match.group(3)))
+
+    def __str__(self) -> str:
+        return self.field if self.op == "not_null" else f"{self.field} {self.op} {self.value:g}"
+
+
+class Rank(BaseModel):
+    field: str
+    descending: bool = Field(True, description="Higher values rank better")
+    weight: float = Field(1.0, gt=0)
+
+    _validate_field = field_validator("field")(_check_field)
+
+    @classmethod
+    def parse(cls, expression: str) -> "Rank":
+        """'field', 'field:asc' or 'field:desc:2' (weight 2)."""
+        name, *rest = expression.strip().split(":")
+        direction = rest[0].lower() if rest else "desc"
+        if direction not in ("asc", "desc"):
+            raise ValueError(f"Cannot parse rank '{expression}'; direction must be 'asc' or 'desc'")
+        return cls(field=name, descending=direction == "desc", weight=float(rest[1]) if len(rest) > 1 else 1.0)
+
+
+class Screen(BaseModel):
+    filters: list[Filter] = Field(default_factory=list)
+    rank: list[Rank] = Field(default_factory=list)
+    top: int | None = Field(None, ge=1, description="Survivors kept after ranking; None keeps all")
+    period: str = "quarterly"
+    max_report_age_days: int | None = Field(MAX_REPORT_AGE_DAYS, description="Older newest reports count as no data")
+
+
+class ScreenHit(BaseModel):
+    ticker: str
+    report_period: str
+    score: float | None = Field(None, description="Weighted percentile rank in [0, 1]; None without ranking keys")
+    values: dict[str, float | None] = Field(default_factory=dict, description="Fields the screen filtered or ranked on")
+
+
+class ScreenResult(BaseModel):
+    as_of: str
+    universe: int
+    evaluated: int = Field(0, description="Tickers with a recent enough report")
+    passed: int = Field(0, description="Tickers that passed every filter")
+    hits: list[ScreenHit] = Field(default_factory=list, description="Shortlist, best first")
+    missing: list[str] = Field(default_factory=list, description="Tickers without a recent report in the store")
+    elapsed_ms: float = 0.0
+
+    @property
+    def tickers(self) -> list[str]:
+        return [hit.ticker for hit in self.hits]
+
+    def format_table(self) -> str:
+        lines = [
+            f"Screened {self.universe} tickers as of {self.as_of}: {self.evaluated} with data, "
+            f"{self.passed} passed, {len(self.hits)} kept ({self.elapsed_ms:.1f}ms)"
+        ]
+        if not self.hits:
+            return lines[0]
+        fields = list(self.hits[0].values)
+        header = "  ".join(f"{f[:22]:>22}" for f in fields)
+        lines.append(f"{'TICKER':<8} {'REPORT':<10} {'SCORE':>6}  {header}")
+        for hit in self.hits:
+            cells = "  ".join(f"{'-' if v is None else f'{v:.4g}':>22}" for v in hit.values.values())
+            score = "-" if hit.score is None else f"{hit.score:.3f}"
+            lines.append(f"{hit.ticker:<8} {hit.report_period:<10} {score:>6}  {cells}")
+        return "\n".join(lines)
+
+
+## EVALUATION ##
+
+def run_screen(store: TimeSeriesStore, screen: Screen, tickers: list[str] | None = None, as_of: str | None = None) -> ScreenResult:
+    """
+    Evaluate `screen` over the newest report of each ticker (every ticker in the store if
+    None) with report_period <= as_of (default today).
+    """
+    started = time.perf_counter()
+    as_of = iso_day(as_of) if as_of else date.today().isoformat()
+    oldest = None
+    if screen.max_report_age_days is not None:
+        oldest = (date.fromisoformat(as_of) - timedelta(days=screen.max_report_age_days)).isoformat()
+    universe = [t.upper() for t in dict.fromkeys(tickers)] if tickers is not None else None
+
+    with store.view(METRICS_TABLE) as view:
+        # Selection vector: one row per ticker, then narrowed by each filter in turn
+        rows = view.select(universe, screen.period, oldest, as_of, limit=1)
+        if universe is None:
+            universe = sorted({view.rows[i][0] for i in rows})
+        evaluated = len(rows)
+        with_data = {view.rows[i][0] for i in rows}
+        for f in screen.filters:
+            column = view.column(f.field)
+            if f.op == "not_null":
+                rows = [i for i in rows if not math.isnan(column[i])]
+                continue
+            compare, value = OPERATORS[f.op], f.value
+            # NaN fails every comparison but !=, so it is excluded explicitly
+            rows = [i for i in rows if compare(column[i], value) and column[i] == column[i]]
+        passed = len(rows)
+
+        scores = dict.fromkeys(rows, 0.0)
+        if screen.rank and rows:
+            total_weight = sum(r.weight for r in screen.rank)
+            for r in screen.rank:
+                column = view.column(r.field)
+                # Missing values rank last whatever the direction
+                ordered = sorted(rows, key=lambda i: (not math.isnan(column[i]), column[i] if r.descending else -column[i]))
+                denominator = max(len(ordered) - 1, 1)
+                position = 0
+                # Tied values (and missing ones) share the average of their positions
+                for _, tied in groupby(ordered, key=lambda i: None if math.isnan(column[i]) else column[i]):
+                    tied = list(tied)
+                    rank = position + (len(tied) - 1) / 2
+                    for i in tied:
+                        scores[i] += r.weight * rank / denominator / total_weight
+                    position += len(tied)
+            # Equal scores are listed by ticker, whatever the input order
+            rows.sort(key=lambda i: (-scores[i], view.rows[i][0]))
+        kept = rows[:screen.top] if screen.top else rows
+
+        fields = list(dict.fromkeys([f.field for f in screen.filters] + [r.field for r in screen.rank]))
+        hits = [
+            ScreenHit(
+                ticker=view.rows[i][0],
+                report_period=view.value(i, "report_period"),
+                score=round(scores[i], 4) if screen.rank else None,
+                values={name: view.value(i, name) for name in fields},
+            )
+            for i in kept
+        ]
+
+    return ScreenResult(
+        as_of=as_of,
+        universe=len(universe),
+        evaluated=evaluated,
+        passed=passed,
+        hits=hits,
+        missing=[t for t in universe if t not in with_data],
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+async def sync_metrics(
+    client: FinancialDatasetsClient,
+    requests: list[FinancialMetricsRequest],
+    max_concurrent: int = SYNC_CONCURRENCY) -> int:
+    """
+    Fetch metrics for each request through `client`, which writes them to its store (or
+    answers from it). Returns the requests that failed; screening treats those tickers as
+    having no data.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+    failures = 0
+
+    async def fetch(request: FinancialMetricsRequest) -> None:
+        nonlocal failures
+        async with semaphore:
+            try:
+                await asyncio.to_thread(client.fetch_financial_metrics_raw, request)
+            except Exception as e:
+                failures += 1
+                logger.warning("Could not sync metrics for %s: %s", request.ticker, e)
+
+    await asyncio.gather(*(fetch(request) for request in requests))
+    return failures
+
+
+async def screen_universe(
+    client: FinancialDatasetsClient,
+    screen: Screen,
+    requests: list[FinancialMetricsRequest],
+    as_of: str) -> ScreenResult:
+    """Sync the metrics of every ticker in `requests` into the client's store, then screen them."""
+    if client.store is None:
+        raise ValueError("Screening needs the time-series store; set TIMESERIES_DIR")
+    failures = await sync_metrics(client, requests)
+    result = await asyncio.to_thread(run_screen, client.store, screen, [r.ticker for r in requests], as_of)
+    logger.info(
+        "🔎 Screen kept %d of %d tickers (%d with data, %d passed filters, %d fetches failed) in %.1fms",
+        len(result.hits), result.universe, result.evaluated, result.passed, failures, result.elapsed_ms,
+    )
+    return result
+
+
+def build_screen(
+    where: list[str] | None = None,
+    rank: list[str] | None = None,
+    top: int | None = None,
+    screen_file: str | None = None) -> Screen | None:
+    """A Screen from command-line options (or a JSON file); None when no option is given."""
+    if screen_file:
+        screen = Screen.model_validate_json(Path(screen_file).read_text())
+    elif where or rank or top:
+        screen = Screen()
+    else:
+        return None
+    screen.filters += [Filter.parse(expression) for expression in where or []]
+    screen.rank += [Rank.parse(expression) for expression in rank or []]
+    if top:
+        screen.top = top
+    return screen
+
+
+def add_screen_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--where", nargs="+", default=None, metavar="FILTER", help="Filters such as 'debt_to_equity < 1'")
+    parser.add_argument("--rank", nargs="+", default=None, metavar="FIELD[:asc|desc[:WEIGHT]]", help="Ranking keys")
+    parser.add_argument("--top", type=int, default=None, help="Tickers kept after ranking")
+    parser.add_argument("--screen", default=None, metavar="FILE", help="Screen as JSON (filters, rank, top, ...)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Screen tickers on their stored financial metrics.")
+    parser.add_argument("tickers", nargs="*", help="Universe (default: every ticker in the store)")
+    parser.add_argument("--universe", default=None, metavar="FILE", help="File with one ticker per line")
+    parser.add_argument("--as-of", default=None, help="Screen date (ISO, default today)")
+    parser.add_argument("--sync", action="store_true", help="Fetch metrics the store does not cover first")
+    parser.add_argument("--root", default=None, help="Store directory (defaults to TIMESERIES_DIR)")
+    add_screen_arguments(parser)
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.universe:
+        tickers += [line.strip() for line in Path(args.universe).read_text().splitlines() if line.strip()]
+    screen = build_screen(args.where, args.rank, args.top, args.screen) or Screen()
+    as_of = args.as_of or date.today().isoformat()
+
+    if args.sync:
+        from backend.src.client.clients import build_clients
+
+        if not tickers:
+            parser.error("--sync needs the tickers to fetch")
+        financial_client = build_clients().financial_client
+        if args.root:
+            financial_client.store = TimeSeriesStore(args.root)
+        metrics_requests = [
+            FinancialMetricsRequest(ticker=t, period=screen.period, limit=1, report_period_lte=as_of) for t in tickers
+        ]
+        screen_result = asyncio.run(screen_universe(financial_client, screen, metrics_requests, as_of))
+    else:
+        screen_result = run_screen(TimeSeriesStore(args.root), screen, tickers or None, as_of)
+    print(screen_result.format_table())
+    if screen_result.missing:
+        print(f"No recent report for: {', '.join(screen_result.missing)}")
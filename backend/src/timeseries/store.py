@@ -0,0 +1,560 @@
+"""
+Local time-series store for financial statements, metrics and news.
+
+Each table is a directory of column files:
+
+- `rows.jsonl`: the key and text fields of each row (ticker, period, report_period,
+  fiscal_period, currency; for news ticker, url, title, ...), one JSON line per row.
+  A row rewritten by an upsert is appended again with its index; the last line wins.
+- `<field>.f64`: one float64 column per numeric field, row i at byte offset 8 * i,
+  NaN where the API had no value.
+- `coverage.jsonl`: the report-period ranges each ticker has been synced for, one line per sync.
+- `changes.jsonl`: the indices of the rows each upsert added or changed, one line per
+  upsert, so readers that keep derived state (peer percentiles) update only those rows.
+
+Rows are keyed by (ticker, period, report_period), news by (ticker, url). `upsert`
+writes new rows at the end and overwrites existing rows in place. `view` maps the
+column files with mmap and hands out memoryviews over them, so a scan of one field
+across every ticker reads only that field's file and copies nothing.
+
+FinancialDatasetsClient writes every statements, metrics and news response it fetches
+to the store (TIMESERIES_DIR) and answers a statements or metrics request from disk when
+the store covers it: every report in the requested window was synced, and a window that
+reaches past the filing lag was synced within TIMESERIES_MAX_AGE.
+
+    python -m backend.src.timeseries.store tables
+    python -m backend.src.timeseries.store query financial_metrics --tickers AAPL MSFT --columns net_margin --latest
+"""
+
+import argparse
+import json
+import math
+import mmap
+import os
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterable, Iterator, get_args
+
+from pydantic import BaseModel, Field
+
+from backend.src.agents.company_news_agent.model import CompanyNewsReponse
+from backend.src.agents.financial_metrics_agent.model import FinancialMetrics
+from backend.src.agents.financial_statements_agent.model import BalanceSheet, CashFlowStatement, IncomeStatement
+from backend.src.config import CONFIG
+from backend.src.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within a process
+    fcntl = None
+
+logger = get_logger(__name__)
+
+## STORE CONFIGURATION ##
+# Reports for a period are assumed public this long after it ends; older ranges never go stale
+FILING_LAG_DAYS = 120
+ITEM_SIZE = array("d").itemsize
+METRICS_TABLE = "financial_metrics"
+# A ticker's newest report older than this (relative to the date asked about) counts as no data
+MAX_REPORT_AGE_DAYS = 200
+
+
+class TableSpec(BaseModel):
+    name: str
+    model: type[BaseModel]
+    keys: tuple[str, ...]
+    text: tuple[str, ...] = Field(default_factory=tuple, description="Non-numeric fields kept with the keys")
+    floats: tuple[str, ...] = Field(default_factory=tuple, description="Numeric fields, one column file each")
+
+
+def table_spec(name: str, model: type[BaseModel], keys: tuple[str, ...]) -> TableSpec:
+    """Split a model's fields into keys, float columns and text fields."""
+    floats, text = [], []
+    for field, info in model.model_fields.items():
+        if field in keys:
+            continue
+        annotation = info.annotation
+        (floats if annotation is float or float in get_args(annotation) else text).append(field)
+    return TableSpec(name=name, model=model, keys=keys, text=tuple(text), floats=tuple(floats))
+
+
+REPORT_KEYS = ("ticker", "period", "report_period")
+TABLES = {
+    spec.name: spec for spec in (
+        table_spec("income_statements", IncomeStatement, REPORT_KEYS),
+        table_spec("balance_sheets", BalanceSheet, REPORT_KEYS),
+        table_spec("cash_flow_statements", CashFlowStatement, REPORT_KEYS),
+        table_spec("financial_metrics", FinancialMetrics, REPORT_KEYS),
+        table_spec("news", CompanyNewsReponse, ("ticker", "url")),
+    )
+}
+# Financial Datasets endpoint -> tables in its response, in order
+ENDPOINT_TABLES = {
+    "financials": ("income_statements", "balance_sheets", "cash_flow_statements"),
+    "financial-metrics": ("financial_metrics",),
+    "news": ("news",),
+}
+
+
+class Coverage(BaseModel):
+    """Every report with lower <= report_period <= upper that existed at synced_at is stored."""
+    lower: str = Field("", description="ISO date; empty means from the first report")
+    upper: str
+    synced_at: float
+
+
+def iso_day(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()[:10]
+    return str(value)[:10]
+
+
+## TABLE VIEWS ##
+
+class TableView:
+    """
+    Read-only snapshot of a table: row keys and text in `rows`, numeric columns as
+    memoryviews over the mapped files. Close it (or use it as a context manager) to unmap.
+    """
+
+    def __init__(self, spec: TableSpec, rows: list[list], directory: Path, by_ticker: dict[str, list[int]] | None = None):
+        self.spec = spec
+        self.rows = rows
+        self._by_ticker = by_ticker
+        self._fields = spec.keys + spec.text
+        self._maps: list[mmap.mmap] = []
+        self.columns: dict[str, memoryview] = {}
+        for name in spec.floats:
+            self.columns[name] = self._map(directory / f"{name}.f64", len(rows))
+
+    def _map(self, path: Path, n: int) -> memoryview:
+        size = n * ITEM_SIZE
+        if n == 0 or not path.exists() or path.stat().st_size < size:
+            # Columns of a field the API never returned are all missing
+            return memoryview(array("d", [math.nan]) * n)
+        with path.open("rb") as f:
+            mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast("d")
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __enter__(self) -> "TableView":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for view in self.columns.values():
+            view.release()
+        self.columns.clear()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps.clear()
+
+    def column(self, name: str) -> memoryview:
+        return self.columns[name]
+
+    def value(self, row: int, field: str) -> Any:
+        if field in self.columns:
+            value = self.columns[field][row]
+            return None if math.isnan(value) else value
+        return self.rows[row][self._fields.index(field)]
+
+    def record(self, row: int, fields: Iterable[str] | None = None) -> dict[str, Any]:
+        """One row as the API returned it (all fields, or just `fields` and the keys)."""
+        values = self.rows[row]
+        result = {field: values[i] for i, field in enumerate(self._fields)}
+        names = self.spec.floats if fields is None else [f for f in fields if f in self.columns]
+        for name in names:
+            value = self.columns[name][row]
+            result[name] = None if math.isnan(value) else value
+        if fields is not None:
+            result = {k: v for k, v in result.items() if k in self.spec.keys or k in fields}
+        return result
+
+    def select(
+        self,
+        tickers: Iterable[str] | None = None,
+        period: str | None = None,
+        gte: str | None = None,
+        lte: str | None = None,
+        limit: int | None = None) -> list[int]:
+        """
+        Rows of `tickers` (all if None), newest report first per ticker, with
+        gte <= report_period <= lte (news: date) and at most `limit` per ticker.
+        """
+        wanted = {t.upper() for t in tickers} if tickers is not None else None
+        date_field = "report_period" if "report_period" in self._fields else "date"
+        date_index = self._fields.index(date_field)
+        period_index = self._fields.index("period") if "period" in self._fields else None
+        if wanted is not None and self._by_ticker is not None:
+            n = len(self.rows)
+            # Rows of each ticker only; the lists may have grown since the snapshot
+            candidates = ((i, self.rows[i]) for t in wanted for i in self._by_ticker.get(t, ()) if i < n)
+        else:
+            candidates = enumerate(self.rows)
+        by_ticker: dict[str, list[int]] = {}
+        for i, row in candidates:
+            if wanted is not None and row[0] not in wanted:
+                continue
+            if period is not None and period_index is not None and row[period_index] != period:
+                continue
+            day = row[date_index][:10]
+            if (gte and day < gte) or (lte and day > lte):
+                continue
+            by_ticker.setdefault(row[0], []).append(i)
+        selected = []
+        for ticker in sorted(by_ticker):
+            ordered = sorted(by_ticker[ticker], key=lambda i: self.rows[i][date_index], reverse=True)
+            selected.extend(ordered[:limit] if limit else ordered)
+        return selected
+
+
+## STORE ##
+
+class _Table:
+    """Writer state of one table: the row index, kept in step with rows.jsonl."""
+
+    def __init__(self, spec: TableSpec, directory: Path):
+        self.spec = spec
+        self.directory = directory
+        self.rows: list[list] = []
+        self.index: dict[tuple, int] = {}
+        # Ticker -> its row indices; append-only, so views can share the lists
+        self.by_ticker: dict[str, list[int]] = {}
+        self.coverage: dict[str, list[Coverage]] = {}
+        self._rows_read = 0
+        self._coverage_read = 0
+
+    @property
+    def rows_path(self) -> Path:
+        return self.directory / "rows.jsonl"
+
+    @property
+    def coverage_path(self) -> Path:
+        return self.directory / "coverage.jsonl"
+
+    @property
+    def changes_path(self) -> Path:
+        return self.directory / "changes.jsonl"
+
+    @staticmethod
+    def _read_lines(path: Path, offset: int) -> tuple[list[dict], int]:
+        """JSON lines appended to `path` after byte `offset`, and the new offset."""
+        size = path.stat().st_size if path.exists() else 0
+        if size <= offset:
+            return [], size
+        with path.open("rb") as f:
+            f.seek(offset)
+            tail = f.read(size - offset)
+        # A line still being written by another process is picked up next time
+        complete = tail[:tail.rfind(b"\n") + 1]
+        return [json.loads(line) for line in complete.splitlines()], offset + len(complete)
+
+    def refresh(self) -> None:
+        """Read what other processes appended since the last call."""
+        if self.rows_path.exists() and self.rows_path.stat().st_size < self._rows_read:
+            # Cleared: start over
+            self.rows, self.index, self.by_ticker, self.coverage = [], {}, {}, {}
+            self._rows_read = self._coverage_read = 0
+        entries, self._rows_read = self._read_lines(self.rows_path, self._rows_read)
+        for entry in entries:
+            i, row = entry["i"], entry["row"]
+            if i == len(self.rows):
+                self.rows.append(row)
+                self.by_ticker.setdefault(row[0], []).append(i)
+            else:
+                self.rows[i] = row
+            self.index[tuple(row[:len(self.spec.keys)])] = i
+        entries, self._coverage_read = self._read_lines(self.coverage_path, self._coverage_read)
+        for entry in entries:
+            self.add_coverage(entry.pop("key"), Coverage.model_validate(entry))
+
+    def add_coverage(self, key: str, coverage: Coverage) -> None:
+        # A range inside the new one is superseded by it
+        kept = [c for c in self.coverage.get(key, []) if not (coverage.lower <= c.lower and c.upper <= coverage.upper)]
+        self.coverage[key] = kept + [coverage]
+
+
+class TimeSeriesStore:
+    """
+    Columnar store of statements, metrics and news under `root` (defaults to
+    CONFIG.timeseries_dir). Safe to share between threads; writers in different
+    processes take a file lock per table.
+
+    max_age: seconds a synced range that reaches past the filing lag is trusted
+    """
+
+    def __init__(self, root: str | os.PathLike | None = None, max_age: float | None = None):
+        self.root = Path(root or CONFIG.timeseries_dir)
+        self.max_age = max_age if max_age is not None else CONFIG.timeseries_max_age
+        self._tables: dict[str, _Table] = {}
+        self._lock = threading.RLock()
+
+    def _table(self, name: str) -> _Table:
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = _Table(TABLES[name], self.root / name)
+        return table
+
+    @contextmanager
+    def _locked(self, table: _Table) -> Iterator[None]:
+        with self._lock:
+            table.directory.mkdir(parents=True, exist_ok=True)
+            with (table.directory / ".lock").open("a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    table.refresh()
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    ## WRITES ##
+
+    def upsert(self, name: str, records: Iterable[BaseModel | dict[str, Any]]) -> int:
+        """Insert new rows and overwrite existing ones in place; returns the rows written."""
+        table = self._table(name)
+        spec = table.spec
+        fields = spec.keys + spec.text
+        written = 0
+        with self._locked(table):
+            lines, columns = [], {column: {} for column in spec.floats}
+            changed = set()
+            for record in records:
+                data = record.model_dump(mode="json") if isinstance(record, BaseModel) else record
+                row = [str(data.get(f) or "").upper() if f == "ticker" else data.get(f) for f in fields]
+                if "report_period" in fields:
+                    row[fields.index("report_period")] = iso_day(row[fields.index("report_period")])
+                key = tuple(row[:len(spec.keys)])
+                i = table.index.get(key)
+                if i is None:
+                    i = len(table.rows)
+                    table.rows.append(row)
+                    table.index[key] = i
+                    table.by_ticker.setdefault(row[0], []).append(i)
+                    lines.append(json.dumps({"i": i, "row": row}, default=str))
+                    changed.add(i)
+                elif table.rows[i] != row:
+                    table.rows[i] = row
+                    lines.append(json.dumps({"i": i, "row": row}, default=str))
+                    changed.add(i)
+                # Every column gets a value for every row written, so all column files stay as long as rows.jsonl
+                for column in spec.floats:
+                    value = data.get(column)
+                    columns[column][i] = float(value) if isinstance(value, (int, float)) else math.nan
+                written += 1
+            # Columns before rows: a row is visible only once its values are on disk
+            for column, values in columns.items():
+                changed |= self._write_column(table.directory / f"{column}.f64", values, len(table.rows))
+            if lines:
+                table._rows_read = self._append(table.rows_path, lines)
+            if changed:
+                self._append(table.changes_path, [json.dumps({"rows": sorted(changed)})])
+        return written
+
+    @staticmethod
+    def _append(path: Path, lines: list[str]) -> int:
+        with path.open("a") as f:
+            f.write("\n".join(lines) + "\n")
+            return f.tell()
+
+    @staticmethod
+    def _write_column(path: Path, values: dict[int, float], n: int) -> set[int]:
+        """Write `values` (row -> value) to a column file of `n` rows; returns the rows whose value changed."""
+        changed = set()
+        with open(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), "r+b") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < n * ITEM_SIZE:
+                # Rows added before this column first had a value stay missing
+                f.seek(size - size % ITEM_SIZE)
+                f.write(array("d", [math.nan]).tobytes() * (n - size // ITEM_SIZE))
+            # One write per run of consecutive rows; new rows are always one run at the end
+            indices = sorted(values)
+            start = 0
+            for end in range(1, len(indices) + 1):
+                if end == len(indices) or indices[end] != indices[end - 1] + 1:
+                    f.seek(indices[start] * ITEM_SIZE)
+                    new = array("d", [values[i] for i in indices[start:end]]).tobytes()
+                    # Compared as bytes, so an unchanged NaN is unchanged
+                    old = f.read(len(new))
+                    for k in range(end - start):
+                        if old[k * ITEM_SIZE:(k + 1) * ITEM_SIZE] != new[k * ITEM_SIZE:(k + 1) * ITEM_SIZE]:
+                            changed.add(indices[start + k])
+                    f.seek(indices[start] * ITEM_SIZE)
+                    f.write(new)
+                    start = end
+        return changed
+
+    def record_sync(self, name: str, ticker: str, period: str | None, lower: str, upper: str) -> None:
+        table = self._table(name)
+        with self._locked(table):
+            key = f"{ticker.upper()}|{period or ''}"
+            coverage = Coverage(lower=lower, upper=upper, synced_at=time.time())
+            table.add_coverage(key, coverage)
+            table._coverage_read = self._append(table.coverage_path, [json.dumps({"key": key, **coverage.model_dump()})])
+
+    ## READS ##
+
+    def view(self, name: str) -> TableView:
+        """Zero-copy snapshot of a table."""
+        table = self._table(name)
+        with self._lock:
+            if table.directory.exists():
+                table.refresh()
+            rows = list(table.rows)
+        return TableView(table.spec, rows, table.directory, table.by_ticker)
+
+    def query(
+        self,
+        name: str,
+        tickers: Iterable[str] | None = None,
+        period: str | None = None,
+        gte: str | None = None,
+        lte: str | None = None,
+        limit: int | None = None,
+        columns: Iterable[str] | None = None) -> list[dict[str, Any]]:
+        """Rows as dicts, newest first per ticker (see `TableView.select`)."""
+        columns = list(columns) if columns is not None else None
+        with self.view(name) as view:
+            return [view.record(i, columns) for i in view.select(tickers, period, gte, lte, limit)]
+
+    def latest(self, name: str, columns: Iterable[str], period: str | None = None, lte: str | None = None) -> dict[str, dict[str, Any]]:
+        """The newest row of every ticker as of `lte`: ticker -> row."""
+        return {row["ticker"]: row for row in self.query(name, period=period, lte=lte, limit=1, columns=columns)}
+
+    def changes(self, name: str, offset: int = 0) -> tuple[set[int], int]:
+        """
+        Rows added or changed since `offset` (a value this method returned before; 0 for
+        all), and the offset to pass next time. A returned offset lower than the one passed
+        in means the table was cleared.
+        """
+        table = self._table(name)
+        entries, offset = table._read_lines(table.changes_path, offset)
+        return {i for entry in entries for i in entry["rows"]}, offset
+
+    def tickers(self, name: str) -> list[str]:
+        with self.view(name) as view:
+            return sorted({row[0] for row in view.rows})
+
+    def covers(
+        self,
+        name: str,
+        ticker: str,
+        period: str | None,
+        lower: str,
+        upper: str,
+        synced_after: float | None = None) -> bool:
+        """
+        Whether every report of `ticker` with lower <= report_period <= upper is stored and current.
+        A sync only vouches for the days before it, so a window reaching the sync day is never covered.
+
+        synced_after: ignore syncs older than this timestamp
+        """
+        table = self._table(name)
+        with self._lock:
+            if not table.directory.exists():
+                return False
+            table.refresh()
+            ranges = list(table.coverage.get(f"{ticker.upper()}|{period or ''}", []))
+        now = time.time()
+        intervals = []
+        for c in ranges:
+            if synced_after is not None and c.synced_at < synced_after:
+                continue
+            synced_on = datetime.fromtimestamp(c.synced_at).date()
+            # Reports dated the sync day (or later) may not have been filed yet
+            upper_bound = min(c.upper, (synced_on - timedelta(days=1)).isoformat())
+            if self.max_age is not None and now - c.synced_at > self.max_age:
+                # Reports filed since the sync may be missing for periods that recently ended
+                settled = (synced_on - timedelta(days=FILING_LAG_DAYS)).isoformat()
+                upper_bound = min(upper_bound, settled)
+            intervals.append((c.lower, upper_bound))
+        reach = None
+        for low, high in sorted(intervals):
+            if low > (lower if reach is None else max(reach, lower)):
+                break
+            reach = high if reach is None else max(reach, high)
+        return reach is not None and reach >= upper
+
+    ## FINANCIAL DATASETS RESPONSES ##
+
+    def lookup_response(self, endpoint: str, params: dict[str, Any], synced_after: float | None = None) -> dict[str, Any] | None:
+        """
+        The API response to a statements or metrics request, rebuilt from disk; None if not
+        covered by a sync made after `synced_after`.
+        """
+        if endpoint not in ("financials", "financial-metrics") or not params.get("ticker"):
+            return None
+        ticker, period, limit = params["ticker"], params.get("period"), params.get("limit")
+        gte = iso_day(params["report_period_gte"]) if params.get("report_period_gte") else ""
+        lte = iso_day(params["report_period_lte"]) if params.get("report_period_lte") else date.today().isoformat()
+        reports = {}
+        for name in ENDPOINT_TABLES[endpoint]:
+            with self.view(name) as view:
+                rows = view.select([ticker], period, gte or None, lte)
+                # Older reports than the oldest one returned do not need to be covered
+                lower = view.value(rows[limit - 1], "report_period") if limit and len(rows) >= limit else gte
+                if not self.covers(name, ticker, period, lower, lte, synced_after):
+                    return None
+                reports[name] = [view.record(i) for i in (rows[:limit] if limit else rows)]
+        if endpoint == "financial-metrics":
+            return {"financial_metrics": reports["financial_metrics"]}
+        return {"financials": reports}
+
+    def ingest_response(self, endpoint: str, params: dict[str, Any], data: dict[str, Any]) -> None:
+        """Store a fetched response and the range it covers."""
+        if endpoint not in ENDPOINT_TABLES:
+            return
+        if endpoint == "news":
+            self.upsert("news", data.get("news") or [])
+            return
+        reports = {"financial_metrics": data.get("financial_metrics") or []} if endpoint == "financial-metrics" \
+            else data.get("financials") or {}
+        ticker, period, limit = params.get("ticker"), params.get("period"), params.get("limit")
+        gte = iso_day(params["report_period_gte"]) if params.get("report_period_gte") else ""
+        lte = iso_day(params["report_period_lte"]) if params.get("report_period_lte") else date.today().isoformat()
+        for name in ENDPOINT_TABLES[endpoint]:
+            rows = reports.get(name) or []
+            self.upsert(name, rows)
+            if ticker:
+                periods = sorted(iso_day(r["report_period"]) for r in rows if r.get("report_period"))
+                # A full page may stop short of gte; a short page reaches it
+                lower = periods[0] if limit and len(periods) >= int(limit) else gte
+                self.record_sync(name, ticker, period, lower, lte)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the local time-series store.")
+    parser.add_argument("--root", default=None, help="Store directory (defaults to TIMESERIES_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("tables", help="Rows and tickers per table")
+    query_parser = commands.add_parser("query", help="Print rows of a table")
+    query_parser.add_argument("table", choices=sorted(TABLES))
+    query_parser.add_argument("--tickers", nargs="+", default=None)
+    query_parser.add_argument("--period", default=None)
+    query_parser.add_argument("--gte", default=None)
+    query_parser.add_argument("--lte", default=None)
+    query_parser.add_argument("--limit", type=int, default=None, help="Rows per ticker")
+    query_parser.add_argument("--latest", action="store_true", help="Only the newest row per ticker")
+    query_parser.add_argument("--columns", nargs="+", default=None)
+    args = parser.parse_args()
+
+    store = TimeSeriesStore(args.root)
+    if args.command == "tables":
+        for name in TABLES:
+            with store.view(name) as table_view:
+                tickers = {row[0] for row in table_view.rows}
+                print(f"{name:<22} {len(table_view):>8} rows  {len(tickers):>5} tickers  {len(table_view.columns)} columns")
+    else:
+        limit = 1 if args.latest else args.limit
+        for result in store.query(args.table, args.tickers, args.period, args.gte, args.lte, limit, args.columns):
+            print(json.dumps(result, default=str))
@@ -0,0 +1,146 @@
+"""
+Lightweight span tracing for orchestration runs.
+
+A trace is opened per run (`trace_run`) and held in a context variable, like the run
+deadline. `span()` records a timed, nested section of work into the current trace;
+tasks and `asyncio.to_thread` calls copy the context, so spans opened by agents,
+client requests and rendering all land in their run's trace with the right parent.
+Outside a trace, `span()` records nothing.
+
+Span kinds used across the backend:
+- "agent":  one DAG node
+- "http":   a financial data request
+- "queue":  waiting for an LLM concurrency slot
+- "llm":    an LLM request, from send to full response
+- "cpu":    a stage sent to the CPU executor
+- "render": dashboard rendering
+
+With TRACE_DIR set, every trace is also written there as JSON when its run ends.
+"""
+
+import asyncio
+import itertools
+import json
+import re
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator
+
+from pydantic import BaseModel, Field
+
+from backend.src.config import CONFIG
+from backend.src.logger import get_logger
+
+logger = get_logger(__name__)
+
+_trace: ContextVar["Trace | None"] = ContextVar("trace", default=None)
+_span: ContextVar["Span | None"] = ContextVar("span", default=None)
+
+
+class Span(BaseModel):
+    id: int
+    parent: int | None = None
+    name: str
+    kind: str
+    start: float = Field(..., description="Seconds since the trace started")
+    duration: float = 0.0
+    attrs: dict[str, Any] = Field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+class Trace:
+    """Spans of one run, in the order they finished."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.created_at = time.time()
+        self.started = time.perf_counter()
+        self.spans: list[Span] = []
+        self._ids = itertools.count(1)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "created_at": self.created_at,
+            "spans": [span.model_dump() for span in sorted(self.spans, key=lambda s: s.start)],
+        }
+
+    def write(self, directory: str | Path) -> Path:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(self.created_at))
+        path = directory / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', self.name)}_{stamp}.json"
+        path.write_text(json.dumps(self.to_dict(), indent=2, default=str))
+        return path
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+@contextmanager
+def span(name: str, kind: str, **attrs) -> Iterator[Span | None]:
+    """
+    Record the enclosed block as a span of the current trace. Yields the span, so
+    attributes known only at the end can be added to `span.attrs`; yields None outside a trace.
+    """
+    trace = _trace.get()
+    if trace is None or not CONFIG.tracing:
+        yield None
+        return
+    parent = _span.get()
+    current = Span(
+        id=next(trace._ids), parent=parent.id if parent else None, name=name, kind=kind,
+        start=time.perf_counter() - trace.started, attrs=attrs,
+    )
+    token = _span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__ if isinstance(e, asyncio.CancelledError) else f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration = time.perf_counter() - trace.started - current.start
+        _span.reset(token)
+        trace.spans.append(current)
+
+
+@asynccontextmanager
+async def acquire_traced(limit, name: str) -> AsyncIterator[None]:
+    """`async with limit`, with the wait for it recorded as a "queue" span."""
+    with span(name, "queue"):
+        await limit.__aenter__()
+    try:
+        yield
+    finally:
+        await limit.__aexit__(None, None, None)
+
+
+@asynccontextmanager
+async def trace_run(name: str) -> AsyncIterator[Trace]:
+    """
+    Open a trace for a run, or join the one already open (a dashboard run around an analysis).
+    The opener writes the trace to CONFIG.trace_dir, if set, when the block ends.
+    """
+    existing = _trace.get()
+    if existing is not None:
+        yield existing
+        return
+    trace = Trace(name)
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+        if CONFIG.trace_dir and CONFIG.tracing:
+            try:
+                path = await asyncio.to_thread(trace.write, CONFIG.trace_dir)
+                logger.info("🧭 Trace of %s written to %s", name, path)
+            except OSError as e:
+                logger.warning("⚠️  Could not write trace of %s: %s", name, e)
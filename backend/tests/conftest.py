@@ -0,0 +1,21 @@
+"""
+Placeholder API settings so the config loads without a .env; the tests never call the APIs.
+Data paths point at a scratch directory so no test touches the repository's stores.
+"""
+
+import os
+import tempfile
+
+for name, value in {
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_API_URL": "http://localhost",
+    "FINANCIAL_DATASETS_API_KEY": "test",
+    "FINANCIAL_DATASETS_API_URL": "http://localhost",
+    "OPENAI_API_KEY": "test",
+    "OPENAI_API_URL": "http://localhost",
+}.items():
+    os.environ.setdefault(name, value)
+
+_scratch = tempfile.mkdtemp(prefix="investment-agents-tests-")
+for name, relative in {"RUN_STORE_DIR": "runs", "TIMESERIES_DIR": "timeseries", "JOB_STORE_PATH": "jobs.sqlite3"}.items():
+    os.environ[name] = os.path.join(_scratch, relative)
@@ -0,0 +1,58 @@
+import asyncio
+import contextvars
+
+import pytest
+
+from backend.src.client.async_cache import AsyncTTLCache
+
+caller = contextvars.ContextVar("caller", default=None)
+
+
+def test_concurrent_callers_share_one_call_outside_their_context():
+    cache = AsyncTTLCache(ttl=60)
+    calls, seen = [], []
+
+    async def fetch():
+        calls.append(1)
+        seen.append(caller.get())
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def get(name):
+        caller.set(name)
+        return await cache.get("key", fetch)
+
+    async def main():
+        return await asyncio.gather(get("first"), get("second"))
+
+    assert asyncio.run(main()) == ["result", "result"]
+    assert calls == [1]
+    assert seen == [None]
+
+
+def test_first_callers_timeout_does_not_cancel_the_shared_call():
+    cache = AsyncTTLCache(ttl=60)
+
+    async def fetch():
+        await asyncio.sleep(0.1)
+        return "result"
+
+    async def main():
+        impatient = asyncio.wait_for(cache.get("key", fetch), 0.01)
+        patient = cache.get("key", fetch)
+        return await asyncio.gather(impatient, patient, return_exceptions=True)
+
+    impatient, patient = asyncio.run(main())
+    assert isinstance(impatient, asyncio.TimeoutError)
+    assert patient == "result"
+
+
+def test_shared_call_has_its_own_timeout_and_is_not_cached():
+    cache = AsyncTTLCache(ttl=60, timeout=0.01)
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(cache.get("key", slow))
+    assert len(cache) == 0
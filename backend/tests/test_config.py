@@ -0,0 +1,16 @@
+from backend.src.config import PROJECT_ROOT, data_path
+
+
+def test_data_paths_are_rooted_at_the_project():
+    assert data_path("traces") == str(PROJECT_ROOT / "traces")
+    assert data_path("/tmp/peers.json") == "/tmp/peers.json"
+    assert data_path("") is None and data_path(None) is None
+
+
+def test_empty_data_cache_ttl_means_no_expiry(monkeypatch):
+    from backend.src.config import load_config
+
+    monkeypatch.setenv("DATA_CACHE_TTL", "")
+    assert load_config().data_cache_ttl == float("inf")
+    monkeypatch.setenv("DATA_CACHE_TTL", "60")
+    assert load_config().data_cache_ttl == 60.0
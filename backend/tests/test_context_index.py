@@ -0,0 +1,71 @@
+from datetime import date
+
+import pytest
+
+from backend.src.agents.context_index import ContextIndex, index_run_store, select_passages, stem, tokenize
+from backend.src.agents.run_store import RunStore
+
+
+@pytest.mark.parametrize("words", [
+    ("earnings", "earning", "earn"),
+    ("raised", "raise", "raises", "raising"),
+    ("rates", "rate"),
+    ("prices", "price", "priced"),
+    ("companies", "company", "company's"),
+    ("stopped", "stop"),
+])
+def test_stem_variants_meet(words):
+    assert len({stem(w) for w in words}) == 1
+
+
+def test_stem_keeps_short_and_double_letter_words():
+    assert stem("selling") == "sell"
+    assert stem("business") == "business"
+    assert stem("fed") == "fed"
+
+
+def test_search_ranks_matching_passage_first():
+    index = ContextIndex()
+    index.add("AAPL", "web_search", "Apple raised its revenue guidance after a strong quarter.")
+    index.add("AAPL", "web_search", "The company opened a new store in Milan with a large event.")
+    index.add("MSFT", "web_search", "Microsoft raised guidance for cloud revenue.")
+
+    hits = index.search("AAPL", "guidance")
+    assert [h.passage.ticker for h in hits] == ["AAPL"]
+    assert "guidance" in hits[0].passage.text
+    assert index.add("AAPL", "web_search", "Apple raised its revenue guidance after a strong quarter.") is None
+
+
+def test_history_skips_current_and_later_passages():
+    index = ContextIndex()
+    index.add("AAPL", "web_search", "Earnings beat estimates and margins expanded.", date(2024, 1, 30))
+    index.add("AAPL", "web_search", "Earnings guidance was lowered on weak demand.", date(2024, 9, 30))
+    index.add("AAPL", "web_search", "Earnings preview: analysts expect revenue growth.", date(2024, 6, 1))
+
+    current = "Earnings preview:\nanalysts expect revenue growth."
+    earlier = index.history("AAPL", "earnings", "web_search", exclude=current, before=date(2024, 7, 1))
+    assert [p.date for p in earlier] == [date(2024, 1, 30)]
+
+
+def test_history_keeps_out_undated_and_later_searches(tmp_path):
+    store = RunStore(tmp_path)
+    record = store.open_run("AAPL", "2020-01-01", "2021-01-01", {})
+    store.save_stage(record, "web_search", "Earnings guidance was raised after the product launch.")
+    index = ContextIndex()
+    index.add("AAPL", "web_search", "Earnings were flat, an undated note.")
+    assert index_run_store(index, store) == 1
+
+    # Run today for a 2021 window, so it is not earlier than a 2021 backtest cut
+    assert index.history("AAPL", "earnings", "web_search", before=date(2021, 1, 1)) == []
+    assert [p.date for p in index.history("AAPL", "earnings", "web_search", before=date.today())] == [date.today()]
+    assert len(index.history("AAPL", "earnings", "web_search")) == 2
+
+
+def test_select_passages_keeps_short_text_and_trims_long():
+    assert select_passages("short text", max_words=50) == "short text"
+    filler = "\n\n".join(f"Paragraph {i} talks about the weather and sports in general terms." * 3 for i in range(10))
+    text = f"{filler}\n\nEarnings beat and guidance was raised, with revenue growth and margin expansion."
+    selected = select_passages(text, "earnings guidance", max_words=40)
+    assert "guidance was raised" in selected
+    assert len(selected.split()) <= 40
+    assert tokenize("The rates") == ["rat"]
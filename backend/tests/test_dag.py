@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from backend.src.agents.dag import AgentDAG, AgentNode, CycleError
+from backend.src.agents.orchestration import build_investment_recommendation_prompt
+
+
+def build_dag(calls: list[str]) -> AgentDAG:
+    async def ok():
+        calls.append("ok")
+        return "output"
+
+    async def empty():
+        calls.append("empty")
+        return None
+
+    async def slow():
+        calls.append("slow")
+        await asyncio.sleep(1)
+        return "late"
+
+    async def boom():
+        calls.append("boom")
+        raise RuntimeError("no data")
+
+    async def combine(ok, empty, slow, boom):
+        calls.append("combine")
+        return [ok, empty, slow, boom]
+
+    return AgentDAG([
+        AgentNode(name="ok", run=ok),
+        AgentNode(name="empty", run=empty),
+        AgentNode(name="slow", run=slow, timeout=0.05),
+        AgentNode(name="boom", run=boom),
+        AgentNode(name="combine", run=combine, inputs=["ok", "empty", "slow", "boom"]),
+    ])
+
+
+def test_missing_lists_nodes_without_output():
+    calls = []
+    run = asyncio.run(build_dag(calls).run())
+    assert sorted(run.missing) == ["boom", "empty", "slow"]
+    assert run.timings["empty"].status == "failed"
+    assert run.timings["slow"].status == "timeout"
+    assert run.results["combine"] == ["output", None, None, None]
+
+
+def test_only_real_outputs_are_memoized():
+    calls = []
+    dag = build_dag(calls)
+    asyncio.run(dag.run())
+    calls.clear()
+    dag.invalidate("combine")
+    run = asyncio.run(dag.run())
+    assert sorted(calls) == ["boom", "combine", "empty", "slow"]
+    assert run.timings["ok"].status == "cached"
+    assert dag.timing("empty").status == "failed"
+
+
+def test_missing_sections_are_worded_by_status():
+    prompt = build_investment_recommendation_prompt(
+        "aapl", None, None, "web", {"fin_statements": "timeout", "fin_metrics": "failed"},
+    )
+    assert "did not finish within its time budget" in prompt
+    assert "this analysis failed" in prompt
+    assert "WEB SEARCH ANALYSIS:\n    web" in prompt
+
+
+def test_independent_nodes_run_concurrently_and_report_the_critical_path():
+    async def source(delay):
+        await asyncio.sleep(delay)
+        return delay
+
+    async def fast():
+        return await source(0.02)
+
+    async def slow():
+        return await source(0.1)
+
+    async def total(fast, slow):
+        return fast + slow
+
+    dag = AgentDAG([
+        AgentNode(name="fast", run=fast),
+        AgentNode(name="slow", run=slow),
+        AgentNode(name="total", run=total, inputs=["fast", "slow"]),
+    ])
+    run = asyncio.run(dag.run())
+    assert run.results["total"] == pytest.approx(0.12)
+    assert run.critical_path == ["slow", "total"]
+    assert run.wall_time < 0.2
+
+
+def test_deadline_cancels_unfinished_nodes():
+    async def slow():
+        await asyncio.sleep(1)
+        return "late"
+
+    async def after(slow):
+        return f"without {slow}"
+
+    dag = AgentDAG([AgentNode(name="slow", run=slow), AgentNode(name="after", run=after, inputs=["slow"])])
+    run = asyncio.run(dag.run(deadline=0.05))
+    assert run.timings["slow"].status == "timeout"
+    assert run.timings["after"].status == "timeout"
+    assert run.wall_time < 0.5
+
+
+def test_seeded_nodes_are_not_run():
+    calls = []
+
+    async def fetch():
+        calls.append("fetch")
+        return "fresh"
+
+    async def use(fetch):
+        return fetch
+
+    dag = AgentDAG([AgentNode(name="fetch", run=fetch), AgentNode(name="use", run=use, inputs=["fetch"])])
+    dag.seed("fetch", "seeded")
+    run = asyncio.run(dag.run())
+    assert (calls, run.results["use"], run.timings["fetch"].status) == ([], "seeded", "cached")
+
+
+def test_graph_errors():
+    async def noop(**_):
+        return 1
+
+    dag = AgentDAG([AgentNode(name="a", run=noop, inputs=["b"]), AgentNode(name="b", run=noop, inputs=["a"])])
+    with pytest.raises(CycleError):
+        dag.topological_order()
+    with pytest.raises(ValueError):
+        dag.add(AgentNode(name="a", run=noop))
+    with pytest.raises(ValueError, match="unknown outputs"):
+        AgentDAG([AgentNode(name="c", run=noop, inputs=["nope"])]).topological_order()
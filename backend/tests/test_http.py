@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from backend.src.dashboard.http import HTTPServer, MAX_BODY_BYTES, RequestError, Response
+
+
+def read(raw: bytes):
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await HTTPServer()._read_request(reader)
+    return asyncio.run(main())
+
+
+def test_read_request_with_body():
+    request = read(b"POST /jobs?x=1 HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}")
+    assert (request.method, request.path, request.query, request.body) == ("POST", "/jobs", {"x": "1"}, b"{}")
+
+
+@pytest.mark.parametrize("header, status", [
+    (b"Content-Length: abc", 400),
+    (b"Content-Length: -5", 400),
+    (b"Content-Length: " + str(MAX_BODY_BYTES + 1).encode(), 413),
+    (b"Transfer-Encoding: chunked", 411),
+    (b"Transfer-Encoding: gzip", 501),
+])
+def test_unreadable_body_is_rejected(header, status):
+    with pytest.raises(RequestError) as error:
+        read(b"POST /jobs HTTP/1.1\r\n" + header + b"\r\n\r\n")
+    assert error.value.status == status
+
+
+def test_server_replies_400_to_malformed_content_length():
+    async def main():
+        server = HTTPServer()
+
+        async def ok(request):
+            return Response.json({"ok": True})
+
+        server.route("POST", "/jobs", ok)
+        url = await server.start()
+        host, port = url.removeprefix("http://").split(":")
+        reader, writer = await asyncio.open_connection(host, int(port))
+        writer.write(b"POST /jobs HTTP/1.1\r\nContent-Length: nope\r\n\r\n")
+        await writer.drain()
+        reply = await reader.read()
+        writer.close()
+        await server.close()
+        return reply
+
+    reply = asyncio.run(main())
+    assert reply.startswith(b"HTTP/1.1 400 ")
+    assert b"Invalid Content-Length" in reply
+
+
+def test_panel_errors_are_escaped(monkeypatch):
+    from backend.src.dashboard import render
+
+    async def boom(*args):
+        raise ValueError("<script>alert(1)</script>")
+
+    monkeypatch.setattr(render, "run_cpu", boom)
+    panel = asyncio.run(render.render_panel("text"))
+    assert "<script>" not in panel
+    assert "&lt;script&gt;" in panel
+
+
+def test_failure_message_is_escaped():
+    from backend.src.dashboard.live import LiveDashboard
+
+    dashboard = LiveDashboard("AAPL", "2024-01-01", "2025-01-01")
+    asyncio.run(dashboard.fail('<img src=x onerror="alert(1)">'))
+    assert dashboard.done
+    assert all("<img" not in panel and "&lt;img" in panel for panel in dashboard.panels.values())
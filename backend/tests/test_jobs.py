@@ -0,0 +1,89 @@
+import sqlite3
+
+import pytest
+from pydantic import ValidationError
+
+from backend.src.dashboard import jobs as jobs_module
+from backend.src.dashboard.jobs import JobRequest, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3", degraded_ttl=60)
+    yield store
+    store.close()
+
+
+def run(store: JobStore, missing: list[str]) -> str:
+    job, created = store.submit("aapl", "2024-01-01", "2025-01-01")
+    assert created
+    assert store.claim().id == job.id
+    store.finish(job.id, {"recommendation": "BUY", "missing": missing})
+    return job.id
+
+
+def test_submit_attaches_to_queued_and_finished_jobs(store):
+    job, created = store.submit("aapl", "2024-01-01", "2025-01-01")
+    again, created_again = store.submit("AAPL", "2024-01-01", "2025-01-01")
+    assert (created, created_again, again.id) == (True, False, job.id)
+
+    store.claim()
+    store.finish(job.id, {"recommendation": "BUY", "missing": []})
+    assert store.submit("AAPL", "2024-01-01", "2025-01-01") == (store.get(job.id), False)
+    assert store.submit("AAPL", "2024-01-01", "2025-01-01", force=True)[1]
+
+
+def test_degraded_job_is_reused_only_while_recent(store, monkeypatch):
+    job_id = run(store, ["web_search"])
+    assert store.submit("AAPL", "2024-01-01", "2025-01-01")[0].id == job_id
+
+    later = jobs_module.time.time() + 61
+    monkeypatch.setattr(jobs_module.time, "time", lambda: later)
+    job, created = store.submit("AAPL", "2024-01-01", "2025-01-01")
+    assert created and job.id != job_id
+
+
+def test_requeue_running(store):
+    job, _ = store.submit("AAPL", "2024-01-01", "2025-01-01")
+    store.claim()
+    assert store.requeue_running() == 1
+    assert store.get(job.id).status == "queued"
+
+
+def test_request_rejects_inverted_window():
+    with pytest.raises(ValidationError):
+        JobRequest(ticker="AAPL", start_date="2025-01-01", end_date="2024-01-01")
+    assert JobRequest(ticker="AAPL", start_date="2024-01-01", end_date="2024-01-01").ticker == "AAPL"
+
+
+def test_worker_survives_a_failure_it_cannot_record(store, monkeypatch):
+    import asyncio
+
+    from backend.src.agents.model import AnalysisResult
+    from backend.src.dashboard.jobs import JobRunner
+
+    async def run_analysis(ticker, start_date, end_date, **_):
+        if ticker == "BAD":
+            raise RuntimeError("no data")
+        return AnalysisResult(ticker=ticker, start_date=start_date, end_date=end_date)
+
+    def broken_fail(job_id, error):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(jobs_module, "run_analysis", run_analysis)
+    monkeypatch.setattr(store, "fail", broken_fail)
+
+    async def main():
+        runner = JobRunner(store, clients=object(), workers=1)
+        await runner.start()
+        bad, _ = await runner.submit(JobRequest(ticker="BAD", start_date="2024-01-01", end_date="2025-01-01"))
+        good, _ = await runner.submit(JobRequest(ticker="AAPL", start_date="2024-01-01", end_date="2025-01-01"))
+        for _ in range(100):
+            if store.get(good.id).status == "done":
+                break
+            await asyncio.sleep(0.01)
+        alive = all(not task.done() for task in runner._tasks)
+        await runner.close()
+        return store.get(good.id).status, alive
+
+    assert asyncio.run(main()) == ("done", True)
@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_first_record_logs_without_api_keys(tmp_path):
+    # A clean environment and a directory without .env: the config cannot load
+    env = {"PATH": os.environ.get("PATH", ""), "PYTHONPATH": str(ROOT), "LOG_FORMAT": "json"}
+    completed = subprocess.run(
+        [sys.executable, "-c", "from backend.src.logger import get_logger; get_logger('backend.test').warning('hi')"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert '"msg": "hi"' in completed.stderr
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from backend.src.agents.company_news_agent.model import CompanyNewsReponse
+from backend.src.agents.company_news_agent.pipeline import NewsIndex, canonical_url, clean_title
+
+NOON = datetime(2024, 6, 3, 12, 0)
+
+
+def article(title: str, source: str, url: str, hours: float = 0.0, sentiment: str | None = "positive") -> CompanyNewsReponse:
+    return CompanyNewsReponse(
+        ticker="AAPL", title=title, author="-", source=source, date=NOON + timedelta(hours=hours),
+        url=url, image_url=None, sentiment=sentiment,
+    )
+
+
+def test_clean_title_drops_wire_prefix_and_outlet():
+    assert clean_title("UPDATE 2-Apple beats estimates - Reuters", "Reuters") == "Apple beats estimates"
+    assert clean_title("Apple beats estimates - analyst says", "Benzinga") == "Apple beats estimates - analyst says"
+
+
+def test_canonical_url_ignores_tracking():
+    assert canonical_url("https://www.example.com/a/b/?utm_source=x#top") == "example.com/a/b"
+
+
+def test_syndicated_copies_collapse_into_one_story():
+    index = NewsIndex().extend([
+        article("Apple raises dividend and unveils $110 billion buyback", "Benzinga", "https://benzinga.com/1"),
+        article("Apple raises dividend, unveils $110 billion buyback - Reuters", "Reuters", "https://reuters.com/1", 2),
+        article("Apple shares slip as iPhone sales in China fall", "CNBC", "https://cnbc.com/1", 1),
+        article("Apple raises dividend and unveils $110 billion buyback", "Motley Fool", "https://benzinga.com/1/?ref=fool", 3),
+    ])
+    assert (index.received, len(index)) == (4, 2)
+    story = index.top(k=1)[0]
+    assert story.source == "Reuters"
+    assert story.title == "Apple raises dividend, unveils $110 billion buyback"
+    assert story.duplicates == 2
+    assert story.sources == ["Benzinga", "Reuters", "Motley Fool"]
+
+
+def test_same_headline_far_apart_is_a_new_story():
+    index = NewsIndex().extend([
+        article("Apple shares fall", "CNBC", "https://cnbc.com/1"),
+        article("Apple shares fall", "CNBC", "https://cnbc.com/2", hours=24 * 30),
+    ])
+    assert len(index) == 2
+
+
+def test_news_prompt_keeps_braces_in_headlines():
+    from backend.src.agents.company_news_agent.workflow import NEWS_PROMPT
+
+    prompt = NEWS_PROMPT.format(
+        ticker="AAPL", start_date="2024-01-01", end_date="2024-06-30", limit=10, shown=1, unique=1,
+        news="- 2024-06-03 | Reuters | positive | Apple {AAPL} beats", sentiment="7d +0.4", earlier="",
+    )
+    assert "Apple {AAPL} beats" in prompt
+    assert "Here are the 1 most relevant of 1 distinct stories" in prompt
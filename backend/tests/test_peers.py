@@ -0,0 +1,78 @@
+import statistics
+from datetime import date, timedelta
+
+import pytest
+
+from backend.src.timeseries.peers import PeerEngine, _Distribution, load_peer_groups, peer_groups_digest
+from backend.src.timeseries.store import METRICS_TABLE, TimeSeriesStore
+
+
+def day(offset: int) -> str:
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+
+def ingest(store: TimeSeriesStore, ticker: str, report_period: str, net_margin: float) -> None:
+    params = {"ticker": ticker, "period": "quarterly", "limit": 1, "report_period_lte": day(-1)}
+    report = {
+        "ticker": ticker, "report_period": report_period, "period": "quarterly", "fiscal_period": "Q",
+        "currency": "USD", "net_margin": net_margin,
+    }
+    store.ingest_response("financial-metrics", params, {"financial_metrics": [report]})
+
+
+def test_distribution_spread_keeps_precision_on_large_values():
+    values = [1e9 + v for v in (0.1, 0.2, 0.3, 0.4, 0.5)]
+    distribution = _Distribution(values[:-1])
+    distribution.add(values[-1])
+    mean, std = distribution.moments()
+    assert std == pytest.approx(statistics.pstdev(values), rel=1e-6)
+    distribution.remove(values[0])
+    assert distribution.moments()[1] == pytest.approx(statistics.pstdev(values[1:]), rel=1e-6)
+    stat = distribution.stat("all", values[-1])
+    assert (stat.size, stat.percentile) == (4, 87.5)
+
+
+def test_flat_group_has_no_z_score():
+    assert _Distribution([0.1] * 5).stat("all", 0.1).z_score is None
+
+
+def test_engine_follows_new_reports(tmp_path):
+    store = TimeSeriesStore(tmp_path)
+    for i, ticker in enumerate(["AAA", "BBB", "CCC", "DDD", "EEE"]):
+        ingest(store, ticker, day(-60), 0.1 * (i + 1))
+    engine = PeerEngine(store, groups={"tech": ["AAA", "BBB", "CCC", "DDD", "EEE"]}, metrics=["net_margin"])
+
+    before = engine.context("AAA", period="quarterly")
+    assert [s.group for s in before.metrics[0].peers] == ["tech", "all"]
+    assert before.metrics[0].peers[0].percentile == 10.0
+
+    ingest(store, "AAA", day(-20), 0.9)
+    after = engine.context("AAA", period="quarterly")
+    fresh = PeerEngine(store, groups=engine.groups, metrics=["net_margin"]).context("AAA", period="quarterly")
+    assert after == fresh
+    assert after.report_period == day(-20)
+    assert after.metrics[0].peers[0].percentile == 90.0
+
+
+def test_peer_groups_digest_follows_content(tmp_path):
+    path = tmp_path / "peers.json"
+    path.write_text('{"tech": ["AAA"]}')
+    first = peer_groups_digest(str(path))
+    path.write_text('{"tech": ["AAA", "BBB"]}')
+    assert peer_groups_digest(str(path)) != first
+
+
+def test_missing_groups_file_means_no_groups(tmp_path):
+    missing = str(tmp_path / "moved.json")
+    assert peer_groups_digest(missing) is None
+    assert load_peer_groups(missing) == {}
+
+
+def test_update_does_not_count_unchanged_missing_metrics(tmp_path):
+    store = TimeSeriesStore(tmp_path)
+    for ticker in ["AAA", "BBB"]:
+        ingest(store, ticker, day(-60), 0.1)
+    engine = PeerEngine(store, groups={}, metrics=["net_margin", "gross_margin"])
+    state = engine._state(date.today().isoformat(), "quarterly")
+    with store.view(METRICS_TABLE) as view:
+        assert state.update(view, ["AAA", "BBB"], engine.groups_of) == 0
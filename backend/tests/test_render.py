@@ -0,0 +1,50 @@
+import asyncio
+
+from backend.src.agents.model import AnalysisResult
+from backend.src.dashboard import render
+from backend.src.dashboard.render import PageCache, RenderedPage, page_response
+
+PAGE = RenderedPage(etag='"abc123"', body=b"<html></html>", encoded={"gzip": b"gz-body", "br": b"br-body"})
+
+
+def test_each_coding_has_its_own_etag():
+    tags = {}
+    for accept, coding in [(None, None), ("gzip", "gzip"), ("gzip, br", "br")]:
+        status, headers, body = page_response(PAGE, accept_encoding=accept)
+        assert status == 200
+        assert headers.get("Content-Encoding") == coding
+        assert headers["Vary"] == "Accept-Encoding"
+        tags[coding] = headers["ETag"]
+    assert tags == {None: '"abc123"', "gzip": '"abc123-gz"', "br": '"abc123-br"'}
+
+
+def test_if_none_match_only_matches_the_served_coding():
+    assert page_response(PAGE, '"abc123-gz"', "gzip")[0] == 304
+    assert page_response(PAGE, 'W/"abc123-gz"', "gzip")[0] == 304
+    status, headers, body = page_response(PAGE, '"abc123-gz"', None)
+    assert (status, body) == (200, PAGE.body)
+    assert page_response(PAGE, '"abc123"', "br")[0] == 200
+
+
+def test_page_cache_loads_and_renders_once_per_key(monkeypatch):
+    loads, builds = [], []
+
+    async def build(result):
+        builds.append(result.ticker)
+        await asyncio.sleep(0.01)
+        return PAGE
+
+    async def load():
+        loads.append(1)
+        return AnalysisResult(ticker="AAPL", start_date="2024-01-01", end_date="2025-01-01")
+
+    monkeypatch.setattr(render, "build_dashboard_page", build)
+    cache = PageCache()
+
+    async def main():
+        pages = await asyncio.gather(cache.get("job:1", load), cache.get("job:1", load))
+        pages.append(await cache.get("job:1", load))
+        return pages
+
+    assert asyncio.run(main()) == [PAGE, PAGE, PAGE]
+    assert (loads, builds) == ([1], ["AAPL"])
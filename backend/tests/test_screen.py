@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+import pytest
+
+from backend.src.timeseries.screen import Filter, Rank, Screen, run_screen
+from backend.src.timeseries.store import TimeSeriesStore
+
+REPORT_PERIOD = (date.today() - timedelta(days=30)).isoformat()
+VALUES = {"AAA": 0.3, "BBB": 0.1, "CCC": 0.3, "DDD": None, "EEE": 0.5}
+
+
+def build_store(path, tickers) -> TimeSeriesStore:
+    store = TimeSeriesStore(path)
+    for ticker in tickers:
+        params = {"ticker": ticker, "period": "quarterly", "limit": 1, "report_period_lte": REPORT_PERIOD}
+        report = {
+            "ticker": ticker, "report_period": REPORT_PERIOD, "period": "quarterly", "fiscal_period": "Q",
+            "currency": "USD", "net_margin": VALUES[ticker],
+        }
+        store.ingest_response("financial-metrics", params, {"financial_metrics": [report]})
+    return store
+
+
+def test_ties_share_their_average_rank_whatever_the_order(tmp_path):
+    screen = Screen(rank=[Rank.parse("net_margin")])
+    forward = run_screen(build_store(tmp_path / "a", list(VALUES)), screen)
+    backward = run_screen(build_store(tmp_path / "b", list(reversed(VALUES))), screen)
+
+    scores = {hit.ticker: hit.score for hit in forward.hits}
+    assert scores == {hit.ticker: hit.score for hit in backward.hits}
+    assert forward.tickers == backward.tickers == ["EEE", "AAA", "CCC", "BBB", "DDD"]
+    assert scores["AAA"] == scores["CCC"] == pytest.approx(2.5 / 4)
+    assert (scores["EEE"], scores["DDD"]) == (1.0, 0.0)
+
+
+def test_filters_drop_missing_values(tmp_path):
+    result = run_screen(build_store(tmp_path, list(VALUES)), Screen(filters=[Filter.parse("net_margin >= 0.3")]))
+    assert sorted(result.tickers) == ["AAA", "CCC", "EEE"]
+    assert result.passed == 3 and result.evaluated == 5
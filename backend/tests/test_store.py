@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+import pytest
+
+from backend.src.timeseries import store as store_module
+from backend.src.timeseries.store import TimeSeriesStore
+
+TODAY = date.today()
+
+
+def day(offset: int) -> str:
+    return (TODAY + timedelta(days=offset)).isoformat()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TimeSeriesStore(tmp_path, max_age=86400)
+
+
+def metrics(ticker: str, report_period: str, **values) -> dict:
+    return {"ticker": ticker, "report_period": report_period, "period": "quarterly", "fiscal_period": "Q", "currency": "USD", **values}
+
+
+def test_sync_does_not_cover_its_own_day(store):
+    store.record_sync("financial_metrics", "AAPL", "quarterly", day(-400), day(0))
+    assert store.covers("financial_metrics", "AAPL", "quarterly", day(-400), day(-1))
+    assert not store.covers("financial_metrics", "AAPL", "quarterly", day(-400), day(0))
+    assert not store.covers("financial_metrics", "AAPL", "quarterly", day(-500), day(-1))
+
+
+def test_stale_sync_covers_only_settled_periods(store, monkeypatch):
+    synced = store_module.time.time() - 2 * 86400
+    monkeypatch.setattr(store_module.time, "time", lambda: synced)
+    store.record_sync("financial_metrics", "AAPL", "quarterly", day(-800), day(-2))
+    monkeypatch.undo()
+    settled = (TODAY - timedelta(days=2 + store_module.FILING_LAG_DAYS)).isoformat()
+    assert store.covers("financial_metrics", "AAPL", "quarterly", day(-800), settled)
+    assert not store.covers("financial_metrics", "AAPL", "quarterly", day(-800), day(-10))
+
+
+def test_synced_after_skips_older_syncs(store):
+    store.record_sync("financial_metrics", "AAPL", "quarterly", day(-400), day(0))
+    cleared = store_module.time.time() + 1
+    assert not store.covers("financial_metrics", "AAPL", "quarterly", day(-400), day(-1), synced_after=cleared)
+
+
+def test_lookup_rebuilds_fetched_response(store):
+    params = {"ticker": "AAPL", "period": "quarterly", "limit": 2, "report_period_lte": day(-1)}
+    data = {"financial_metrics": [metrics("AAPL", day(-30), net_margin=0.25), metrics("AAPL", day(-120), net_margin=None)]}
+    store.ingest_response("financial-metrics", params, data)
+
+    stored = store.lookup_response("financial-metrics", params)
+    assert [r["report_period"] for r in stored["financial_metrics"]] == [day(-30), day(-120)]
+    assert stored["financial_metrics"][0]["net_margin"] == 0.25
+    assert stored["financial_metrics"][1]["net_margin"] is None
+    assert store.lookup_response("financial-metrics", {**params, "report_period_lte": None}) is None
+
+
+def test_clear_cache_skips_stored_reports(store):
+    from backend.src.client.fin_datasetsai import FinancialDatasetsClient
+
+    client = FinancialDatasetsClient("key", "http://localhost", store=store)
+    params = {"ticker": "AAPL", "period": "quarterly", "limit": 1, "report_period_lte": day(-1)}
+    store.ingest_response("financial-metrics", params, {"financial_metrics": [metrics("AAPL", day(-30))]})
+    assert client._from_store("financial-metrics", params) is not None
+    client.clear_cache()
+    assert client._from_store("financial-metrics", params) is None
@@ -0,0 +1,44 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend.src.agents import watchlist
+from backend.src.agents.company_news_agent.model import CompanyNewsResponse
+from backend.src.agents.financial_metrics_agent.model import FinancialMetricsResponse
+from backend.src.agents.watchlist import poll_inputs
+
+
+class PollClient:
+    def __init__(self):
+        self.requests = []
+
+    def fetch_financial_metrics(self, request):
+        self.requests.append(request)
+        return FinancialMetricsResponse(metrics=[])
+
+    def fetch_company_news(self, ticker, limit=None):
+        self.requests.append((ticker, limit))
+        return CompanyNewsResponse(news=[])
+
+    def fetch_financial_statements(self, request):
+        raise AssertionError("polls must not fetch full statements")
+
+
+def test_poll_inputs_makes_two_small_requests():
+    client = PollClient()
+    fingerprints = asyncio.run(poll_inputs("AAPL", "2024-01-01", "2025-01-01", SimpleNamespace(financial_client=client), None))
+    assert len(client.requests) == 2
+    assert client.requests[0].limit == 1
+    assert fingerprints["fin_statements"] == fingerprints["fin_metrics"] is not None
+
+
+def test_web_search_fingerprint_follows_the_macro_search(monkeypatch):
+    clients = SimpleNamespace(financial_client=PollClient())
+
+    def poll(day):
+        monkeypatch.setattr(watchlist, "macro_cache_key", lambda: ("macro", day))
+        return asyncio.run(poll_inputs("AAPL", "2024-01-01", "2025-01-01", clients, None))
+
+    first, same, next_day = poll("2025-01-01"), poll("2025-01-01"), poll("2025-01-02")
+    assert first == same
+    assert next_day["web_search"] != first["web_search"]
+    assert next_day["fin_metrics"] == first["fin_metrics"]